@@ -3,6 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from authlib.integrations.flask_client import OAuth
+from app.utils.cache import ResultCache
 from config import config
 
 # Initialize extensions
@@ -10,6 +11,7 @@ db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
 oauth = OAuth()
+cache = ResultCache()
 
 def create_app(config_name='development'):
     app = Flask(__name__)
@@ -20,6 +22,7 @@ def create_app(config_name='development'):
     migrate.init_app(app, db)
     login_manager.init_app(app)
     oauth.init_app(app)
+    cache.init_app(app)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
@@ -41,6 +44,9 @@ def create_app(config_name='development'):
     from app.api import bp as api_bp
     app.register_blueprint(api_bp)
 
+    # Importing the services registers their model event listeners
+    from app import services  # noqa: F401
+
     if app.config.get('ENABLE_SCHEDULER'):
         from .scheduler import init_scheduler
         init_scheduler(app)
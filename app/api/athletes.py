@@ -1,16 +1,18 @@
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, abort
 from app.utils.validators import validate_params
 from datetime import date
-from functools import lru_cache
-from sqlalchemy import or_
+from sqlalchemy import case, exists, func, literal, or_, select, union_all
 
 from flask_restx import Resource
 from app.api import api
-from app import db
-from app.models import AthleteProfile, User, Sport, Position, AthleteStat
-
-# Simple in-memory cache for search results
-_SEARCH_CACHE_SIZE = 128
+from app import db, cache
+from app.models import AthleteProfile, AthleteStat, User, Sport, Position
+from app.services.athlete_service import ATHLETE_SORT_KEYS
+from app.services.autocomplete_service import autocomplete
+from app.services.featured_service import featured_cards
+from app.services.search_service import SEARCH_CACHE_TAG, apply_text_search
+from app.services.stat_catalog_service import stat_ids
+from app.utils.pagination import keyset_paginate
 
 
 def _cache_key(args):
@@ -18,10 +20,37 @@ def _cache_key(args):
     return '&'.join(key_parts)
 
 
-@lru_cache(maxsize=_SEARCH_CACHE_SIZE)
 def _cached_search(key):
-    """Perform the actual database search using a cache key."""
-    params = dict(item.split('=', 1) for item in key.split('&') if '=' in item)
+    """Return search results for ``key`` from the shared result cache.
+
+    The key includes today's date because the age filters are relative to it.
+    """
+    return cache.get_or_set(
+        f"search:{date.today().isoformat()}:{key}",
+        lambda: _run_search(key),
+        tags=[SEARCH_CACHE_TAG],
+        timeout=current_app.config.get('SEARCH_CACHE_TIMEOUT'),
+    )
+
+
+def _parse_key(key):
+    return dict(item.split('=', 1) for item in key.split('&') if '=' in item)
+
+
+def _years_ago(today, years):
+    """Return the date ``years`` before ``today``; Feb 29 falls back to Feb 28."""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+def _filtered_query(params):
+    """Build the athlete query for the search filters in ``params``.
+
+    Returns ``(query, rank)`` where ``rank`` is the text relevance expression
+    when a free-text query was given.
+    """
     q = params.get('q', '')
     sport = params.get('sport')
     position = params.get('position')
@@ -32,8 +61,11 @@ def _cached_search(key):
     max_height = int(params['max_height']) if 'max_height' in params else None
     min_weight = float(params['min_weight']) if 'min_weight' in params else None
     max_weight = float(params['max_weight']) if 'max_weight' in params else None
+    stat = params.get('stat')
+    min_stat = float(params['min_stat']) if 'min_stat' in params else None
+    max_stat = float(params['max_stat']) if 'max_stat' in params else None
+    stat_season = params.get('stat_season')
     filter_tab = params.get('filter')
-    limit = 50
 
     query = (
         AthleteProfile.query.filter_by(is_deleted=False)
@@ -49,8 +81,6 @@ def _cached_search(key):
         elif tab == 'available':
             if hasattr(AthleteProfile, 'contract_active'):
                 query = query.filter(AthleteProfile.contract_active.is_(False))
-        elif tab == 'top':
-            limit = 10
 
     if sport:
         if sport.isdigit():
@@ -72,23 +102,16 @@ def _cached_search(key):
     if team:
         query = query.filter(AthleteProfile.current_team.ilike(f"%{team}%"))
 
+    rank = None
     if q:
-        pattern = f"%{q}%"
-        query = query.filter(
-            or_(
-                User.first_name.ilike(pattern),
-                User.last_name.ilike(pattern),
-                Position.name.ilike(pattern),
-                AthleteProfile.current_team.ilike(pattern),
-            )
-        )
+        query, rank = apply_text_search(query, q)
 
     today = date.today()
     if min_age is not None:
-        cutoff = today.replace(year=today.year - min_age)
+        cutoff = _years_ago(today, min_age)
         query = query.filter(AthleteProfile.date_of_birth <= cutoff)
     if max_age is not None:
-        cutoff = today.replace(year=today.year - max_age)
+        cutoff = _years_ago(today, max_age)
         query = query.filter(AthleteProfile.date_of_birth >= cutoff)
 
     if min_height is not None:
@@ -101,13 +124,135 @@ def _cached_search(key):
     if max_weight is not None:
         query = query.filter(AthleteProfile.weight_kg <= max_weight)
 
-    results = (
-        query.order_by(AthleteProfile.overall_rating.desc())
-        .limit(limit)
-        .all()
-    )
+    if stat:
+        # Stats are keyed by their catalog definition, so "PPG" matches
+        # "PointsPerGame".
+        if sport and not sport.isdigit():
+            stat_sport = sport.upper()
+        elif filter_tab and filter_tab.lower() in {'nba', 'nfl', 'mlb', 'nhl'}:
+            stat_sport = filter_tab.upper()
+        else:
+            stat_sport = None
+        definition_ids = stat_ids(db.session, stat, stat_sport)
+        # Served by idx_stats_definition_value on (stat_definition_id, numeric_value).
+        criteria = [
+            AthleteStat.athlete_id == AthleteProfile.athlete_id,
+            AthleteStat.stat_definition_id.in_(definition_ids),
+            AthleteStat.numeric_value.isnot(None),
+        ]
+        if min_stat is not None:
+            criteria.append(AthleteStat.numeric_value >= min_stat)
+        if max_stat is not None:
+            criteria.append(AthleteStat.numeric_value <= max_stat)
+        if stat_season:
+            criteria.append(AthleteStat.season == stat_season)
+        query = query.filter(exists().where(*criteria))
+
+    return query, rank
+
+
+def _run_search(key):
+    """Perform the actual database search using a cache key.
+
+    Returns ``(results, next_cursor)``. Passing ``cursor`` or ``limit`` selects
+    cursor mode, which pages through every match in (rating, id) order; the
+    default mode returns a single relevance-ordered page.
+    """
+    params = _parse_key(key)
+    query, rank = _filtered_query(params)
+    cursor_mode = 'cursor' in params or 'limit' in params
+    limit = int(params['limit']) if 'limit' in params else 50
+    paged = True
+    if (params.get('filter') or '').lower() == 'top':
+        limit = 10
+        paged = False
+
+    if cursor_mode:
+        cursor = params.get('cursor') if paged else None
+        results, next_cursor = keyset_paginate(
+            query, ATHLETE_SORT_KEYS, cursor=cursor, limit=limit
+        )
+        if not paged:
+            next_cursor = None
+        return [ath.to_dict() for ath in results], next_cursor
 
-    return [ath.to_dict() for ath in results]
+    ordering = [AthleteProfile.overall_rating.desc()]
+    if rank is not None:
+        ordering.insert(0, rank.desc())
+    results = query.order_by(*ordering).limit(limit).all()
+
+    return [ath.to_dict() for ath in results], None
+
+
+# Bucket boundaries for the numeric facets as (label, exclusive upper bound);
+# the last label catches everything at or above the final bound.
+_AGE_BUCKETS = [('<20', 20), ('20-24', 25), ('25-29', 30), ('30-34', 35), ('35+', None)]
+_HEIGHT_BUCKETS = [('<180', 180), ('180-189', 190), ('190-199', 200), ('200-209', 210), ('210+', None)]
+_WEIGHT_BUCKETS = [('<80', 80), ('80-89', 90), ('90-99', 100), ('100-109', 110), ('110+', None)]
+
+# Parameters that only shape the result page, not the filtered set.
+_PAGING_PARAMS = {'cursor', 'limit', 'facets'}
+
+
+def _bucket(column, buckets):
+    whens = [(column.is_(None), None)]
+    whens += [(column < upper, label) for label, upper in buckets[:-1]]
+    return case(*whens, else_=buckets[-1][0])
+
+
+def _age_bucket(today):
+    # Age below N means born after the date N years ago.
+    whens = [
+        (AthleteProfile.date_of_birth > _years_ago(today, upper), label)
+        for label, upper in _AGE_BUCKETS[:-1]
+    ]
+    return case(*whens, else_=_AGE_BUCKETS[-1][0])
+
+
+def _run_facets(key):
+    """Count the filtered athletes per facet value in one query.
+
+    The filtered athletes are selected once in a CTE and each facet is a
+    ``GROUP BY`` over it, combined with ``UNION ALL``, so the result has one
+    row per facet value rather than one per combination of values.
+    """
+    query, _ = _filtered_query(_parse_key(key))
+    dimensions = {
+        'sport': Sport.code,
+        'position': Position.code,
+        'team': AthleteProfile.current_team,
+        'contract': case(
+            (AthleteProfile.contract_active.is_(True), 'active'),
+            (AthleteProfile.contract_active.is_(False), 'available'),
+        ),
+        'age': _age_bucket(date.today()),
+        'height': _bucket(AthleteProfile.height_cm, _HEIGHT_BUCKETS),
+        'weight': _bucket(AthleteProfile.weight_kg, _WEIGHT_BUCKETS),
+    }
+    matches = query.with_entities(
+        *(expr.label(name) for name, expr in dimensions.items())
+    ).cte('facet_matches')
+    counts = union_all(*(
+        select(literal(name).label('facet'), matches.c[name].label('value'), func.count())
+        .where(matches.c[name].isnot(None))
+        .group_by(matches.c[name])
+        for name in dimensions
+    ))
+
+    facets = {name: {} for name in dimensions}
+    for name, value, count in db.session.execute(counts):
+        facets[name][value] = count
+    return facets
+
+
+def _cached_facets(key):
+    """Return facet counts for ``key`` from the shared result cache."""
+    return cache.get_or_set(
+        f"facets:{date.today().isoformat()}:{key}",
+        lambda: _run_facets(key),
+        tags=[SEARCH_CACHE_TAG],
+        timeout=current_app.config.get('FACET_CACHE_TIMEOUT'),
+    )
 
 
 @api.route('/athletes/search')
@@ -125,64 +270,51 @@ class AthleteSearch(Resource):
         'max_height': 'Maximum height (cm)',
         'min_weight': 'Minimum weight (kg)',
         'max_weight': 'Maximum weight (kg)',
+        'stat': 'Only athletes with a numeric value for this stat name',
+        'min_stat': 'Minimum value of the stat',
+        'max_stat': 'Maximum value of the stat',
+        'stat_season': 'Season the stat value must belong to',
         'filter': 'Filter tab selection (nba, nfl, mlb, nhl, available, top)',
+        'cursor': 'Opaque cursor from a previous response (cursor mode)',
+        'limit': 'Results per page in cursor mode',
+        'facets': 'Set to 1 to include per-facet counts for the current filters',
     }, description="Search athletes with optional filters")
     @validate_params([])
     def get(self):
         args = request.args.to_dict(flat=True)
+        want_facets = args.pop('facets', '').lower() in {'1', 'true', 'yes'}
         key = _cache_key(args)
-        results = _cached_search(key)
+        try:
+            results, next_cursor = _cached_search(key)
+            facets = None
+            if want_facets:
+                filters = {k: v for k, v in args.items() if k not in _PAGING_PARAMS}
+                facets = _cached_facets(_cache_key(filters))
+        except ValueError:
+            abort(400, 'Invalid search parameters')
 
         if current_app:
             current_app.logger.info('search query: %s', key)
 
-        return jsonify({'results': results, 'count': len(results)})
+        payload = {'results': results, 'count': len(results), 'next_cursor': next_cursor}
+        if facets is not None:
+            payload['facets'] = facets
+        return jsonify(payload)
 
 
-def _format_stat_value(value):
-    """Return a formatted string for numeric stats."""
-    try:
-        num = float(value)
-    except (TypeError, ValueError):
-        return str(value)
-    if 0 < num < 1:
-        return f"{num:.3f}".lstrip("0")
-    return f"{num:.1f}" if num % 1 else str(int(num))
-
-
-def _collect_featured_stats(athlete, year):
-    """Gather three key stats for display based on the athlete's sport."""
-    sport = athlete.primary_sport.code if athlete.primary_sport else None
-    mapping = {}
-    if sport == "NBA":
-        mapping = {
-            "PPG": "PointsPerGame",
-            "RPG": "ReboundsPerGame",
-            "APG": "AssistsPerGame",
-        }
-    elif sport == "NFL":
-        mapping = {
-            "PassingYards": "PassingYards",
-            "Touchdowns": "Touchdowns",
-            "QBRating": "QBRating",
-        }
-    elif sport == "MLB":
-        mapping = {
-            "AVG": "BattingAverage",
-            "HR": "HomeRuns",
-            "RBI": "RunsBattedIn",
-        }
-    elif sport == "NHL":
-        mapping = {"Goals": "Goals", "Assists": "Assists", "Points": "Points"}
-
-    stats = []
-    for label, name in mapping.items():
-        stat = AthleteStat.query.filter_by(
-            athlete_id=athlete.athlete_id, name=name, season=str(year)
-        ).first()
-        value = stat.value if stat else "N/A"
-        stats.append({"label": label, "value": _format_stat_value(value)})
-    return stats
+@api.route('/athletes/autocomplete')
+class AthleteAutocomplete(Resource):
+    @api.doc(params={
+        'prefix': 'Beginning of an athlete name or team name',
+        'limit': 'Maximum number of suggestions (default 10, max 25)',
+    }, description="Type-ahead suggestions for athletes and teams")
+    def get(self):
+        prefix = request.args.get('prefix', '')
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            abort(400, 'Invalid limit')
+        return jsonify({'results': autocomplete(prefix, limit)})
 
 
 @api.route('/athletes/featured')
@@ -192,29 +324,4 @@ class FeaturedAthletes(Resource):
     @validate_params([])
     def get(self):
         limit = request.args.get('limit', 6, type=int)
-        athletes = (
-            AthleteProfile.query.filter_by(is_deleted=False, is_featured=True)
-            .join(User)
-            .outerjoin(Sport)
-            .outerjoin(Position)
-            .order_by(AthleteProfile.overall_rating.desc())
-            .limit(limit)
-            .all()
-        )
-        year = date.today().year
-        featured = []
-        for ath in athletes:
-            name = ath.user.full_name if ath.user else ath.athlete_id
-            initials = "".join([n[0] for n in name.split()][:2]).upper()
-            featured.append(
-                {
-                    "name": name,
-                    "position": ath.primary_position.code if ath.primary_position else None,
-                    "team": ath.current_team or "N/A",
-                    "sport": ath.primary_sport.code if ath.primary_sport else None,
-                    "profile_image_url": ath.profile_image_url,
-                    "initials": initials,
-                    "stats": _collect_featured_stats(ath, year),
-                }
-            )
-        return jsonify(featured)
+        return jsonify(featured_cards(limit))
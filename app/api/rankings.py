@@ -1,11 +1,17 @@
-from flask import jsonify, current_app
+from flask import jsonify, current_app, request, abort
 from flask_restx import Resource
 import json
 import os
-from sqlalchemy.orm import joinedload
 
 from app.api import api
-from app.models import AthleteProfile, AthleteStat
+from app.models import AthleteRanking
+from app.services.leaderboard_service import athlete_standing, leaderboard_page
+from app.services.ranking_service import top_rankings
+from app.utils.conditional import conditional_response, row_versions
+
+
+def _snapshot_versions():
+    return row_versions((AthleteRanking.computed_at,))
 
 
 _DEFAULT_RANKINGS = [
@@ -34,88 +40,70 @@ def _load_rankings():
     return _DEFAULT_RANKINGS
 
 
-_SPORT_STAT = {
-    "NBA": "PointsPerGame",
-    "NFL": "PassingYards",
-    "MLB": "BattingAverage",
-    "NHL": "Points",
-    "SOC": "Goals",
-}
-
-# Rough maximum values used to scale a stat to 0-100. These heuristics are only
-# for the placeholder algorithm and will be replaced in Phase 4.
-_STAT_MAX = {
-    "PointsPerGame": 35,
-    "PassingYards": 5000,
-    "BattingAverage": 0.35,
-    "Points": 120,
-    "Goals": 60,
-}
-
-
-def _calculate_simple_score(athlete):
-    """Return a naive 0-100 score using one key stat per sport.
-
-    This function is a **temporary stand-in** until the real multi-metric
-    ranking algorithm arrives in Phase 4. It looks up a single stat for the
-    athlete (e.g. NBA points per game) and scales it using a rough maximum
-    value.
-    """
-
-    base = float(athlete.overall_rating or 0)
-    sport_code = athlete.primary_sport.code if athlete.primary_sport else None
-    stat_name = _SPORT_STAT.get(sport_code)
-    if not stat_name:
-        return base
-
-    stat = (
-        AthleteStat.query.filter_by(athlete_id=athlete.athlete_id, name=stat_name)
-        .order_by(AthleteStat.season.desc())
-        .first()
-    )
-    if not stat:
-        return base
-    try:
-        value = float(stat.value)
-    except (TypeError, ValueError):
-        return base
-
-    max_val = _STAT_MAX.get(stat_name) or 1
-    score = (value / max_val) * 100
-    return round(min(score, 100), 1)
-
-
-def _dynamic_rankings(limit=5):
-    """Compute rankings for athletes using the simple scoring formula."""
-
-    athletes = (
-        AthleteProfile.query.options(joinedload(AthleteProfile.user))
-        .options(joinedload(AthleteProfile.primary_sport))
-        .filter_by(is_deleted=False)
-        .all()
-    )
-    if not athletes:
-        return None
-
-    ranked = []
-    for ath in athletes:
-        name = ath.user.full_name if ath.user else ath.athlete_id
-        ranked.append({
-            "id": ath.athlete_id,
-            "name": name,
-            "score": _calculate_simple_score(ath),
-        })
-
-    ranked.sort(key=lambda r: r["score"], reverse=True)
-    return ranked[:limit]
-
-
 @api.route('/rankings/top')
 class TopRankings(Resource):
-    """Return the top 5 athlete rankings using a temporary formula."""
+    """Return the top athletes from the ranking snapshot."""
 
+    @api.doc(params={
+        'sport': 'Sport code, e.g. NBA',
+        'position': 'Position code within the sport, e.g. C',
+        'limit': 'Number of athletes to return (default 5, max 100)',
+    })
     def get(self):
-        rankings = _dynamic_rankings()
-        if rankings is None:
-            rankings = _load_rankings()
-        return jsonify(rankings)
+        sport = request.args.get('sport')
+        position = request.args.get('position')
+        try:
+            limit = max(1, min(int(request.args.get('limit', 5)), 100))
+        except ValueError:
+            abort(400, 'Invalid limit')
+
+        def build():
+            rankings = top_rankings(limit, sport=sport, position=position)
+            if rankings is None:
+                # The static list only makes sense for the unfiltered board.
+                rankings = [] if sport or position else _load_rankings()
+            return jsonify(rankings)
+
+        versions = _snapshot_versions()
+        if not versions[0][1]:
+            # An empty snapshot means rankings are scored live from stats.
+            return build()
+        return conditional_response(versions, build)
+
+
+@api.route('/rankings/leaderboard')
+class Leaderboard(Resource):
+    """Return a range of ranks from a sport or position leaderboard."""
+
+    @api.doc(params={
+        'sport': 'Sport code, e.g. NHL (required)',
+        'position': 'Position code within the sport, e.g. C',
+        'start': 'First rank to return, 1-based (default 1)',
+        'stop': 'Last rank to return, inclusive (default start + 49, at most 200 ranks)',
+    })
+    def get(self):
+        sport = request.args.get('sport')
+        if not sport:
+            abort(400, 'sport is required')
+        try:
+            start = max(1, int(request.args.get('start', 1)))
+            stop = int(request.args.get('stop', start + 49))
+        except ValueError:
+            abort(400, 'Invalid range')
+        stop = max(start, min(stop, start + 199))
+        position = request.args.get('position')
+        return conditional_response(
+            _snapshot_versions(),
+            lambda: jsonify(leaderboard_page(sport, position, start, stop)),
+        )
+
+
+@api.route('/rankings/athletes/<string:athlete_id>')
+class AthleteStanding(Resource):
+    """Return an athlete's rank within their sport and position."""
+
+    def get(self, athlete_id):
+        standing = athlete_standing(athlete_id)
+        if standing is None:
+            abort(404, 'Athlete is not ranked')
+        return jsonify(standing)
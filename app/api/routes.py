@@ -1,9 +1,10 @@
-from flask import request, send_file, abort, jsonify
+from flask import request, send_file, abort, jsonify, current_app
 from app.utils.validators import validate_json, validate_params
 from app.utils.auth import login_or_token_required
 from flask_restx import Resource
 import logging
-from sqlalchemy import or_
+import math
+from sqlalchemy import or_, select
 
 from app.api import api, bp
 from app import db
@@ -11,10 +12,6 @@ from app.models import (
     AthleteProfile,
     AthleteMedia,
     AthleteStat,
-    NBATeam,
-    NBAGame,
-    NHLTeam,
-    NHLGame,
     User,
     Position,
 )
@@ -25,7 +22,22 @@ from app.services.athlete_service import (
     update_athlete as update_athlete_service,
     delete_athlete as delete_athlete_service,
     list_athletes as list_athletes_service,
+    list_athletes_after as list_athletes_after_service,
+    ATHLETE_SORT_KEYS,
 )
+from app.services.comparison_service import MAX_COMPARE_ATHLETES, compare_athletes
+from app.services.distribution_service import athlete_percentiles, stat_percentile
+from app.services.schedule_service import SCHEDULES, count_team_games, team_schedule
+from app.services.stat_catalog_service import (
+    canonical_stat_name,
+    define_stat,
+    get_stat_catalog,
+    sport_of_stat_type,
+)
+from app.services.stat_service import upsert_athlete_stats
+from app.services.trend_service import DEFAULT_WINDOWS, MAX_WINDOW, athlete_trends
+from app.utils.conditional import conditional_response, row_versions
+from app.utils.pagination import keyset_paginate
 
 
 
@@ -36,6 +48,8 @@ class AthleteList(Resource):
     @api.doc(description="List athletes", params={
         'page': 'Page number',
         'per_page': 'Items per page',
+        'cursor': 'Opaque cursor from a previous response (cursor mode)',
+        'limit': 'Items per page in cursor mode',
         'q': 'Search term',
         'position': 'Filter by position name',
         'team': 'Filter by team name'
@@ -70,6 +84,19 @@ class AthleteList(Resource):
         if team:
             query = query.filter(AthleteProfile.current_team.ilike(f"%{team}%"))
 
+        if 'cursor' in request.args or 'limit' in request.args:
+            try:
+                athletes, next_cursor = keyset_paginate(
+                    query,
+                    ATHLETE_SORT_KEYS,
+                    cursor=request.args.get('cursor'),
+                    limit=request.args.get('limit', per_page, type=int),
+                )
+            except ValueError:
+                abort(400, 'Invalid cursor')
+            data = [a.to_dict() for a in athletes]
+            return jsonify({'items': data, 'next_cursor': next_cursor})
+
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         data = [a.to_dict() for a in pagination.items]
         return jsonify({'items': data, 'total': pagination.total})
@@ -91,6 +118,24 @@ class AthleteList(Resource):
         return jsonify(athlete.to_dict()), 201
 
 
+def _athlete_source(athlete_id):
+    return (
+        AthleteProfile,
+        AthleteProfile.athlete_id == athlete_id,
+        AthleteProfile.is_deleted.is_(False),
+    )
+
+
+def _stat_versions(athlete_id):
+    """Return validators for an athlete's stats, aborting 404 for unknown athletes."""
+    versions = row_versions(
+        _athlete_source(athlete_id), (AthleteStat, AthleteStat.athlete_id == athlete_id)
+    )
+    if not versions[0][1]:
+        abort(404)
+    return versions[1:]
+
+
 @api.route('/athletes/<string:athlete_id>')
 @api.param('athlete_id', 'Athlete identifier')
 class AthleteResource(Resource):
@@ -98,11 +143,20 @@ class AthleteResource(Resource):
 
     @api.doc(description="Get an athlete")
     def get(self, athlete_id):
-        athlete = (
-            AthleteProfile.query.filter_by(athlete_id=athlete_id, is_deleted=False)
-            .first_or_404()
+        owner = (
+            select(AthleteProfile.user_id)
+            .where(AthleteProfile.athlete_id == athlete_id)
+            .scalar_subquery()
+        )
+        versions = row_versions(
+            _athlete_source(athlete_id), (User, User.user_id == owner)
+        )
+        if not versions[0][1]:
+            abort(404)
+        return conditional_response(
+            versions,
+            lambda: jsonify(AthleteProfile.query.get(athlete_id).to_dict()),
         )
-        return jsonify(athlete.to_dict())
 
     @api.doc(description="Update an athlete")
     @login_or_token_required
@@ -140,9 +194,18 @@ class AthleteMediaList(Resource):
 
     @api.doc(description="List media for an athlete")
     def get(self, athlete_id):
-        AthleteProfile.query.filter_by(athlete_id=athlete_id, is_deleted=False).first_or_404()
-        media = AthleteMedia.query.filter_by(athlete_id=athlete_id).all()
-        return jsonify([m.to_dict() for m in media])
+        versions = row_versions(
+            _athlete_source(athlete_id),
+            (AthleteMedia, AthleteMedia.athlete_id == athlete_id),
+        )
+        if not versions[0][1]:
+            abort(404)
+
+        def build():
+            media = AthleteMedia.query.filter_by(athlete_id=athlete_id).all()
+            return jsonify([m.to_dict() for m in media])
+
+        return conditional_response(versions[1:], build)
 
     @api.doc(description="Upload a media file", params={'file': 'File upload', 'media_type': 'Type of media'})
     @login_or_token_required
@@ -195,6 +258,21 @@ class MediaDownload(Resource):
         return send_file(media.file_path, as_attachment=True, download_name=media.original_filename)
 
 
+def _list_arg(name):
+    """Return a query argument given as ``a,b`` or repeated, as a list."""
+    return [item for arg in request.args.getlist(name) for item in arg.split(',') if item]
+
+
+def _stat_definition(athlete, name, stat_type):
+    """Return the ``(stat_definition_id, name)`` a posted stat is stored under."""
+    athlete_sport = athlete.primary_sport.code if athlete.primary_sport else None
+    catalog = get_stat_catalog(db.session)
+    sport = sport_of_stat_type(stat_type)
+    if sport not in catalog.sports:
+        sport = athlete_sport
+    return catalog.resolve(name, sport) or define_stat(db.session, athlete_sport, name)
+
+
 @api.route('/athletes/<string:athlete_id>/stats')
 @api.param('athlete_id', 'Athlete identifier')
 class AthleteStats(Resource):
@@ -202,25 +280,31 @@ class AthleteStats(Resource):
 
     @api.doc(description="Get stats for an athlete")
     def get(self, athlete_id):
-        AthleteProfile.query.filter_by(athlete_id=athlete_id, is_deleted=False).first_or_404()
-        stats = AthleteStat.query.filter_by(athlete_id=athlete_id).all()
-        return jsonify([s.to_dict() for s in stats])
+        versions = _stat_versions(athlete_id)
+
+        def build():
+            stats = AthleteStat.query.filter_by(athlete_id=athlete_id).all()
+            return jsonify([s.to_dict() for s in stats])
+
+        return conditional_response(versions, build)
 
     @api.doc(description="Add or update a stat")
     @login_or_token_required
     @validate_json(['name'])
     def post(self, athlete_id):
-        AthleteProfile.query.filter_by(athlete_id=athlete_id, is_deleted=False).first_or_404()
+        athlete = AthleteProfile.query.filter_by(
+            athlete_id=athlete_id, is_deleted=False
+        ).first_or_404()
         data = request.get_json() or {}
         name = data.get('name')
         if not name:
             abort(400, 'Missing stat name')
         stat_type = data.get('stat_type')
         season = data.get('season')
+        definition_id, name = _stat_definition(athlete, name, stat_type)
         stat = AthleteStat.query.filter_by(
             athlete_id=athlete_id,
-            name=name,
-            stat_type=stat_type,
+            stat_definition_id=definition_id,
             season=season,
         ).first()
         if stat:
@@ -243,6 +327,34 @@ class AthleteStats(Resource):
         return jsonify(stat.to_dict())
 
 
+@api.route('/athletes/<string:athlete_id>/stats/bulk')
+@api.param('athlete_id', 'Athlete identifier')
+class AthleteStatsBulk(Resource):
+    """Add or update many athlete stats at once."""
+
+    @api.doc(description="Add or update stats in one transaction")
+    @login_or_token_required
+    @validate_json(['stats'])
+    def post(self, athlete_id):
+        athlete = AthleteProfile.query.filter_by(
+            athlete_id=athlete_id, is_deleted=False
+        ).first_or_404()
+        items = request.get_json()['stats']
+        if not isinstance(items, list):
+            abort(400, 'stats must be a list')
+        limit = current_app.config['STATS_BULK_LIMIT']
+        if len(items) > limit:
+            abort(400, f'At most {limit} stats per request')
+        try:
+            stats = upsert_athlete_stats(athlete, items)
+        except ValueError as exc:
+            abort(400, str(exc))
+        logging.getLogger(__name__).info(
+            "Upserted %d stats for athlete %s", len(stats), athlete_id
+        )
+        return jsonify([s.to_dict() for s in stats])
+
+
 @api.route('/athletes/<string:athlete_id>/stats/summary')
 @api.param('athlete_id', 'Athlete identifier')
 class AthleteStatsSummary(Resource):
@@ -250,13 +362,61 @@ class AthleteStatsSummary(Resource):
 
     @api.doc(description="Get aggregated stats for an athlete")
     def get(self, athlete_id):
-        AthleteProfile.query.filter_by(athlete_id=athlete_id, is_deleted=False).first_or_404()
-        stats = AthleteStat.query.filter_by(athlete_id=athlete_id).all()
-        summary = {}
-        for s in stats:
-            season = s.season or 'career'
-            summary.setdefault(season, {})[s.name] = s.value
-        return jsonify(summary)
+        versions = _stat_versions(athlete_id)
+
+        def build():
+            stats = AthleteStat.query.filter_by(athlete_id=athlete_id).all()
+            summary = {}
+            for s in stats:
+                season = s.season or 'career'
+                summary.setdefault(season, {})[s.name] = s.value
+            return jsonify(summary)
+
+        return conditional_response(versions, build)
+
+
+@api.route('/athletes/<string:athlete_id>/trends')
+@api.param('athlete_id', 'Athlete identifier')
+class AthleteTrends(Resource):
+    """Return per-game form trends for one of an athlete's stats."""
+
+    @api.doc(params={
+        'stat': 'Stat name (required)',
+        'window': 'Comma-separated rolling window sizes in games (default 5,10,20)',
+        'limit': 'Number of most recent games to return (default all)',
+    })
+    def get(self, athlete_id):
+        athlete = AthleteProfile.query.filter_by(
+            athlete_id=athlete_id, is_deleted=False
+        ).first_or_404()
+        stat = request.args.get('stat')
+        if not stat:
+            abort(400, 'stat is required')
+        try:
+            windows = sorted({int(w) for w in _list_arg('window')}) or list(DEFAULT_WINDOWS)
+            limit = request.args.get('limit', type=int)
+        except ValueError:
+            abort(400, 'Invalid window')
+        if windows[0] < 1 or windows[-1] > MAX_WINDOW:
+            abort(400, f'Windows must be between 1 and {MAX_WINDOW} games')
+        if limit is not None and limit < 1:
+            abort(400, 'Invalid limit')
+        sport = athlete.primary_sport.code if athlete.primary_sport else None
+        name = canonical_stat_name(db.session, stat, sport)
+        return jsonify(athlete_trends(athlete_id, name, windows, limit))
+
+
+@api.route('/athletes/<string:athlete_id>/percentiles')
+@api.param('athlete_id', 'Athlete identifier')
+class AthletePercentiles(Resource):
+    """Return where an athlete's stats fall within their sport and position."""
+
+    @api.doc(params={'season': 'Only stats of this season'})
+    def get(self, athlete_id):
+        athlete = AthleteProfile.query.filter_by(
+            athlete_id=athlete_id, is_deleted=False
+        ).first_or_404()
+        return jsonify(athlete_percentiles(athlete, request.args.get('season')))
 
 
 @api.route('/athletes/<string:athlete_id>/game-log')
@@ -279,70 +439,68 @@ class AthleteGameLog(Resource):
         page = request.args.get("page", type=int)
         per_page = request.args.get("per_page", type=int)
 
-        games_q = None
-        team = None
-        if code == "NBA":
-            team = NBATeam.query.filter(
-                (NBATeam.name.ilike(athlete.current_team))
-                | (NBATeam.full_name.ilike(athlete.current_team))
-                | (NBATeam.abbreviation.ilike(athlete.current_team))
-            ).first()
-            if team:
-                games_q = NBAGame.query.filter(
-                    (NBAGame.home_team_id == team.team_id)
-                    | (NBAGame.visitor_team_id == team.team_id)
-                )
-                if season:
-                    games_q = games_q.filter(NBAGame.season == int(season))
-                games_q = games_q.order_by(NBAGame.date.desc())
-        elif code == "NHL":
-            team = NHLTeam.query.filter(
-                (NHLTeam.name.ilike(athlete.current_team))
-                | (NHLTeam.location.ilike(athlete.current_team))
-                | (NHLTeam.abbreviation.ilike(athlete.current_team))
-            ).first()
-            if team:
-                games_q = NHLGame.query.filter(
-                    (NHLGame.home_team_id == team.team_id)
-                    | (NHLGame.visitor_team_id == team.team_id)
-                )
-                if season:
-                    games_q = games_q.filter(NHLGame.season == season)
-                games_q = games_q.order_by(NHLGame.date.desc())
-
-        if games_q is None:
+        team_id = athlete.current_team_id
+        if code not in SCHEDULES or team_id is None:
             return jsonify([])
 
         if page and per_page:
-            pagination = games_q.paginate(page=page, per_page=per_page, error_out=False)
-            games = pagination.items
-            total = pagination.total
-        else:
-            limit = per_page or 5
-            games = games_q.limit(limit).all()
-            total = len(games)
-
-        result = []
-        for g in games:
-            data = g.to_dict()
-            if hasattr(g, "home_team") and g.home_team:
-                data["home_team_name"] = g.home_team.full_name or g.home_team.name
-            if hasattr(g, "visitor_team") and g.visitor_team:
-                data["visitor_team_name"] = (
-                    g.visitor_team.full_name or g.visitor_team.name
-                )
-            if team:
-                data["is_home"] = g.home_team_id == team.team_id
-                if g.home_team_id == team.team_id:
-                    data["opponent_name"] = (
-                        g.visitor_team.full_name or g.visitor_team.name
-                    )
-                else:
-                    data["opponent_name"] = g.home_team.full_name or g.home_team.name
-            result.append(data)
+            games = team_schedule(
+                code, team_id, season, limit=per_page, offset=(max(page, 1) - 1) * per_page
+            )
+            total = count_team_games(code, team_id, season)
+            return jsonify({"items": games, "total": total})
+        return jsonify(team_schedule(code, team_id, season, limit=per_page or 5))
 
-        if page and per_page:
-            return jsonify({"items": result, "total": total})
+
+@api.route('/stats/compare')
+class StatComparison(Resource):
+    """Compare stats of several athletes side by side."""
+
+    @api.doc(params={
+        'ids': f'Comma-separated athlete ids (at most {MAX_COMPARE_ATHLETES})',
+        'season': 'Season to compare (default: each athlete\'s latest)',
+        'names': 'Comma-separated stat names to include (default: all)',
+    })
+    def get(self):
+        athlete_ids = _list_arg('ids')
+        if not athlete_ids:
+            abort(400, 'ids is required')
+        if len(set(athlete_ids)) > MAX_COMPARE_ATHLETES:
+            abort(400, f'At most {MAX_COMPARE_ATHLETES} athletes can be compared')
+        return jsonify(compare_athletes(
+            athlete_ids,
+            season=request.args.get('season'),
+            names=_list_arg('names'),
+        ))
+
+
+@api.route('/stats/percentile')
+class StatPercentile(Resource):
+    """Place a stat value within its sport or position."""
+
+    @api.doc(params={
+        'sport': 'Sport code, e.g. NBA (required)',
+        'stat': 'Stat name (required)',
+        'value': 'Value to place (required)',
+        'season': 'Season of the distribution',
+        'position': 'Position code within the sport, e.g. G',
+    })
+    def get(self):
+        sport = (request.args.get('sport') or '').upper()
+        stat = request.args.get('stat')
+        value = request.args.get('value', type=float)
+        if not sport or not stat or value is None or not math.isfinite(value):
+            abort(400, 'sport, stat and a finite numeric value are required')
+        position = request.args.get('position')
+        result = stat_percentile(
+            sport,
+            canonical_stat_name(db.session, stat, sport),
+            value,
+            season=request.args.get('season'),
+            position=position.upper() if position else None,
+        )
+        if result is None:
+            abort(404, 'No distribution for this stat')
         return jsonify(result)
 
 
@@ -394,6 +552,16 @@ def delete_athlete(athlete_id):
 def list_athletes():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
+    if 'cursor' in request.args or 'limit' in request.args:
+        try:
+            athletes, next_cursor = list_athletes_after_service(
+                request.args.get('cursor'),
+                request.args.get('limit', per_page, type=int),
+            )
+        except ValueError:
+            abort(400, 'Invalid cursor')
+        data = [a.to_dict() for a in athletes]
+        return jsonify({'items': data, 'next_cursor': next_cursor})
     pagination = list_athletes_service(page, per_page)
     data = [a.to_dict() for a in pagination.items]
     return jsonify({'items': data, 'total': pagination.total})
@@ -445,15 +613,14 @@ def download_media(media_id):
 @login_or_token_required
 @validate_json(['name'])
 def add_or_update_stat(athlete_id):
-    AthleteProfile.query.get_or_404(athlete_id)
+    athlete = AthleteProfile.query.get_or_404(athlete_id)
     data = request.get_json() or {}
-    name = data.get('name')
     stat_type = data.get('stat_type')
     season = data.get('season')
+    definition_id, name = _stat_definition(athlete, data.get('name'), stat_type)
     stat = AthleteStat.query.filter_by(
         athlete_id=athlete_id,
-        name=name,
-        stat_type=stat_type,
+        stat_definition_id=definition_id,
         season=season,
     ).first()
     if stat:
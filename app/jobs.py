@@ -1,9 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 import logging
 
+from flask import current_app
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
+
 from app import db
 from app.models import AthleteProfile, NBATeam, NHLTeam, SyncLog
 from app.services import nba_service, nfl_service, mlb_service, nhl_service
+from app.services.distribution_service import rebuild_stat_distributions
+from app.services.ranking_service import rebuild_rankings, refresh_dirty_rankings
 
 logger = logging.getLogger(__name__)
 
@@ -15,27 +21,70 @@ def _log_sync(job_name: str, success: bool, message: str = "") -> None:
     db.session.commit()
 
 
-def nightly_sync_games():
-    """Sync team lists and game results for the current season."""
-    year = date.today().year
+def run_concurrently(tasks, max_workers=None):
+    """Run ``tasks`` on a bounded thread pool and return the exceptions raised.
 
-    try:
-        nba_client = nba_service.NBAAPIClient()
-        nba_service.sync_teams(nba_client)
-        for team in NBATeam.query.all():
-            nba_service.sync_games(nba_client, team.team_id, season=year)
+    Each task runs in its own app context and therefore its own DB session,
+    which is removed when the task ends.
+    """
+    app = current_app._get_current_object()
+    max_workers = max_workers or app.config.get("SYNC_WORKERS", 4)
 
-        nhl_client = nhl_service.NHLAPIClient()
-        nhl_service.sync_teams(nhl_client)
-        for team in NHLTeam.query.all():
-            nhl_service.sync_games(nhl_client, team.team_id, season=str(year))
+    def run(task):
+        with app.app_context():
+            task()
+
+    if isinstance(db.engine.pool, (StaticPool, SingletonThreadPool)):
+        # In-memory SQLite: every session shares one connection, run in turn.
+        errors = []
+        for task in tasks:
+            try:
+                run(task)
+            except Exception as exc:
+                errors.append(exc)
+        return errors
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as pool:
+        futures = [pool.submit(run, task) for task in tasks]
+    return [future.exception() for future in futures if future.exception()]
+
+
+def _sync_nba_games(year):
+    client = nba_service.NBAAPIClient()
+    nba_service.sync_teams(client)
+    for team in NBATeam.query.all():
+        nba_service.sync_games(client, team.team_id, season=year)
+
+
+def _sync_nhl_games(year):
+    client = nhl_service.NHLAPIClient()
+    nhl_service.sync_teams(client)
+    for team in NHLTeam.query.all():
+        nhl_service.sync_games(client, team.team_id, season=str(year))
+
+
+def nightly_sync_games():
+    """Sync team lists and game results for the current season.
+
+    Providers have independent rate limits, so each one is synced by its own
+    worker and the job takes as long as the slowest provider. A provider's
+    teams share one client and are synced in order, so its rate limiter still
+    spaces every request and games listed by both teams are not written twice
+    at once.
+    """
+    year = date.today().year
 
+    errors = run_concurrently([
+        lambda: _sync_nba_games(year),
+        lambda: _sync_nhl_games(year),
+    ])
+    if errors:
+        for exc in errors:
+            logger.error("Nightly game sync failed: %s", exc, exc_info=exc)
+        _log_sync("nightly_sync_games", False, "; ".join(str(exc) for exc in errors))
+    else:
         logger.info("Nightly game sync complete")
         _log_sync("nightly_sync_games", True, "completed")
-    except Exception as exc:
-        logger.exception("Nightly game sync failed: %s", exc)
-        db.session.rollback()
-        _log_sync("nightly_sync_games", False, str(exc))
 
 
 def weekly_sync_player_stats():
@@ -67,6 +116,42 @@ def weekly_sync_player_stats():
         _log_sync("weekly_sync_player_stats", False, str(exc))
 
 
+def nightly_rebuild_rankings():
+    """Recompute the ranking snapshot from scratch."""
+    try:
+        rebuild_rankings()
+        logger.info("Ranking snapshot rebuilt")
+        _log_sync("nightly_rebuild_rankings", True, "completed")
+    except Exception as exc:
+        logger.exception("Ranking rebuild failed: %s", exc)
+        db.session.rollback()
+        _log_sync("nightly_rebuild_rankings", False, str(exc))
+
+
+def refresh_stale_rankings():
+    """Rescore the sports whose stats or ratings changed since the last run."""
+    try:
+        sports = refresh_dirty_rankings()
+        if sports:
+            logger.info("Rescored rankings for %s", ", ".join(sorted(sports)))
+    except Exception as exc:
+        logger.exception("Ranking refresh failed: %s", exc)
+        db.session.rollback()
+        _log_sync("refresh_stale_rankings", False, str(exc))
+
+
+def nightly_rebuild_stat_distributions():
+    """Recompute the stat percentile distributions."""
+    try:
+        count = rebuild_stat_distributions()
+        logger.info("Rebuilt %d stat distributions", count)
+        _log_sync("nightly_rebuild_stat_distributions", True, f"distributions: {count}")
+    except Exception as exc:
+        logger.exception("Stat distribution rebuild failed: %s", exc)
+        db.session.rollback()
+        _log_sync("nightly_rebuild_stat_distributions", False, str(exc))
+
+
 def historical_backfill_stats(seasons=None, num_seasons: int = 3):
     """Backfill historical stats for tracked athletes and teams."""
     if seasons is None:
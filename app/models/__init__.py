@@ -4,22 +4,26 @@ from .oauth import UserOAuthAccount
 from .sport import Sport, Position
 from .athlete import AthleteProfile
 from .media import AthleteMedia
-from .stats import AthleteStat, SeasonStat, GameStat
+from .stats import AthleteStat, SeasonStat, GameStat, StatDefinition, StatDistribution
 from .skill import AthleteSkill
 
 __all__ = [
     'User', 'Role', 'UserRole',
     'UserOAuthAccount', 'Sport', 'Position',
     'AthleteProfile', 'AthleteMedia', 'AthleteStat',
-    'SeasonStat', 'GameStat',
+    'SeasonStat', 'GameStat', 'StatDefinition', 'StatDistribution',
     'AthleteSkill',
 ]
 
-from .team import Team, NBATeam, MLBTeam, NFLTeam, NHLTeam
-from .game import Game, NBAGame, NHLGame
+from .team import Team, NBATeam, MLBTeam, NFLTeam, NHLTeam, TeamAlias
+from .game import Game, NBAGame, NHLGame, TeamGame
 
-__all__.extend(['Team', 'Game', 'NBATeam', 'NBAGame', 'MLBTeam', 'NFLTeam', 'NHLTeam', 'NHLGame'])
+__all__.extend(['Team', 'Game', 'NBATeam', 'NBAGame', 'MLBTeam', 'NFLTeam', 'NHLTeam', 'NHLGame', 'TeamAlias', 'TeamGame'])
 
-from .sync_log import SyncLog
+from .sync_log import SyncLog, SyncPayload
 
-__all__.append('SyncLog')
+__all__.extend(['SyncLog', 'SyncPayload'])
+
+from .ranking import AthleteRanking, RankingDirty
+
+__all__.extend(['AthleteRanking', 'RankingDirty'])
@@ -1,6 +1,8 @@
 from app import db
 from app.models.base import BaseModel
 from enum import Enum
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 import uuid
 
 class AthleteStatus(Enum):
@@ -32,6 +34,8 @@ class AthleteProfile(BaseModel):
     professional_debut_date = db.Column(db.Date)
     years_professional = db.Column(db.Integer)
     current_team = db.Column(db.String(100))
+    # Provider team id resolved from ``current_team`` on write; see team_service.
+    current_team_id = db.Column(db.Integer)
     jersey_number = db.Column(db.String(5))
     contract_active = db.Column(db.Boolean, default=True)
     
@@ -44,7 +48,8 @@ class AthleteProfile(BaseModel):
     is_featured = db.Column(db.Boolean, default=False)
     
     # Search and ranking
-    search_vector = db.Column(db.Text)  # For full-text search
+    # Full-text document maintained by app.services.search_service
+    search_vector = deferred(db.Column(db.Text().with_variant(TSVECTOR(), 'postgresql')))
     overall_rating = db.Column(db.Numeric(4, 2))  # 0.00 to 99.99
     
     # Relationships
@@ -61,7 +66,13 @@ class AthleteProfile(BaseModel):
         db.Index('idx_athletes_sport_position', 'primary_sport_id', 'primary_position_id'),
         db.Index('idx_athletes_status_verified', 'career_status', 'is_verified'),
         db.Index('idx_athletes_deleted', 'is_deleted'),
-        db.Index('idx_athletes_search', 'search_vector'),  # For full-text search
+        db.Index('idx_athletes_search', 'search_vector', postgresql_using='gin'),
+        # Keyset pagination key; see app.services.athlete_service.ATHLETE_SORT_KEYS
+        db.Index(
+            'idx_athletes_rating_keyset',
+            db.func.coalesce(overall_rating, db.literal_column('0')),
+            'athlete_id',
+        ),
     )
     
     @property
@@ -80,7 +91,13 @@ class AthleteProfile(BaseModel):
 
     def to_dict(self):
         """Return a dict representation including related user."""
-        data = super().to_dict()
+        data = {
+            column.name: getattr(self, column.name)
+            for column in self.__table__.columns
+            if column.name != 'search_vector'
+        }
+        if self.career_status is not None:
+            data['career_status'] = self.career_status.value
         if self.user:
             data['user'] = self.user.to_dict()
         return data
@@ -74,3 +74,38 @@ class NHLGame(BaseModel):
 
     def __repr__(self):
         return f'<NHLGame {self.game_id}>'
+
+
+class TeamGame(db.Model):
+    """One game seen from one side: a row per team per NBA or NHL game.
+
+    Rows are derived data maintained by ``app.services.schedule_service``
+    whenever provider games are written, so a team's schedule is a single
+    range of ``idx_team_games_schedule`` with the opponent's name inlined.
+    """
+
+    __tablename__ = 'team_games'
+
+    sport = db.Column(db.String(10), primary_key=True)
+    team_id = db.Column(db.Integer, primary_key=True)
+    game_id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date)
+    season = db.Column(db.String(10))
+    is_home = db.Column(db.Boolean, nullable=False)
+    opponent_id = db.Column(db.Integer)
+    opponent_name = db.Column(db.String(100))
+    team_score = db.Column(db.Integer)
+    opponent_score = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index(
+            'idx_team_games_schedule',
+            'sport',
+            'team_id',
+            db.desc('season'),
+            db.desc('date'),
+        ),
+    )
+
+    def __repr__(self):
+        return f'<TeamGame {self.sport} {self.team_id} {self.game_id}>'
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from app import db
+
+
+class AthleteRanking(db.Model):
+    """Precomputed ranking snapshot row for one athlete.
+
+    Rows are derived data maintained by ``app.services.ranking_service``;
+    ``sport_rank`` orders athletes within their primary sport and ``rank``
+    orders every ranked athlete as of the last full rebuild.
+    """
+
+    __tablename__ = 'athlete_rankings'
+
+    athlete_id = db.Column(
+        db.String(36),
+        db.ForeignKey('athlete_profiles.athlete_id', ondelete='CASCADE'),
+        primary_key=True,
+    )
+    sport_id = db.Column(db.Integer, db.ForeignKey('sports.sport_id'))
+    score = db.Column(db.Float, nullable=False)
+    rank = db.Column(db.Integer)
+    sport_rank = db.Column(db.Integer)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    athlete = db.relationship('AthleteProfile')
+    sport = db.relationship('Sport')
+
+    __table_args__ = (
+        db.Index('idx_rankings_rank', 'rank'),
+        db.Index('idx_rankings_sport_rank', 'sport_id', 'sport_rank'),
+        db.Index('idx_rankings_score', score.desc(), 'athlete_id'),
+    )
+
+    def __repr__(self):
+        return f'<AthleteRanking {self.athlete_id} #{self.rank}>'
+
+
+class RankingDirty(db.Model):
+    """Sport whose ranking snapshot is out of date.
+
+    Writers append a row in their own transaction; the scheduled
+    ``refresh_dirty_rankings`` job rescores the sports and deletes the rows.
+    A ``NULL`` ``sport_id`` stands for athletes without a primary sport.
+    """
+
+    __tablename__ = 'ranking_dirty'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    sport_id = db.Column(
+        db.Integer, db.ForeignKey('sports.sport_id', ondelete='CASCADE')
+    )
+    marked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<RankingDirty sport={self.sport_id}>'
@@ -1,30 +1,104 @@
 from app import db
 from app.models.base import BaseModel
+from sqlalchemy.orm import validates
+from datetime import datetime
+import math
+import re
 import uuid
 
-class AthleteStat(BaseModel):
+_NUMBER = re.compile(r'^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)\s*$')
+
+
+def parse_stat_value(value):
+    """Return ``value`` as a float, or ``None`` when it is not a plain number."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, str) and _NUMBER.match(value):
+        return float(value)
+    return None
+
+
+class StatValueMixin:
+    """Keeps ``numeric_value`` in step with the text ``value`` of a stat.
+
+    ``value`` holds the stat as reported (e.g. ".305" or "12-4");
+    ``numeric_value`` is the same figure as a float, or NULL for text that is
+    not a plain number, so stats can be filtered, sorted and aggregated in SQL.
+    """
+
+    value = db.Column(db.String(100))
+    numeric_value = db.Column(db.Float)
+
+    @validates('value')
+    def _set_numeric_value(self, key, value):
+        self.numeric_value = parse_stat_value(value)
+        return value
+
+
+class StatDefinition(db.Model):
+    """Catalog entry for one stat of one sport.
+
+    Stat rows are keyed by ``stat_definition_id`` and carry the canonical
+    ``name`` for display; ``aliases`` lists the other spellings providers
+    and clients use (e.g. "PPG" for "PointsPerGame").
+    """
+
+    __tablename__ = 'stat_definitions'
+
+    # SQLite only auto-increments INTEGER primary keys.
+    stat_definition_id = db.Column(
+        db.SmallInteger().with_variant(db.Integer(), 'sqlite'), primary_key=True
+    )
+    sport = db.Column(db.String(10), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    aliases = db.Column(db.JSON, nullable=False, default=list)
+    unit = db.Column(db.String(20))
+    higher_is_better = db.Column(db.Boolean, nullable=False, default=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('sport', 'name', name='uq_stat_definition_sport_name'),
+    )
+
+    def __repr__(self):
+        return f'<StatDefinition {self.sport} {self.name}>'
+
+
+class AthleteStat(StatValueMixin, BaseModel):
     __tablename__ = 'athlete_stats'
 
     stat_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     athlete_id = db.Column(db.String(36), db.ForeignKey('athlete_profiles.athlete_id', ondelete='CASCADE'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
-    value = db.Column(db.String(100))
+    stat_definition_id = db.Column(
+        db.SmallInteger, db.ForeignKey('stat_definitions.stat_definition_id'), nullable=False
+    )
     stat_type = db.Column(db.String(100))
     season = db.Column(db.String(20))
 
     athlete = db.relationship('AthleteProfile', backref='stats')
 
     __table_args__ = (
+        # Coalesced so that stats without a season also collide.
+        db.Index(
+            'uq_athlete_stat_key',
+            'athlete_id',
+            'stat_definition_id',
+            db.func.coalesce(season, db.literal_column("''")),
+            unique=True,
+        ),
         db.Index('idx_stats_athlete', 'athlete_id'),
         db.Index('idx_stats_season', 'season'),
         db.Index('idx_stats_athlete_season', 'athlete_id', 'season'),
+        db.Index('idx_stats_definition_value', 'stat_definition_id', 'numeric_value'),
     )
 
     def __repr__(self):
         return f'<AthleteStat {self.stat_id}>'
 
 
-class SeasonStat(BaseModel):
+class SeasonStat(StatValueMixin, BaseModel):
     """Aggregated stats for a player during a specific season."""
 
     __tablename__ = 'season_stats'
@@ -37,7 +111,13 @@ class SeasonStat(BaseModel):
     team_id = db.Column(db.Integer, db.ForeignKey('teams.team_id'))
     season = db.Column(db.String(10), nullable=False)
     name = db.Column(db.String(100), nullable=False)
-    value = db.Column(db.String(100))
+    stat_definition_id = db.Column(
+        db.SmallInteger, db.ForeignKey('stat_definitions.stat_definition_id'), nullable=False
+    )
+    # Running sum and count of the athlete's numeric game stats this season;
+    # NULL for rows that were not rolled up from ``game_stats``.
+    total = db.Column(db.Float)
+    game_count = db.Column(db.Integer)
 
     athlete = db.relationship('AthleteProfile')
     sport = db.relationship('Sport')
@@ -47,20 +127,21 @@ class SeasonStat(BaseModel):
         db.UniqueConstraint(
             'athlete_id',
             'season',
-            'name',
-            name='uq_season_stat_player_season_name',
+            'stat_definition_id',
+            name='uq_season_stat_player_season_stat',
         ),
         db.Index('idx_season_stats_athlete', 'athlete_id'),
         db.Index('idx_season_stats_season', 'season'),
         db.Index('idx_season_stats_team', 'team_id'),
         db.Index('idx_season_stats_athlete_season', 'athlete_id', 'season'),
+        db.Index('idx_season_stats_definition_value', 'stat_definition_id', 'numeric_value'),
     )
 
     def __repr__(self):
         return f'<SeasonStat {self.season_stat_id}>'
 
 
-class GameStat(BaseModel):
+class GameStat(StatValueMixin, BaseModel):
     """Per-game statistics for an athlete."""
 
     __tablename__ = 'game_stats'
@@ -71,7 +152,9 @@ class GameStat(BaseModel):
     )
     game_id = db.Column(db.Integer, db.ForeignKey('games.game_id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
-    value = db.Column(db.String(100))
+    stat_definition_id = db.Column(
+        db.SmallInteger, db.ForeignKey('stat_definitions.stat_definition_id'), nullable=False
+    )
 
     athlete = db.relationship('AthleteProfile')
     game = db.relationship('Game')
@@ -80,7 +163,7 @@ class GameStat(BaseModel):
         db.UniqueConstraint(
             'athlete_id',
             'game_id',
-            'name',
+            'stat_definition_id',
             name='uq_game_stat_unique',
         ),
         db.Index('idx_game_stats_game', 'game_id'),
@@ -90,3 +173,33 @@ class GameStat(BaseModel):
 
     def __repr__(self):
         return f'<GameStat {self.game_stat_id}>'
+
+
+class StatDistribution(db.Model):
+    """Distribution of one stat across a sport, or one of its positions, in a season.
+
+    Rows are derived data maintained by ``app.services.distribution_service``.
+    ``quantiles`` holds the athletes' values sorted ascending as float64
+    bytes; when ``sample_size`` exceeds the stored points it holds evenly
+    spaced quantiles instead. ``position_id`` is NULL for the whole sport and
+    ``season`` is NULL for stats reported without one.
+    """
+
+    __tablename__ = 'stat_distributions'
+
+    distribution_id = db.Column(db.Integer, primary_key=True)
+    sport_id = db.Column(db.Integer, db.ForeignKey('sports.sport_id', ondelete='CASCADE'), nullable=False)
+    position_id = db.Column(db.Integer, db.ForeignKey('positions.position_id', ondelete='CASCADE'))
+    name = db.Column(db.String(100), nullable=False)
+    season = db.Column(db.String(20))
+    sample_size = db.Column(db.Integer, nullable=False)
+    higher_is_better = db.Column(db.Boolean, nullable=False, default=True)
+    quantiles = db.Column(db.LargeBinary, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_stat_distributions_lookup', 'sport_id', 'name', 'season'),
+    )
+
+    def __repr__(self):
+        return f'<StatDistribution {self.sport_id} {self.position_id} {self.name} {self.season}>'
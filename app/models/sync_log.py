@@ -11,3 +11,19 @@ class SyncLog(BaseModel):
 
     def __repr__(self):
         return f'<SyncLog {self.job_name} {self.success}>'
+
+
+class SyncPayload(BaseModel):
+    """Fingerprint of the provider payload a sync last wrote.
+
+    Stored in the same transaction as the sync's writes, so a restored or
+    reset database also forgets what it has applied.
+    """
+
+    __tablename__ = 'sync_payloads'
+
+    name = db.Column(db.String(200), primary_key=True)
+    digest = db.Column(db.String(40), nullable=False)
+
+    def __repr__(self):
+        return f'<SyncPayload {self.name}>'
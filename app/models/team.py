@@ -92,3 +92,22 @@ class NHLTeam(BaseModel):
 
     def __repr__(self):
         return f'<NHLTeam {self.name}>'
+
+
+class TeamAlias(db.Model):
+    """Normalized name that identifies a provider team within one sport.
+
+    Rows are derived data maintained by ``app.services.team_service`` from
+    the NBA, MLB, NFL and NHL team tables. Aliases are never removed when a
+    team is renamed, so historical names keep resolving to the same team. An
+    alias shared by several teams of a sport (e.g. a city) resolves to none.
+    """
+
+    __tablename__ = 'team_aliases'
+
+    sport = db.Column(db.String(10), primary_key=True)
+    alias = db.Column(db.String(150), primary_key=True)
+    team_id = db.Column(db.Integer, primary_key=True)
+
+    def __repr__(self):
+        return f'<TeamAlias {self.sport} {self.alias!r} -> {self.team_id}>'
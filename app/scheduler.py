@@ -1,5 +1,6 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
 from flask import Flask
 
@@ -21,6 +22,14 @@ def init_scheduler(app: Flask) -> BackgroundScheduler:
         _job(jobs.weekly_sync_player_stats),
         CronTrigger(day_of_week="sun", hour=3),
     )
+    scheduler.add_job(_job(jobs.nightly_rebuild_rankings), CronTrigger(hour=4))
+    scheduler.add_job(
+        _job(jobs.refresh_stale_rankings),
+        IntervalTrigger(seconds=app.config.get("RANKING_REFRESH_SECONDS", 60)),
+    )
+    scheduler.add_job(
+        _job(jobs.nightly_rebuild_stat_distributions), CronTrigger(hour=4, minute=30)
+    )
 
     scheduler.start()
     return scheduler
@@ -4,3 +4,16 @@ from .nba_service import *  # noqa
 from .mlb_service import *  # noqa
 from .nfl_service import *  # noqa
 from .nhl_service import *  # noqa
+from .search_service import *  # noqa
+from .stat_catalog_service import *  # noqa
+from .autocomplete_service import *  # noqa
+from .team_service import *  # noqa
+from .schedule_service import *  # noqa
+from .leaderboard_service import *  # noqa
+from .ranking_service import *  # noqa
+from .featured_service import *  # noqa
+from .stat_service import *  # noqa
+from .comparison_service import *  # noqa
+from .trend_service import *  # noqa
+from .rollup_service import *  # noqa
+from .distribution_service import *  # noqa
@@ -1,6 +1,21 @@
-from app import db
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, literal_column
+
+from app import cache, db
 from app.models import AthleteProfile
-from app.utils.pagination import paginate_query
+from app.utils.cache import invalidate_on_write
+from app.utils.pagination import keyset_paginate, paginate_query
+
+KPI_CACHE_TAG = "athlete_kpis"
+
+# Cursor pagination order: rating (unrated athletes last), then id as a
+# tie-breaker. Matches the idx_athletes_rating_keyset expression index.
+ATHLETE_SORT_KEYS = (
+    func.coalesce(AthleteProfile.overall_rating, literal_column('0')),
+    AthleteProfile.athlete_id,
+)
 
 
 def create_athlete(data):
@@ -52,3 +67,47 @@ def list_athletes(page=1, per_page=10):
     """Return a pagination object of non-deleted athletes."""
     query = AthleteProfile.query.filter_by(is_deleted=False)
     return paginate_query(query, page=page, per_page=per_page)
+
+
+def list_athletes_after(cursor=None, limit=10):
+    """Return ``(athletes, next_cursor)`` for one keyset page of athletes."""
+    query = AthleteProfile.query.filter_by(is_deleted=False)
+    return keyset_paginate(query, ATHLETE_SORT_KEYS, cursor=cursor, limit=limit)
+
+
+def _compute_kpis():
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    counted = func.count(AthleteProfile.athlete_id)
+    total, active, new = (
+        db.session.query(
+            counted,
+            counted.filter(AthleteProfile.contract_active.is_(True)),
+            counted.filter(AthleteProfile.created_at >= week_ago),
+        )
+        .filter(AthleteProfile.is_deleted.is_(False))
+        .one()
+    )
+    return {
+        "total_athletes": total or 0,
+        "active_contracts": active or 0,
+        "new_this_week": new or 0,
+    }
+
+
+def dashboard_kpis():
+    """Return roster KPIs for the dashboard, computed in one aggregate query.
+
+    Results are cached for ``KPI_CACHE_TIMEOUT`` seconds and dropped as soon
+    as an athlete is added, removed or changes contract status.
+    """
+    return cache.get_or_set(
+        "dashboard_kpis",
+        _compute_kpis,
+        tags=[KPI_CACHE_TAG],
+        timeout=current_app.config.get("KPI_CACHE_TIMEOUT"),
+    )
+
+
+invalidate_on_write(
+    AthleteProfile, KPI_CACHE_TAG, fields=("is_deleted", "contract_active", "created_at")
+)
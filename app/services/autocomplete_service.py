@@ -0,0 +1,324 @@
+"""In-process prefix index for athlete and team type-ahead.
+
+The index keeps every searchable term in one sorted list, so a prefix lookup
+is a binary search followed by a short forward scan and never touches the
+database. Each worker builds its own index lazily on the first lookup. Model
+listeners capture the rows written in a transaction and apply them to the
+index once it commits, and the whole index is rebuilt every
+``AUTOCOMPLETE_REFRESH_SECONDS`` to pick up writes made by other processes.
+"""
+import bisect
+import threading
+import time
+import unicodedata
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import (
+    AthleteProfile,
+    MLBTeam,
+    NBATeam,
+    NFLTeam,
+    NHLTeam,
+    Sport,
+    Team,
+    User,
+)
+
+MAX_AUTOCOMPLETE_RESULTS = 25
+
+_PENDING = "pending_autocomplete"
+# Held while a worker rebuilds its index, so only one request does it.
+_build_lock = threading.Lock()
+
+_athletes = AthleteProfile.__table__
+_users = User.__table__
+_sports = Sport.__table__
+
+# Provider team tables: (model, sport code, label column, extra term columns).
+_TEAM_SOURCES = [
+    (NBATeam, "NBA", "full_name", ("name", "city", "abbreviation")),
+    (MLBTeam, "MLB", "name", ("location", "abbreviation")),
+    (NFLTeam, "NFL", "name", ("city", "abbreviation")),
+    (NHLTeam, "NHL", "name", ("location", "abbreviation")),
+]
+
+
+def normalize(text):
+    """Lower-case ``text`` and strip accents so "Dončić" matches "doncic"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+
+
+def _word_suffixes(text):
+    # "golden state warriors" -> itself, "state warriors", "warriors"
+    words = normalize(text).split()
+    return {" ".join(words[i:]) for i in range(len(words))}
+
+
+class PrefixIndex:
+    """Sorted-array prefix index mapping terms to labelled entries."""
+
+    def __init__(self):
+        self._terms = []
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for term in entry[0]:
+            i = bisect.bisect_left(self._terms, (term, key))
+            if i < len(self._terms) and self._terms[i] == (term, key):
+                del self._terms[i]
+
+    def put(self, key, texts, payload):
+        """Index ``payload`` under every word suffix of ``texts``, replacing ``key``."""
+        terms = set()
+        for text in texts:
+            terms |= _word_suffixes(text)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (terms, payload)
+            for term in terms:
+                bisect.insort(self._terms, (term, key))
+
+    def remove(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def load(self, items):
+        """Replace the whole index with ``(key, texts, payload)`` items."""
+        entries = {}
+        terms = []
+        for key, texts, payload in items:
+            entry_terms = set()
+            for text in texts:
+                entry_terms |= _word_suffixes(text)
+            entries[key] = (entry_terms, payload)
+            terms.extend((term, key) for term in entry_terms)
+        terms.sort()
+        with self._lock:
+            self._terms = terms
+            self._entries = entries
+            self.built_at = time.monotonic()
+
+    def search(self, prefix, limit=10):
+        """Return up to ``limit`` payloads with a term starting with ``prefix``.
+
+        Matches are returned in term order, so shorter and alphabetically
+        earlier completions come first.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self._lock:
+            i = bisect.bisect_left(self._terms, (prefix,))
+            while i < len(self._terms) and len(results) < limit:
+                term, key = self._terms[i]
+                if not term.startswith(prefix):
+                    break
+                if key not in seen:
+                    seen.add(key)
+                    results.append(self._entries[key][1])
+                i += 1
+        return results
+
+
+def _athlete_item(row):
+    name = " ".join(p for p in (row.first_name, row.last_name) if p)
+    payload = {
+        "type": "athlete",
+        "id": row.athlete_id,
+        "label": name,
+        "team": row.current_team,
+    }
+    return ("athlete", row.athlete_id), [name, row.current_team], payload
+
+
+def _athlete_rows(connection, criterion):
+    return connection.execute(
+        select(
+            _athletes.c.athlete_id,
+            _athletes.c.current_team,
+            _athletes.c.is_deleted,
+            _users.c.first_name,
+            _users.c.last_name,
+        )
+        .select_from(_athletes.join(_users, _users.c.user_id == _athletes.c.user_id))
+        .where(criterion)
+    )
+
+
+def _team_item(model, sport, label, extra, team_id):
+    payload = {"type": "team", "id": team_id, "label": label, "sport": sport}
+    return ("team", model.__tablename__, team_id), [label, *extra], payload
+
+
+def _team_rows(connection):
+    teams = Team.__table__
+    rows = connection.execute(
+        select(teams.c.team_id, teams.c.name, teams.c.city, teams.c.abbreviation, _sports.c.code)
+        .select_from(teams.join(_sports, _sports.c.sport_id == teams.c.sport_id))
+    )
+    for row in rows:
+        yield _team_item(Team, row.code, row.name, (row.city, row.abbreviation), row.team_id)
+
+    for model, sport, label_col, extra_cols in _TEAM_SOURCES:
+        table = model.__table__
+        columns = [table.c.team_id, table.c[label_col], *(table.c[c] for c in extra_cols)]
+        for row in connection.execute(select(*columns)):
+            label = row[1] or (row[2] if extra_cols else None)
+            if label:
+                yield _team_item(model, sport, label, row[2:], row.team_id)
+
+
+def _build_items(connection):
+    for row in _athlete_rows(connection, _athletes.c.is_deleted.isnot(True)):
+        yield _athlete_item(row)
+    yield from _team_rows(connection)
+
+
+def get_index():
+    """Return this worker's index for the current app, building it if needed.
+
+    Only one request rebuilds a stale index; the others keep searching the
+    old one meanwhile. Requests arriving before the first build wait for it.
+    """
+    index = current_app.extensions.setdefault("autocomplete_index", PrefixIndex())
+    max_age = current_app.config.get("AUTOCOMPLETE_REFRESH_SECONDS", 600)
+
+    def stale():
+        return index.built_at is None or time.monotonic() - index.built_at > max_age
+
+    if stale() and _build_lock.acquire(blocking=index.built_at is None):
+        try:
+            if stale():
+                with db.engine.connect() as connection:
+                    index.load(list(_build_items(connection)))
+        finally:
+            _build_lock.release()
+    return index
+
+
+def autocomplete(prefix, limit=10):
+    """Return athletes and teams whose names start with ``prefix``."""
+    limit = max(1, min(limit, MAX_AUTOCOMPLETE_RESULTS))
+    return get_index().search(prefix, limit)
+
+
+def _queue(session, key, item):
+    """Record the new state of ``key`` (``None`` to remove) for the next commit."""
+    if session is not None:
+        session.info.setdefault(_PENDING, {})[key] = item
+
+
+def _queue_athletes(connection, session, criterion):
+    for row in _athlete_rows(connection, criterion):
+        key, texts, payload = _athlete_item(row)
+        _queue(session, key, None if row.is_deleted else (texts, payload))
+
+
+def queue_teams(connection, session, model, team_ids):
+    """Queue the index entries of provider teams written without the ORM.
+
+    Core upserts skip the team listeners below, so the sync calls this with
+    the ids it wrote; the entries reach the index when the session commits.
+    """
+    _, sport, label_col, extra_cols = next(s for s in _TEAM_SOURCES if s[0] is model)
+    table = model.__table__
+    columns = [table.c.team_id, table.c[label_col], *(table.c[c] for c in extra_cols)]
+    for row in connection.execute(select(*columns).where(table.c.team_id.in_(team_ids))):
+        label = row[1] or row[2]
+        key, texts, payload = _team_item(model, sport, label, row[2:], row.team_id)
+        _queue(session, key, (texts, payload) if label else None)
+
+
+def _has_changes(target, fields):
+    state = inspect(target)
+    return any(state.attrs[name].history.has_changes() for name in fields)
+
+
+@event.listens_for(AthleteProfile, "after_insert")
+def _athlete_inserted(mapper, connection, target):
+    _queue_athletes(
+        connection, object_session(target), _athletes.c.athlete_id == target.athlete_id
+    )
+
+
+@event.listens_for(AthleteProfile, "after_update")
+def _athlete_updated(mapper, connection, target):
+    if _has_changes(target, ("user_id", "current_team", "is_deleted")):
+        _queue_athletes(
+            connection,
+            object_session(target),
+            _athletes.c.athlete_id == target.athlete_id,
+        )
+
+
+@event.listens_for(AthleteProfile, "after_delete")
+def _athlete_deleted(mapper, connection, target):
+    _queue(object_session(target), ("athlete", target.athlete_id), None)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    if _has_changes(target, ("first_name", "last_name")):
+        _queue_athletes(
+            connection, object_session(target), _athletes.c.user_id == target.user_id
+        )
+
+
+def _listen_team(model, sport, label_col, extra_cols):
+    def _written(mapper, connection, target):
+        code = sport
+        if code is None:
+            code = connection.scalar(
+                select(_sports.c.code).where(_sports.c.sport_id == target.sport_id)
+            )
+        label = getattr(target, label_col) or getattr(target, extra_cols[0])
+        extra = [getattr(target, c) for c in extra_cols]
+        key, texts, payload = _team_item(model, code, label, extra, target.team_id)
+        _queue(object_session(target), key, (texts, payload) if label else None)
+
+    def _deleted(mapper, connection, target):
+        _queue(object_session(target), ("team", model.__tablename__, target.team_id), None)
+
+    event.listen(model, "after_insert", _written)
+    event.listen(model, "after_update", _written)
+    event.listen(model, "after_delete", _deleted)
+
+
+_listen_team(Team, None, "name", ("city", "abbreviation"))
+for _source in _TEAM_SOURCES:
+    _listen_team(*_source)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    changes = session.info.pop(_PENDING, None)
+    if not changes or not has_app_context():
+        return
+    index = current_app.extensions.get("autocomplete_index")
+    if index is None or index.built_at is None:
+        return
+    for key, item in changes.items():
+        if item is None:
+            index.remove(key)
+        else:
+            index.put(key, *item)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,144 @@
+"""Side-by-side stat comparison of several athletes.
+
+``compare_athletes`` returns an athletes x stats matrix built by one query:
+a window picks each athlete's latest row per stat definition (or the row
+of the requested season), and window aggregates over that selection add
+each column's minimum, maximum and every cell's percentile within the
+compared group. Percentiles follow the stat definition's ``higher_is_better`` so a
+low ERA ranks high. Results are cached per athlete set, season and stat
+names until a stat is written.
+"""
+import sqlalchemy as sa
+from flask import current_app
+from sqlalchemy import func, select
+
+from app import cache, db
+from app.models import AthleteProfile, AthleteStat, StatDefinition
+from app.services.stat_catalog_service import canonical_stat_name, stat_ids
+from app.utils.cache import invalidate_on_write
+
+COMPARE_CACHE_TAG = "stat_compare"
+MAX_COMPARE_ATHLETES = 20
+
+_stats = AthleteStat.__table__
+_athletes = AthleteProfile.__table__
+_definitions = StatDefinition.__table__
+
+
+def _comparison_rows(athlete_ids, season, names):
+    criteria = [
+        _stats.c.athlete_id.in_(athlete_ids),
+        _athletes.c.is_deleted.is_(False),
+    ]
+    if season:
+        criteria.append(_stats.c.season == season)
+    if names:
+        definition_ids = set()
+        for name in names:
+            definition_ids |= stat_ids(db.session, name)
+        criteria.append(_stats.c.stat_definition_id.in_(definition_ids))
+    latest = (
+        select(
+            _stats.c.athlete_id,
+            _stats.c.season,
+            _stats.c.value,
+            _stats.c.numeric_value,
+            _stats.c.stat_definition_id,
+            func.row_number()
+            .over(
+                partition_by=(_stats.c.athlete_id, _stats.c.stat_definition_id),
+                order_by=(_stats.c.season.desc().nulls_last(), _stats.c.updated_at.desc()),
+            )
+            .label("season_order"),
+        )
+        .join(_athletes, _athletes.c.athlete_id == _stats.c.athlete_id)
+        .where(*criteria)
+        .subquery()
+    )
+    higher = _definitions.c.higher_is_better
+    number = latest.c.numeric_value
+    column = latest.c.stat_definition_id
+    return db.session.execute(
+        select(
+            latest.c.athlete_id,
+            _definitions.c.name,
+            latest.c.season,
+            latest.c.value,
+            number,
+            higher,
+            func.min(number).over(partition_by=column).label("low"),
+            func.max(number).over(partition_by=column).label("high"),
+            func.percent_rank()
+            .over(
+                # Text values get their own partition so they do not shift ranks.
+                partition_by=(column, number.is_(None)),
+                order_by=sa.case((higher, number), else_=-number),
+            )
+            .label("percent_rank"),
+        )
+        .join(
+            _definitions,
+            _definitions.c.stat_definition_id == latest.c.stat_definition_id,
+        )
+        .where(latest.c.season_order == 1)
+    ).all()
+
+
+def _build_comparison(athlete_ids, season, names):
+    cells = {}
+    columns = {}
+    for row in _comparison_rows(athlete_ids, season, names):
+        numeric = row.numeric_value is not None
+        cells.setdefault(row.athlete_id, {})[row.name] = {
+            "value": row.value,
+            "numeric_value": row.numeric_value,
+            "season": row.season,
+            "percentile": round(float(row.percent_rank) * 100, 1) if numeric else None,
+        }
+        columns.setdefault(
+            row.name,
+            {
+                "name": row.name,
+                "min": row.low,
+                "max": row.high,
+                "higher_is_better": bool(row.higher_is_better),
+            },
+        )
+    return {"cells": cells, "columns": columns}
+
+
+def compare_athletes(athlete_ids, season=None, names=None):
+    """Return a stat matrix comparing ``athlete_ids`` (in the given order).
+
+    Without ``season`` each cell holds the athlete's latest season for that
+    stat. ``names`` limits the columns; aliases are accepted. Each cell's
+    ``percentile`` is the share of the other compared athletes it beats.
+    """
+    athlete_ids = list(dict.fromkeys(athlete_ids))
+    if names:
+        names = sorted({canonical_stat_name(db.session, name) for name in names})
+    key = "compare:{}:{}:{}".format(
+        season or "", ",".join(sorted(athlete_ids)), ",".join(names or ())
+    )
+    result = cache.get_or_set(
+        key,
+        lambda: _build_comparison(athlete_ids, season, names),
+        tags=[COMPARE_CACHE_TAG],
+        timeout=current_app.config.get("COMPARE_CACHE_TIMEOUT"),
+    )
+    stats = names or sorted(result["columns"])
+    return {
+        "athletes": athlete_ids,
+        "season": season,
+        "stats": stats,
+        "columns": [result["columns"].get(name, {"name": name}) for name in stats],
+        "matrix": [
+            [result["cells"].get(athlete_id, {}).get(name) for name in stats]
+            for athlete_id in athlete_ids
+        ],
+    }
+
+
+invalidate_on_write(AthleteStat, COMPARE_CACHE_TAG)
+invalidate_on_write(AthleteProfile, COMPARE_CACHE_TAG, fields=("is_deleted",))
+invalidate_on_write(StatDefinition, COMPARE_CACHE_TAG)
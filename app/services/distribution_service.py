@@ -0,0 +1,268 @@
+"""Percentiles of stat values within a sport or position.
+
+``rebuild_stat_distributions`` groups every athlete's numeric
+``AthleteStat`` values by sport, position, stat and season and stores each
+group's sorted values in ``stat_distributions`` (evenly spaced quantiles for
+groups larger than ``MAX_POINTS``). Workers load the whole table once into
+NumPy arrays, so a percentile lookup is a binary search with no query
+against the stats table. The scheduler rebuilds the table nightly; a
+rebuild drops this worker's copy on commit and other workers reload theirs
+after ``DISTRIBUTION_REFRESH_SECONDS``.
+"""
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import sqlalchemy as sa
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import (
+    AthleteProfile,
+    AthleteStat,
+    Position,
+    Sport,
+    StatDefinition,
+    StatDistribution,
+)
+from app.services.stat_catalog_service import NO_SPORT
+
+_PENDING = "pending_distribution_reload"
+MAX_POINTS = 1001
+
+_distributions = StatDistribution.__table__
+_stats = AthleteStat.__table__
+_athletes = AthleteProfile.__table__
+_definitions = StatDefinition.__table__
+_sports = Sport.__table__
+_positions = Position.__table__
+_lock = threading.Lock()
+
+
+class Distribution:
+    """Sorted values of one stat group and their sample size."""
+
+    def __init__(self, points, sample_size, higher_is_better=True):
+        self.points = points
+        self.sample_size = sample_size
+        self.higher_is_better = higher_is_better
+
+    def percentile(self, value):
+        """Return the share of the group ``value`` beats, from 0 to 100."""
+        points = self.points
+        if len(points) == self.sample_size:
+            below = np.searchsorted(points, value, side="left")
+            equal = np.searchsorted(points, value, side="right") - below
+            share = (below + 0.5 * equal) / len(points) * 100
+        else:
+            share = np.interp(value, points, np.linspace(0, 100, len(points)))
+        if not self.higher_is_better:
+            share = 100 - share
+        return round(float(share), 1)
+
+    def to_dict(self):
+        return {
+            "sample_size": self.sample_size,
+            "min": float(self.points[0]),
+            "median": float(np.median(self.points)),
+            "max": float(self.points[-1]),
+        }
+
+
+def compress(values):
+    """Return sorted ``values``, reduced to ``MAX_POINTS`` quantiles if larger."""
+    values = np.sort(np.asarray(values, dtype=float))
+    if len(values) > MAX_POINTS:
+        values = np.quantile(values, np.linspace(0, 1, MAX_POINTS))
+    return values
+
+
+def _directions(connection):
+    """Return ``{(sport_id, name): higher_is_better}`` from the stat catalog.
+
+    A sport's own definition of a stat wins over one defined for no sport.
+    """
+    codes = dict(connection.execute(select(_sports.c.code, _sports.c.sport_id)).all())
+    directions = {}
+    # NO_SPORT sorts first, so the sports' own definitions overwrite it.
+    rows = connection.execute(
+        select(_definitions.c.sport, _definitions.c.name, _definitions.c.higher_is_better)
+        .order_by(_definitions.c.sport)
+    )
+    for sport, name, higher in rows:
+        sport_ids = codes.values() if sport == NO_SPORT else [codes.get(sport)]
+        for sport_id in sport_ids:
+            directions[(sport_id, name)] = higher is not False
+    return directions
+
+
+def rebuild_stat_distributions():
+    """Recompute every stored distribution from ``athlete_stats``."""
+    connection = db.session.connection()
+    # Stat rows are unique per athlete, stat definition and season, so each
+    # row is one athlete's value.
+    rows = connection.execute(
+        select(
+            _athletes.c.primary_sport_id,
+            _athletes.c.primary_position_id,
+            _definitions.c.name,
+            _stats.c.season,
+            _stats.c.numeric_value,
+        )
+        .join(_athletes, _athletes.c.athlete_id == _stats.c.athlete_id)
+        .join(
+            _definitions,
+            _definitions.c.stat_definition_id == _stats.c.stat_definition_id,
+        )
+        .where(
+            _stats.c.numeric_value.isnot(None),
+            _athletes.c.is_deleted.is_(False),
+            _athletes.c.primary_sport_id.isnot(None),
+        )
+    )
+    groups = {}
+    for sport_id, position_id, name, season, value in rows:
+        for position in {None, position_id}:
+            groups.setdefault((sport_id, position, name, season), []).append(value)
+    directions = _directions(connection)
+
+    computed_at = datetime.utcnow()
+    connection.execute(sa.delete(_distributions))
+    records = [
+        {
+            "sport_id": sport_id,
+            "position_id": position_id,
+            "name": name,
+            "season": season,
+            "sample_size": len(group),
+            "higher_is_better": directions.get((sport_id, name), True),
+            "quantiles": compress(group).astype("<f8").tobytes(),
+            "computed_at": computed_at,
+        }
+        for (sport_id, position_id, name, season), group in groups.items()
+    ]
+    if records:
+        connection.execute(sa.insert(_distributions), records)
+    db.session.info[_PENDING] = True
+    db.session.commit()
+    return len(records)
+
+
+def _load_distributions():
+    rows = db.session.execute(
+        select(
+            _sports.c.code,
+            _positions.c.code,
+            _distributions.c.name,
+            _distributions.c.season,
+            _distributions.c.sample_size,
+            _distributions.c.higher_is_better,
+            _distributions.c.quantiles,
+        )
+        .join(_sports, _sports.c.sport_id == _distributions.c.sport_id)
+        .outerjoin(_positions, _positions.c.position_id == _distributions.c.position_id)
+    )
+    return {
+        (sport, position, name, season): Distribution(
+            np.frombuffer(quantiles, dtype="<f8"), sample_size, higher
+        )
+        for sport, position, name, season, sample_size, higher, quantiles in rows
+    }
+
+
+def get_distributions():
+    """Return this worker's ``{(sport, position, name, season): Distribution}``.
+
+    Only one request reloads stale distributions; the others keep using the
+    previous ones meanwhile.
+    """
+    loaded = current_app.extensions.get("stat_distributions")
+    max_age = current_app.config.get("DISTRIBUTION_REFRESH_SECONDS", 600)
+    if loaded is not None and time.monotonic() - loaded[0] <= max_age:
+        return loaded[1]
+    if not _lock.acquire(blocking=loaded is None):
+        return loaded[1]
+    try:
+        current = current_app.extensions.get("stat_distributions")
+        if current is None or time.monotonic() - current[0] > max_age:
+            current = (time.monotonic(), _load_distributions())
+            current_app.extensions["stat_distributions"] = current
+        return current[1]
+    finally:
+        _lock.release()
+
+
+def stat_percentile(sport, name, value, season=None, position=None):
+    """Return where ``value`` falls among ``sport`` (or ``position``) athletes.
+
+    Returns ``None`` when no distribution is stored for the group.
+    """
+    distribution = get_distributions().get((sport, position, name, season))
+    if distribution is None:
+        return None
+    return {
+        "sport": sport,
+        "position": position,
+        "stat": name,
+        "season": season,
+        "value": value,
+        "percentile": distribution.percentile(value),
+        **distribution.to_dict(),
+    }
+
+
+def _standing(distribution, value):
+    if distribution is None:
+        return None
+    return {
+        "percentile": distribution.percentile(value),
+        "sample_size": distribution.sample_size,
+    }
+
+
+def athlete_percentiles(athlete, season=None):
+    """Return percentiles of ``athlete``'s numeric stats within sport and position."""
+    sport = athlete.primary_sport.code if athlete.primary_sport else None
+    position = athlete.primary_position.code if athlete.primary_position else None
+    query = (
+        select(AthleteStat.name, AthleteStat.season, AthleteStat.numeric_value)
+        .where(
+            AthleteStat.athlete_id == athlete.athlete_id,
+            AthleteStat.numeric_value.isnot(None),
+        )
+        .order_by(AthleteStat.season.desc(), AthleteStat.name)
+    )
+    if season:
+        query = query.where(AthleteStat.season == season)
+    distributions = get_distributions()
+    stats = []
+    for name, stat_season, value in db.session.execute(query):
+        by_sport = distributions.get((sport, None, name, stat_season))
+        by_position = distributions.get((sport, position, name, stat_season)) if position else None
+        stats.append({
+            "stat": name,
+            "season": stat_season,
+            "value": value,
+            "sport": _standing(by_sport, value),
+            "position": _standing(by_position, value),
+        })
+    return {
+        "athlete_id": athlete.athlete_id,
+        "sport": sport,
+        "position": position,
+        "stats": stats,
+    }
+
+
+@event.listens_for(Session, "after_commit")
+def _reload_committed(session):
+    if session.info.pop(_PENDING, None) and has_app_context():
+        current_app.extensions.pop("stat_distributions", None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,162 @@
+"""Featured athlete cards shared by the API, the dashboard and scripts.
+
+A card shows three key stats for the athlete's sport. Stats for every featured
+athlete are fetched in one ``IN`` query on ``(athlete_id, name, season)`` and
+the profile relationships are eager loaded, so building the list costs the
+same two queries however many athletes are featured. Finished cards are kept
+in the shared result cache until a featured profile, a user name or a stat
+changes.
+"""
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload
+
+from app import cache
+from app.models import AthleteProfile, AthleteStat, User
+from app.utils.cache import invalidate_on_write
+
+FEATURED_CACHE_TAG = "featured_athletes"
+
+# Card stats per sport as (label, stat name).
+FEATURED_STATS = {
+    "NBA": (
+        ("PPG", "PointsPerGame"),
+        ("RPG", "ReboundsPerGame"),
+        ("APG", "AssistsPerGame"),
+    ),
+    "NFL": (
+        ("PassingYards", "PassingYards"),
+        ("Touchdowns", "Touchdowns"),
+        ("QBRating", "QBRating"),
+    ),
+    "MLB": (
+        ("AVG", "BattingAverage"),
+        ("HR", "HomeRuns"),
+        ("RBI", "RunsBattedIn"),
+    ),
+    "NHL": (
+        ("Goals", "Goals"),
+        ("Assists", "Assists"),
+        ("Points", "Points"),
+    ),
+}
+
+
+def format_stat_value(value):
+    """Return a formatted string for numeric stats."""
+    try:
+        num = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if 0 < num < 1:
+        return f"{num:.3f}".lstrip("0")
+    return f"{num:.1f}" if num % 1 else str(int(num))
+
+
+def featured_athletes(limit=None):
+    """Return featured, non-deleted athletes with user, sport and position loaded."""
+    query = (
+        AthleteProfile.query.options(
+            joinedload(AthleteProfile.user),
+            joinedload(AthleteProfile.primary_sport),
+            joinedload(AthleteProfile.primary_position),
+        )
+        .filter_by(is_deleted=False, is_featured=True)
+        .order_by(AthleteProfile.overall_rating.desc())
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def load_featured_stats(athletes, year):
+    """Return ``{athlete_id: [(label, value or None), ...]}`` for ``athletes``.
+
+    All stats are read with a single query.
+    """
+    season = str(year)
+    wanted = {}
+    for athlete in athletes:
+        sport = athlete.primary_sport.code if athlete.primary_sport else None
+        wanted[athlete.athlete_id] = FEATURED_STATS.get(sport, ())
+
+    keys = [
+        (athlete_id, name, season)
+        for athlete_id, stats in wanted.items()
+        for _, name in stats
+    ]
+    values = {}
+    if keys:
+        rows = AthleteStat.query.with_entities(
+            AthleteStat.athlete_id,
+            AthleteStat.name,
+            AthleteStat.numeric_value,
+            AthleteStat.value,
+        ).filter(
+            tuple_(AthleteStat.athlete_id, AthleteStat.name, AthleteStat.season).in_(keys)
+        )
+        for athlete_id, name, number, value in rows:
+            values.setdefault((athlete_id, name), value if number is None else number)
+
+    return {
+        athlete_id: [(label, values.get((athlete_id, name))) for label, name in stats]
+        for athlete_id, stats in wanted.items()
+    }
+
+
+def _build_cards(limit, year):
+    athletes = featured_athletes(limit)
+    stats = load_featured_stats(athletes, year)
+    cards = []
+    for ath in athletes:
+        name = ath.user.full_name if ath.user else ath.athlete_id
+        initials = "".join([n[0] for n in name.split()][:2]).upper()
+        cards.append(
+            {
+                "name": name,
+                "position": ath.primary_position.code if ath.primary_position else None,
+                "team": ath.current_team or "N/A",
+                "sport": ath.primary_sport.code if ath.primary_sport else None,
+                "profile_image_url": ath.profile_image_url,
+                "initials": initials,
+                "stats": [
+                    {
+                        "label": label,
+                        "value": format_stat_value("N/A" if value is None else value),
+                    }
+                    for label, value in stats[ath.athlete_id]
+                ],
+            }
+        )
+    return cards
+
+
+def featured_cards(limit=6, year=None):
+    """Return display cards for up to ``limit`` featured athletes."""
+    year = year or date.today().year
+    return cache.get_or_set(
+        f"featured:{year}:{limit}",
+        lambda: _build_cards(limit, year),
+        tags=[FEATURED_CACHE_TAG],
+        timeout=current_app.config.get("FEATURED_CACHE_TIMEOUT"),
+    )
+
+
+invalidate_on_write(
+    AthleteProfile,
+    FEATURED_CACHE_TAG,
+    fields=(
+        "is_featured",
+        "is_deleted",
+        "overall_rating",
+        "current_team",
+        "profile_image_url",
+        "user_id",
+        "primary_sport_id",
+        "primary_position_id",
+    ),
+)
+invalidate_on_write(User, FEATURED_CACHE_TAG, fields=("first_name", "last_name"))
+invalidate_on_write(AthleteStat, FEATURED_CACHE_TAG)
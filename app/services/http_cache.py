@@ -0,0 +1,176 @@
+"""Persistent response cache for the external sports APIs.
+
+``request_with_retry(..., cache_ttl=...)`` stores each successful GET body
+with its ``ETag`` and ``Last-Modified`` validators. Within the TTL the stored
+body is returned without a request; after it the request is sent with
+``If-None-Match``/``If-Modified-Since`` and a ``304`` renews the stored body.
+Entries live in Redis when ``CACHE_REDIS_URL`` is set, in ``HTTP_CACHE_DIR``
+otherwise (or in process memory when neither is configured), so they
+survive the short-lived API clients and are shared between processes.
+
+Sync functions fingerprint each payload they write and record the
+fingerprint in ``sync_payloads`` in the same transaction. A later run that
+fetches the same payload (typically from a ``304``) skips the database
+writes, and a client that sees the same body again reuses the JSON it
+already parsed. Because the record lives with the data it describes, a
+reset or restored database is synced in full again.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+import requests
+from cachelib import FileSystemCache, RedisCache, SimpleCache
+from flask import current_app
+from sqlalchemy import select
+
+from app.models import SyncPayload
+from app.services.upsert_service import bulk_upsert
+
+_PARSED_LIMIT = 256
+# Parsed bodies by cache key, reused while the body digest is unchanged.
+_parsed = OrderedDict()
+_parsed_lock = threading.Lock()
+
+DEFAULT_TTLS = {
+    "teams": 86400,
+    "standings": 900,
+    "games": 900,
+    "stats": 3600,
+}
+
+
+def _backend():
+    backend = current_app.extensions.get("http_cache")
+    if backend is None:
+        config = current_app.config
+        max_age = config.get("HTTP_CACHE_MAX_AGE", 7 * 86400)
+        if config.get("CACHE_REDIS_URL"):
+            import redis
+
+            backend = RedisCache(
+                host=redis.from_url(config["CACHE_REDIS_URL"]),
+                key_prefix="{}http:".format(config.get("CACHE_KEY_PREFIX", "")),
+                default_timeout=max_age,
+            )
+        elif config.get("HTTP_CACHE_DIR"):
+            backend = FileSystemCache(
+                config["HTTP_CACHE_DIR"], threshold=0, default_timeout=max_age
+            )
+        else:
+            backend = SimpleCache(default_timeout=max_age)
+        backend = current_app.extensions.setdefault("http_cache", backend)
+    return backend
+
+
+def ttl(endpoint):
+    """Return the configured TTL in seconds for an endpoint kind (``"teams"``...)."""
+    name = f"HTTP_CACHE_{endpoint.upper()}_TTL"
+    return current_app.config.get(name, DEFAULT_TTLS[endpoint])
+
+
+def cache_key(url, params=None):
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    return hashlib.sha1(f"{url}?{query}".encode()).hexdigest()
+
+
+def lookup(key):
+    """Return the stored entry for ``key`` or ``None``."""
+    return _backend().get(key)
+
+
+def is_fresh(entry):
+    return entry["expires"] > time.time()
+
+
+def validators(entry):
+    """Return the conditional request headers for a stored entry."""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def to_response(key, entry, from_cache):
+    """Build a ``requests.Response`` carrying a stored body."""
+    resp = requests.Response()
+    resp.status_code = entry["status"]
+    resp._content = entry["body"]
+    resp.url = entry["url"]
+    resp.encoding = entry["encoding"]
+    resp.headers["Content-Type"] = entry["content_type"]
+    resp.cache_key = key
+    resp.digest = entry["digest"]
+    resp.from_cache = from_cache
+    return resp
+
+
+def store(key, resp, cache_ttl, previous=None):
+    """Store a ``200`` (or renew ``previous`` on ``304``) and return the response."""
+    if resp.status_code == 304 and previous is not None:
+        entry = dict(previous)
+    else:
+        entry = {
+            "status": resp.status_code,
+            "url": resp.url,
+            "encoding": resp.encoding,
+            "content_type": resp.headers.get("Content-Type", "application/json"),
+            "body": resp.content,
+            "digest": hashlib.sha1(resp.content).hexdigest(),
+        }
+    entry["etag"] = resp.headers.get("ETag") or entry.get("etag")
+    entry["last_modified"] = resp.headers.get("Last-Modified") or entry.get("last_modified")
+    entry["expires"] = time.time() + cache_ttl
+    _backend().set(key, entry)
+    return to_response(key, entry, from_cache=resp.status_code == 304)
+
+
+def parse_json(resp):
+    """Return ``resp.json()``, reusing the last parse of an identical cached body."""
+    key = getattr(resp, "cache_key", None)
+    if key is None:
+        return resp.json()
+    with _parsed_lock:
+        parsed = _parsed.get(key)
+        if parsed is not None and parsed[0] == resp.digest:
+            _parsed.move_to_end(key)
+            return parsed[1]
+    data = resp.json()
+    with _parsed_lock:
+        _parsed[key] = (resp.digest, data)
+        if len(_parsed) > _PARSED_LIMIT:
+            _parsed.popitem(last=False)
+    return data
+
+
+def fingerprint(payload):
+    """Return a stable digest of a parsed API payload."""
+    return hashlib.sha1(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def already_applied(session, name, digest):
+    """Return whether ``digest`` is what the sync ``name`` last committed."""
+    applied = session.scalar(select(SyncPayload.digest).where(SyncPayload.name == name))
+    return applied == digest
+
+
+def record_applied(session, name, digest):
+    """Record ``digest`` as applied by ``name`` in ``session``'s transaction.
+
+    Call it only once every row of the payload has been written; a rolled
+    back sync is then retried in full next time.
+    """
+    bulk_upsert(
+        session.connection(),
+        SyncPayload.__table__,
+        [{"name": name, "digest": digest}],
+        ("name",),
+        update=["digest"],
+    )
@@ -2,7 +2,8 @@ import logging
 import time
 from typing import Optional
 
-from .rate_limit import RateLimiter
+from . import http_cache
+from .rate_limit import TokenBucket
 
 import requests
 
@@ -14,17 +15,32 @@ def request_with_retry(
     retries: int = 3,
     backoff_factor: float = 1.0,
     logger: Optional[logging.Logger] = None,
-    rate_limiter: Optional[RateLimiter] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    cache_ttl: Optional[float] = None,
     **kwargs,
 ) -> requests.Response:
-    """Perform an HTTP request with retry, backoff and optional rate limiting."""
+    """Perform an HTTP request with retry, backoff and optional rate limiting.
+
+    With ``cache_ttl`` a GET is served from the shared response cache for that
+    many seconds and then revalidated with a conditional request.
+    """
     logger = logger or logging.getLogger(__name__)
+    key = entry = None
+    if cache_ttl is not None and method.lower() == "get":
+        key = http_cache.cache_key(url, kwargs.get("params"))
+        entry = http_cache.lookup(key)
+        if entry is not None:
+            if http_cache.is_fresh(entry):
+                return http_cache.to_response(key, entry, from_cache=True)
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **http_cache.validators(entry)}
     for attempt in range(1, retries + 1):
         try:
             if rate_limiter:
                 rate_limiter.wait()
             resp = session.request(method, url, **kwargs)
             resp.raise_for_status()
+            if key is not None:
+                return http_cache.store(key, resp, cache_ttl, entry)
             return resp
         except requests.RequestException as exc:
             logger.warning(
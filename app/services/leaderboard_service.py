@@ -0,0 +1,336 @@
+"""Ordered per-sport and per-position leaderboards.
+
+Boards are read from the ``athlete_rankings`` snapshot into an ordered
+structure once and then answer "what rank is athlete X" and "who is ranked
+100-150" in O(log n) without sorting the roster. With ``CACHE_REDIS_URL``
+configured every board is a Redis sorted set shared by all workers; otherwise
+each worker keeps sorted arrays in process.
+
+Scores are relative to the rest of the sport, so when ranking_service
+rescores a sport its boards are dropped on commit and reloaded from the
+snapshot by the next reader. Boards are also reloaded after
+``LEADERBOARD_REFRESH_SECONDS``, which bounds how long a missed
+invalidation (e.g. a commit from another worker without Redis) is served.
+"""
+import bisect
+import logging
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import AthleteProfile, AthleteRanking, Position, Sport, User
+
+logger = logging.getLogger(__name__)
+
+_PENDING = "pending_leaderboard_sports"
+ALL_SPORTS = "*"
+
+
+def _board_rows(sport):
+    """Return ``(athlete_id, score, position_code)`` for every ranked athlete of ``sport``."""
+    return db.session.execute(
+        select(AthleteRanking.athlete_id, AthleteRanking.score, Position.code)
+        .join(AthleteProfile, AthleteProfile.athlete_id == AthleteRanking.athlete_id)
+        .join(Sport, Sport.sport_id == AthleteRanking.sport_id)
+        .outerjoin(Position, Position.position_id == AthleteProfile.primary_position_id)
+        .where(Sport.code == sport)
+    ).all()
+
+
+def _group_boards(rows):
+    boards = {None: []}
+    for athlete_id, score, position in rows:
+        boards[None].append((athlete_id, score))
+        if position:
+            boards.setdefault(position, []).append((athlete_id, score))
+    return boards
+
+
+class _SortedBoard:
+    """Athletes ordered by score descending, then id, in a sorted array."""
+
+    def __init__(self, entries):
+        self._scores = dict(entries)
+        self._keys = sorted((-score, athlete_id) for athlete_id, score in entries)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def rank(self, athlete_id):
+        score = self._scores.get(athlete_id)
+        if score is None:
+            return None
+        return bisect.bisect_left(self._keys, (-score, athlete_id)) + 1, score
+
+    def range(self, start, stop):
+        return [
+            (rank, athlete_id, -neg_score)
+            for rank, (neg_score, athlete_id) in enumerate(
+                self._keys[start - 1:stop], start=start
+            )
+        ]
+
+
+class LocalLeaderboards:
+    """Per-worker boards kept as sorted arrays."""
+
+    def __init__(self, max_age):
+        self._max_age = max_age
+        self._sports = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _boards(self, sport):
+        loaded = self._sports.get(sport)
+        if loaded is None or time.monotonic() - loaded[0] > self._max_age:
+            generation = self._generation
+            boards = {
+                position: _SortedBoard(entries)
+                for position, entries in _group_boards(_board_rows(sport)).items()
+            }
+            loaded = (time.monotonic(), boards)
+            with self._lock:
+                # Boards read before a concurrent invalidation serve only this call.
+                if generation == self._generation:
+                    self._sports[sport] = loaded
+        return loaded[1]
+
+    def size(self, sport, position=None):
+        board = self._boards(sport).get(position)
+        return len(board) if board else 0
+
+    def rank(self, sport, position, athlete_id):
+        board = self._boards(sport).get(position)
+        return board.rank(athlete_id) if board else None
+
+    def range(self, sport, position, start, stop):
+        board = self._boards(sport).get(position)
+        return board.range(start, stop) if board else []
+
+    def invalidate(self, sports):
+        with self._lock:
+            self._generation += 1
+            if ALL_SPORTS in sports:
+                self._sports.clear()
+            for sport in sports:
+                self._sports.pop(sport, None)
+
+
+class RedisLeaderboards:
+    """Boards stored as Redis sorted sets shared by every worker.
+
+    Members are scored with the negated score, so ascending order is score
+    descending with ties by athlete id, as in ``_SortedBoard``. Each sport,
+    and ``ALL_SPORTS``, has a version that ``invalidate`` increments; the
+    ``loaded`` marker records the versions its boards were read at and
+    expires after ``max_age``. One reader rebuilds a stale sport under a ``SET NX`` lock
+    while the others keep serving the previous boards.
+    """
+
+    _META = ("loaded", "version", "lock")
+    _LOCK_SECONDS = 30
+    _WAIT_SECONDS = 5
+
+    def __init__(self, client, prefix, max_age=300):
+        self._redis = client
+        self._prefix = f"{prefix}leaderboard:"
+        self._max_age = max_age
+
+    def _key(self, sport, position):
+        return f"{self._prefix}{sport}:{position or ALL_SPORTS}"
+
+    def _meta(self, sport, name):
+        return f"{self._prefix}{sport}:{name}"
+
+    def _ensure(self, sport):
+        marker = self._meta(sport, "loaded")
+        deadline = time.monotonic() + self._WAIT_SECONDS
+        while True:
+            loaded, version, everything = self._redis.mget(
+                marker, self._meta(sport, "version"), self._meta(ALL_SPORTS, "version")
+            )
+            version = f"{int(everything or 0)}.{int(version or 0)}"
+            if isinstance(loaded, bytes):
+                loaded = loaded.decode()
+            if loaded == version:
+                return
+            lock = self._meta(sport, "lock")
+            if self._redis.set(lock, 1, nx=True, ex=self._LOCK_SECONDS):
+                try:
+                    self._load(sport, version)
+                finally:
+                    self._redis.delete(lock)
+                return
+            # Someone else is rebuilding: serve their previous boards if any,
+            # otherwise wait for the first load.
+            if loaded is not None or time.monotonic() > deadline:
+                return
+            time.sleep(0.05)
+
+    def _load(self, sport, version):
+        # Read the rows after the version: a commit that lands meanwhile
+        # bumps the version past the one recorded here.
+        boards = _group_boards(_board_rows(sport))
+        pipe = self._redis.pipeline()
+        for key in self._redis.scan_iter(f"{self._prefix}{sport}:*"):
+            name = key.decode() if isinstance(key, bytes) else key
+            if name.rsplit(":", 1)[-1] not in self._META:
+                pipe.delete(key)
+        for position, entries in boards.items():
+            if entries:
+                pipe.zadd(
+                    self._key(sport, position),
+                    {athlete_id: -score for athlete_id, score in entries},
+                )
+        pipe.set(self._meta(sport, "loaded"), version, ex=self._max_age)
+        pipe.execute()
+
+    def size(self, sport, position=None):
+        self._ensure(sport)
+        return self._redis.zcard(self._key(sport, position))
+
+    def rank(self, sport, position, athlete_id):
+        self._ensure(sport)
+        key = self._key(sport, position)
+        pipe = self._redis.pipeline()
+        pipe.zrank(key, athlete_id)
+        pipe.zscore(key, athlete_id)
+        rank, score = pipe.execute()
+        return None if rank is None else (rank + 1, -score)
+
+    def range(self, sport, position, start, stop):
+        self._ensure(sport)
+        rows = self._redis.zrange(
+            self._key(sport, position), start - 1, stop - 1, withscores=True
+        )
+        return [
+            (rank, member.decode() if isinstance(member, bytes) else member, -score)
+            for rank, (member, score) in enumerate(rows, start=start)
+        ]
+
+    def invalidate(self, sports):
+        # ALL_SPORTS has its own version, which is part of every sport's.
+        pipe = self._redis.pipeline()
+        for sport in sports:
+            pipe.incr(self._meta(sport, "version"))
+        pipe.execute()
+
+
+def get_leaderboards():
+    """Return the leaderboard backend for the current app."""
+    boards = current_app.extensions.get("leaderboards")
+    if boards is None:
+        url = current_app.config.get("CACHE_REDIS_URL")
+        if url:
+            import redis
+
+            boards = RedisLeaderboards(
+                redis.from_url(url),
+                current_app.config.get("CACHE_KEY_PREFIX", ""),
+                current_app.config.get("LEADERBOARD_REFRESH_SECONDS", 300),
+            )
+        else:
+            boards = LocalLeaderboards(
+                current_app.config.get("LEADERBOARD_REFRESH_SECONDS", 300)
+            )
+        current_app.extensions["leaderboards"] = boards
+    return boards
+
+
+def _names(athlete_ids):
+    return dict(
+        db.session.execute(
+            select(AthleteProfile.athlete_id, User.first_name + " " + User.last_name)
+            .join(User, User.user_id == AthleteProfile.user_id)
+            .where(AthleteProfile.athlete_id.in_(athlete_ids))
+        ).all()
+    )
+
+
+def leaderboard_page(sport, position=None, start=1, stop=50):
+    """Return ranks ``start``-``stop`` (inclusive, 1-based) of a board."""
+    sport = sport.upper()
+    position = position.upper() if position else None
+    boards = get_leaderboards()
+    rows = boards.range(sport, position, start, stop)
+    names = _names([athlete_id for _, athlete_id, _ in rows]) if rows else {}
+    return {
+        "sport": sport,
+        "position": position,
+        "total": boards.size(sport, position),
+        "entries": [
+            {
+                "rank": rank,
+                "id": athlete_id,
+                "name": names.get(athlete_id, athlete_id),
+                "score": round(float(score), 1),
+            }
+            for rank, athlete_id, score in rows
+        ],
+    }
+
+
+def athlete_standing(athlete_id):
+    """Return an athlete's rank within their sport and their sport's position board.
+
+    Returns ``None`` when the athlete is not ranked.
+    """
+    row = db.session.execute(
+        select(Sport.code, Position.code)
+        .select_from(AthleteRanking)
+        .join(AthleteProfile, AthleteProfile.athlete_id == AthleteRanking.athlete_id)
+        .join(Sport, Sport.sport_id == AthleteRanking.sport_id)
+        .outerjoin(Position, Position.position_id == AthleteProfile.primary_position_id)
+        .where(AthleteRanking.athlete_id == athlete_id)
+    ).first()
+    if row is None:
+        return None
+    sport, position = row
+    boards = get_leaderboards()
+
+    def _standing(pos):
+        found = boards.rank(sport, pos, athlete_id)
+        if found is None:
+            return None
+        rank, score = found
+        return {
+            "code": pos or sport,
+            "rank": rank,
+            "total": boards.size(sport, pos),
+            "score": round(float(score), 1),
+        }
+
+    return {
+        "athlete_id": athlete_id,
+        "sport": _standing(None),
+        "position": _standing(position) if position else None,
+    }
+
+
+def invalidate_on_commit(session, sports):
+    """Drop the boards of ``sports`` once ``session`` commits."""
+    if session is not None and sports:
+        session.info.setdefault(_PENDING, set()).update(sports)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    sports = session.info.pop(_PENDING, None)
+    if not sports or not has_app_context():
+        return
+    boards = current_app.extensions.get("leaderboards")
+    if boards is None:
+        return
+    try:
+        boards.invalidate(sports)
+    except Exception as exc:
+        logger.warning("Leaderboard invalidation failed for %s: %s", sports, exc)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
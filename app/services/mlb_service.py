@@ -3,9 +3,10 @@ from typing import Optional
 
 import requests
 from flask import current_app
-from cachelib import SimpleCache
+from . import http_cache
+from .upsert_service import upsert_teams
 from .http_utils import request_with_retry
-from .rate_limit import RateLimiter
+from .rate_limit import RateLimiter, provider_limiter
 
 from app import db
 from app.models import MLBTeam, AthleteProfile, AthleteStat
@@ -18,17 +19,28 @@ class MLBAPIClient:
     def __init__(
         self,
         base_url: Optional[str] = None,
-        rate_limit_interval: float = 1.0,
-        cache_timeout: int = 3600,
+        rate_limit_interval: Optional[float] = None,
+        cache_timeout: Optional[int] = None,
     ):
         self.base_url = base_url or current_app.config.get(
             "MLB_API_BASE_URL", "https://statsapi.mlb.com/api/v1"
         )
         self.session = requests.Session()
-        self.rate_limiter = RateLimiter(rate_limit_interval)
-        self.cache = SimpleCache(default_timeout=cache_timeout)
-
-    def _get(self, endpoint: str, params: Optional[dict] = None):
+        if rate_limit_interval is None:
+            self.rate_limiter = provider_limiter("mlb")
+        else:
+            self.rate_limiter = RateLimiter(rate_limit_interval)
+        self.cache_timeout = cache_timeout
+
+    def _ttl(self, kind: Optional[str]):
+        """Return how long responses of endpoint ``kind`` stay cached."""
+        if kind is None:
+            return None
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return http_cache.ttl(kind)
+
+    def _get(self, endpoint: str, params: Optional[dict] = None, kind: Optional[str] = None):
         """Perform GET with retry and handle errors."""
         url = f"{self.base_url}{endpoint}"
         try:
@@ -40,9 +52,10 @@ class MLBAPIClient:
                 timeout=10,
                 logger=logging.getLogger(__name__),
                 rate_limiter=self.rate_limiter,
+                cache_ttl=self._ttl(kind),
             )
             try:
-                return resp.json()
+                return http_cache.parse_json(resp)
             except ValueError as exc:
                 logging.getLogger(__name__).error(
                     "Failed parsing JSON from %s: %s", url, exc
@@ -55,19 +68,14 @@ class MLBAPIClient:
             return {}
 
     def get_teams(self):
-        cached = self.cache.get("teams")
-        if cached is not None:
-            return cached
-        data = self._get("/teams")
-        teams = data.get("teams", [])
-        self.cache.set("teams", teams)
-        return teams
+        data = self._get("/teams", kind="teams")
+        return data.get("teams", [])
 
     def get_player_stats(self, player_id: int, season: Optional[int] = None, group: str = "hitting"):
         params = {"stats": "season", "group": group}
         if season:
             params["season"] = season
-        data = self._get(f"/people/{player_id}/stats", params=params)
+        data = self._get(f"/people/{player_id}/stats", params=params, kind="stats")
         if data.get("stats"):
             splits = data["stats"][0].get("splits", [])
             if splits:
@@ -78,17 +86,12 @@ class MLBAPIClient:
 def sync_teams(client: MLBAPIClient):
     """Fetch and store all MLB teams."""
     teams = client.get_teams()
-    for t in teams:
-        mapped = map_mlb_team(t)
-        team = MLBTeam.query.get(mapped["team_id"])
-        if not team:
-            team = MLBTeam(team_id=mapped["team_id"])
-        team.name = mapped["name"]
-        team.abbreviation = mapped["abbreviation"]
-        team.location = mapped["location"]
-        team.league = mapped["league"]
-        team.division = mapped["division"]
-        db.session.add(team)
+    digest = http_cache.fingerprint(teams)
+    if http_cache.already_applied(db.session, "mlb:teams", digest):
+        logging.getLogger(__name__).info("MLB teams unchanged")
+        return teams
+    upsert_teams(MLBTeam, [map_mlb_team(t) for t in teams])
+    http_cache.record_applied(db.session, "mlb:teams", digest)
     db.session.commit()
     logging.getLogger(__name__).info("Synced %d MLB teams", len(teams))
     return teams
@@ -103,6 +106,10 @@ def sync_player_stats(client: MLBAPIClient, athlete: AthleteProfile, season: Opt
     hitting = client.get_player_stats(player_id, season=season, group="hitting") or {}
     pitching = client.get_player_stats(player_id, season=season, group="pitching") or {}
     fielding = client.get_player_stats(player_id, season=season, group="fielding") or {}
+    name = f"mlb:stats:{athlete.athlete_id}:{season}"
+    digest = http_cache.fingerprint([hitting, pitching, fielding])
+    if http_cache.already_applied(db.session, name, digest):
+        return {"hitting": hitting, "pitching": pitching, "fielding": fielding}
 
     mappings = {
         "MLB_HITTING": {"avg": "BattingAverage"},
@@ -136,6 +143,7 @@ def sync_player_stats(client: MLBAPIClient, athlete: AthleteProfile, season: Opt
             stat.stat_type = stat_type
             db.session.add(stat)
 
+    http_cache.record_applied(db.session, name, digest)
     db.session.commit()
     logging.getLogger(__name__).info(
         "Synced MLB stats for athlete %s season %s", athlete.athlete_id, season_str
@@ -3,9 +3,10 @@ from typing import Optional
 
 import requests
 from flask import current_app
-from cachelib import SimpleCache
+from . import http_cache
+from .upsert_service import upsert_games, upsert_teams
 from .http_utils import request_with_retry
-from .rate_limit import RateLimiter
+from .rate_limit import RateLimiter, provider_limiter
 
 from app import db
 from app.models import NBATeam, NBAGame, AthleteProfile, AthleteStat
@@ -19,8 +20,8 @@ class NBAAPIClient:
         self,
         base_url: Optional[str] = None,
         token: Optional[str] = None,
-        rate_limit_interval: float = 1.0,
-        cache_timeout: int = 3600,
+        rate_limit_interval: Optional[float] = None,
+        cache_timeout: Optional[int] = None,
     ):
         self.base_url = base_url or current_app.config.get(
             'NBA_API_BASE_URL', 'https://www.balldontlie.io/api/v1'
@@ -29,10 +30,21 @@ class NBAAPIClient:
         self.token = token or current_app.config.get('NBA_API_TOKEN')
         if self.token:
             self.session.headers.update({'Authorization': f'Bearer {self.token}'})
-        self.rate_limiter = RateLimiter(rate_limit_interval)
-        self.cache = SimpleCache(default_timeout=cache_timeout)
+        if rate_limit_interval is None:
+            self.rate_limiter = provider_limiter("nba")
+        else:
+            self.rate_limiter = RateLimiter(rate_limit_interval)
+        self.cache_timeout = cache_timeout
 
-    def _get(self, endpoint: str, params: Optional[dict] = None):
+    def _ttl(self, kind: Optional[str]):
+        """Return how long responses of endpoint ``kind`` stay cached."""
+        if kind is None:
+            return None
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return http_cache.ttl(kind)
+
+    def _get(self, endpoint: str, params: Optional[dict] = None, kind: Optional[str] = None):
         """Perform GET with retry and handle errors gracefully."""
         url = f"{self.base_url}{endpoint}"
         try:
@@ -44,9 +56,10 @@ class NBAAPIClient:
                 timeout=10,
                 logger=logging.getLogger(__name__),
                 rate_limiter=self.rate_limiter,
+                cache_ttl=self._ttl(kind),
             )
             try:
-                return resp.json()
+                return http_cache.parse_json(resp)
             except ValueError as exc:
                 logging.getLogger(__name__).error(
                     "Failed parsing JSON from %s: %s", url, exc
@@ -59,30 +72,19 @@ class NBAAPIClient:
             return {}
 
     def get_teams(self):
-        cached = self.cache.get('teams')
-        if cached is not None:
-            return cached
-        teams = self._get('/teams').get('data', [])
-        self.cache.set('teams', teams)
-        return teams
+        return self._get('/teams', kind='teams').get('data', [])
 
     def get_games(self, team_id: int, season: Optional[int] = None):
         params = {'team_ids[]': team_id}
         if season:
             params['seasons[]'] = season
-        key = f"games:{team_id}:{season}"
-        cached = self.cache.get(key)
-        if cached is not None:
-            return cached
-        games = self._get('/games', params=params).get('data', [])
-        self.cache.set(key, games)
-        return games
+        return self._get('/games', params=params, kind='games').get('data', [])
 
     def get_player_season_avg(self, player_id: int, season: Optional[int] = None):
         params = {'player_ids[]': player_id}
         if season:
             params['season'] = season
-        data = self._get('/season_averages', params=params)
+        data = self._get('/season_averages', params=params, kind='stats')
         if data.get('data'):
             return data['data'][0]
         return None
@@ -91,18 +93,12 @@ class NBAAPIClient:
 def sync_teams(client: NBAAPIClient):
     """Fetch and store all NBA teams."""
     teams = client.get_teams()
-    for t in teams:
-        mapped = map_nba_team(t)
-        team = NBATeam.query.get(mapped['team_id'])
-        if not team:
-            team = NBATeam(team_id=mapped['team_id'])
-        team.abbreviation = mapped['abbreviation']
-        team.city = mapped['city']
-        team.conference = mapped['conference']
-        team.division = mapped['division']
-        team.full_name = mapped['full_name']
-        team.name = mapped['name']
-        db.session.add(team)
+    digest = http_cache.fingerprint(teams)
+    if http_cache.already_applied(db.session, 'nba:teams', digest):
+        logging.getLogger(__name__).info("NBA teams unchanged")
+        return teams
+    upsert_teams(NBATeam, [map_nba_team(t) for t in teams])
+    http_cache.record_applied(db.session, 'nba:teams', digest)
     db.session.commit()
     logging.getLogger(__name__).info("Synced %d NBA teams", len(teams))
     return teams
@@ -111,18 +107,13 @@ def sync_teams(client: NBAAPIClient):
 def sync_games(client: NBAAPIClient, team_id: int, season: Optional[int] = None):
     """Fetch game logs for a team and store them."""
     games = client.get_games(team_id=team_id, season=season)
-    for g in games:
-        mapped = map_nba_game(g)
-        game = NBAGame.query.get(mapped['game_id'])
-        if not game:
-            game = NBAGame(game_id=mapped['game_id'])
-        game.date = mapped['date']
-        game.season = mapped['season']
-        game.home_team_id = mapped['home_team_id']
-        game.visitor_team_id = mapped['visitor_team_id']
-        game.home_team_score = mapped['home_team_score']
-        game.visitor_team_score = mapped['visitor_team_score']
-        db.session.add(game)
+    name = f'nba:games:{team_id}:{season}'
+    digest = http_cache.fingerprint(games)
+    if http_cache.already_applied(db.session, name, digest):
+        logging.getLogger(__name__).info("NBA games unchanged for team %s", team_id)
+        return games
+    upsert_games(NBAGame, [map_nba_game(g) for g in games])
+    http_cache.record_applied(db.session, name, digest)
     db.session.commit()
     logging.getLogger(__name__).info("Synced %d games for team %s", len(games), team_id)
     return games
@@ -138,6 +129,10 @@ def sync_player_stats(client: NBAAPIClient, athlete: AthleteProfile, season: Opt
     data = client.get_player_season_avg(player_id, season=season)
     if not data:
         return None
+    name = f'nba:stats:{athlete.athlete_id}:{season}'
+    digest = http_cache.fingerprint(data)
+    if http_cache.already_applied(db.session, name, digest):
+        return data
     mapping = {
         'pts': 'PointsPerGame',
         'reb': 'ReboundsPerGame',
@@ -158,6 +153,7 @@ def sync_player_stats(client: NBAAPIClient, athlete: AthleteProfile, season: Opt
         stat.value = str(data.get(api_field))
         stat.stat_type = 'NBA'
         db.session.add(stat)
+    http_cache.record_applied(db.session, name, digest)
     db.session.commit()
     logging.getLogger(__name__).info(
         "Synced stats for athlete %s from NBA season %s", athlete.athlete_id, data.get('season')
@@ -3,9 +3,10 @@ from typing import Optional
 
 import requests
 from flask import current_app
-from cachelib import SimpleCache
+from . import http_cache
+from .upsert_service import upsert_teams
 from .http_utils import request_with_retry
-from .rate_limit import RateLimiter
+from .rate_limit import RateLimiter, provider_limiter
 
 from app import db
 from app.models import NFLTeam, AthleteProfile, AthleteStat
@@ -18,17 +19,28 @@ class NFLAPIClient:
     def __init__(
         self,
         base_url: Optional[str] = None,
-        rate_limit_interval: float = 1.0,
-        cache_timeout: int = 3600,
+        rate_limit_interval: Optional[float] = None,
+        cache_timeout: Optional[int] = None,
     ):
         self.base_url = base_url or current_app.config.get(
             "NFL_API_BASE_URL", "https://api.nfl.com/v1"
         )
         self.session = requests.Session()
-        self.rate_limiter = RateLimiter(rate_limit_interval)
-        self.cache = SimpleCache(default_timeout=cache_timeout)
-
-    def _get(self, endpoint: str, params: Optional[dict] = None):
+        if rate_limit_interval is None:
+            self.rate_limiter = provider_limiter("nfl")
+        else:
+            self.rate_limiter = RateLimiter(rate_limit_interval)
+        self.cache_timeout = cache_timeout
+
+    def _ttl(self, kind: Optional[str]):
+        """Return how long responses of endpoint ``kind`` stay cached."""
+        if kind is None:
+            return None
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return http_cache.ttl(kind)
+
+    def _get(self, endpoint: str, params: Optional[dict] = None, kind: Optional[str] = None):
         """Perform GET with retry and handle errors."""
         url = f"{self.base_url}{endpoint}"
         try:
@@ -40,9 +52,10 @@ class NFLAPIClient:
                 timeout=10,
                 logger=logging.getLogger(__name__),
                 rate_limiter=self.rate_limiter,
+                cache_ttl=self._ttl(kind),
             )
             try:
-                return resp.json()
+                return http_cache.parse_json(resp)
             except ValueError as exc:
                 logging.getLogger(__name__).error(
                     "Failed parsing JSON from %s: %s", url, exc
@@ -55,13 +68,8 @@ class NFLAPIClient:
             return {}
 
     def get_teams(self):
-        cached = self.cache.get("teams")
-        if cached is not None:
-            return cached
-        data = self._get("/teams")
-        teams = data.get("teams", [])
-        self.cache.set("teams", teams)
-        return teams
+        data = self._get("/teams", kind="teams")
+        return data.get("teams", [])
 
     def get_player_stats(
         self, player_id: int, season: Optional[int] = None, group: str = "offense"
@@ -69,24 +77,19 @@ class NFLAPIClient:
         params = {"group": group}
         if season:
             params["season"] = season
-        data = self._get(f"/players/{player_id}/stats", params=params)
+        data = self._get(f"/players/{player_id}/stats", params=params, kind="stats")
         return data.get("stats", {})
 
 
 def sync_teams(client: NFLAPIClient):
     """Fetch and store all NFL teams."""
     teams = client.get_teams()
-    for t in teams:
-        mapped = map_nfl_team(t)
-        team = NFLTeam.query.get(mapped["team_id"])
-        if not team:
-            team = NFLTeam(team_id=mapped["team_id"])
-        team.name = mapped["name"]
-        team.abbreviation = mapped["abbreviation"]
-        team.city = mapped["city"]
-        team.conference = mapped["conference"]
-        team.division = mapped["division"]
-        db.session.add(team)
+    digest = http_cache.fingerprint(teams)
+    if http_cache.already_applied(db.session, "nfl:teams", digest):
+        logging.getLogger(__name__).info("NFL teams unchanged")
+        return teams
+    upsert_teams(NFLTeam, [map_nfl_team(t) for t in teams])
+    http_cache.record_applied(db.session, "nfl:teams", digest)
     db.session.commit()
     logging.getLogger(__name__).info("Synced %d NFL teams", len(teams))
     return teams
@@ -102,6 +105,10 @@ def sync_player_stats(
 
     offense = client.get_player_stats(player_id, season=season, group="offense") or {}
     defense = client.get_player_stats(player_id, season=season, group="defense") or {}
+    name = f"nfl:stats:{athlete.athlete_id}:{season}"
+    digest = http_cache.fingerprint([offense, defense])
+    if http_cache.already_applied(db.session, name, digest):
+        return {"offense": offense, "defense": defense}
 
     mappings = {
         "NFL_OFFENSE": {
@@ -134,6 +141,7 @@ def sync_player_stats(
             stat.stat_type = stat_type
             db.session.add(stat)
 
+    http_cache.record_applied(db.session, name, digest)
     db.session.commit()
     logging.getLogger(__name__).info(
         "Synced NFL stats for athlete %s season %s", athlete.athlete_id, season_str
@@ -3,9 +3,11 @@ from typing import Optional
 
 import requests
 from flask import current_app
-from cachelib import SimpleCache
+from sqlalchemy import select
+from . import http_cache
+from .upsert_service import bulk_update, upsert_games, upsert_teams
 from .http_utils import request_with_retry
-from .rate_limit import RateLimiter
+from .rate_limit import RateLimiter, provider_limiter
 
 from app import db
 from app.models import NHLTeam, NHLGame, AthleteProfile, AthleteStat
@@ -18,17 +20,28 @@ class NHLAPIClient:
     def __init__(
         self,
         base_url: Optional[str] = None,
-        rate_limit_interval: float = 1.0,
-        cache_timeout: int = 3600,
+        rate_limit_interval: Optional[float] = None,
+        cache_timeout: Optional[int] = None,
     ):
         self.base_url = base_url or current_app.config.get(
             "NHL_API_BASE_URL", "https://statsapi.web.nhl.com/api/v1"
         )
         self.session = requests.Session()
-        self.rate_limiter = RateLimiter(rate_limit_interval)
-        self.cache = SimpleCache(default_timeout=cache_timeout)
-
-    def _get(self, endpoint: str, params: Optional[dict] = None):
+        if rate_limit_interval is None:
+            self.rate_limiter = provider_limiter("nhl")
+        else:
+            self.rate_limiter = RateLimiter(rate_limit_interval)
+        self.cache_timeout = cache_timeout
+
+    def _ttl(self, kind: Optional[str]):
+        """Return how long responses of endpoint ``kind`` stay cached."""
+        if kind is None:
+            return None
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return http_cache.ttl(kind)
+
+    def _get(self, endpoint: str, params: Optional[dict] = None, kind: Optional[str] = None):
         """Perform GET with retry and handle errors."""
         url = f"{self.base_url}{endpoint}"
         try:
@@ -40,9 +53,10 @@ class NHLAPIClient:
                 timeout=10,
                 logger=logging.getLogger(__name__),
                 rate_limiter=self.rate_limiter,
+                cache_ttl=self._ttl(kind),
             )
             try:
-                return resp.json()
+                return http_cache.parse_json(resp)
             except ValueError as exc:
                 logging.getLogger(__name__).error(
                     "Failed parsing JSON from %s: %s", url, exc
@@ -55,43 +69,28 @@ class NHLAPIClient:
             return {}
 
     def get_teams(self):
-        cached = self.cache.get("teams")
-        if cached is not None:
-            return cached
-        data = self._get("/teams")
-        teams = data.get("teams", [])
-        self.cache.set("teams", teams)
-        return teams
+        data = self._get("/teams", kind="teams")
+        return data.get("teams", [])
 
     def get_standings(self):
-        cached = self.cache.get("standings")
-        if cached is not None:
-            return cached
-        data = self._get("/standings")
-        records = data.get("records", [])
-        self.cache.set("standings", records)
-        return records
+        data = self._get("/standings", kind="standings")
+        return data.get("records", [])
 
     def get_games(self, team_id: int, season: Optional[str] = None):
         params = {"teamId": team_id}
         if season:
             params["season"] = season
-        key = f"games:{team_id}:{season}"
-        cached = self.cache.get(key)
-        if cached is not None:
-            return cached
-        data = self._get("/schedule", params=params)
+        data = self._get("/schedule", params=params, kind="games")
         games = []
         for d in data.get("dates", []):
             games.extend(d.get("games", []))
-        self.cache.set(key, games)
         return games
 
     def get_player_stats(self, player_id: int, season: Optional[str] = None):
         params = {"stats": "statsSingleSeason"}
         if season:
             params["season"] = season
-        data = self._get(f"/people/{player_id}/stats", params=params)
+        data = self._get(f"/people/{player_id}/stats", params=params, kind="stats")
         if data.get("stats"):
             splits = data["stats"][0].get("splits", [])
             if splits:
@@ -102,17 +101,12 @@ class NHLAPIClient:
 def sync_teams(client: NHLAPIClient):
     """Fetch and store all NHL teams."""
     teams = client.get_teams()
-    for t in teams:
-        mapped = map_nhl_team(t)
-        team = NHLTeam.query.get(mapped["team_id"])
-        if not team:
-            team = NHLTeam(team_id=mapped["team_id"])
-        team.name = mapped["name"]
-        team.abbreviation = mapped["abbreviation"]
-        team.location = mapped["location"]
-        team.division = mapped["division"]
-        team.conference = mapped["conference"]
-        db.session.add(team)
+    digest = http_cache.fingerprint(teams)
+    if http_cache.already_applied(db.session, "nhl:teams", digest):
+        logging.getLogger(__name__).info("NHL teams unchanged")
+        return teams
+    upsert_teams(NHLTeam, [map_nhl_team(t) for t in teams])
+    http_cache.record_applied(db.session, "nhl:teams", digest)
     db.session.commit()
     logging.getLogger(__name__).info("Synced %d NHL teams", len(teams))
     return teams
@@ -121,18 +115,28 @@ def sync_teams(client: NHLAPIClient):
 def sync_standings(client: NHLAPIClient):
     """Fetch standings and update team records."""
     records = client.get_standings()
+    digest = http_cache.fingerprint(records)
+    if http_cache.already_applied(db.session, "nhl:standings", digest):
+        logging.getLogger(__name__).info("NHL standings unchanged")
+        return records
+    rows = []
     for r in records:
         for tr in r.get("teamRecords", []):
-            team_id = tr["team"]["id"]
-            team = NHLTeam.query.get(team_id)
-            if not team:
-                continue
             league = tr.get("leagueRecord", {})
-            team.wins = league.get("wins")
-            team.losses = league.get("losses")
-            team.overtime_losses = league.get("ot")
-            team.points = tr.get("points")
-            db.session.add(team)
+            rows.append({
+                "team_id": tr["team"]["id"],
+                "wins": league.get("wins"),
+                "losses": league.get("losses"),
+                "overtime_losses": league.get("ot"),
+                "points": tr.get("points"),
+            })
+    # Standings of teams not synced yet are skipped, and the payload is
+    # applied again next time so those teams get them once they exist.
+    bulk_update(db.session.connection(), NHLTeam.__table__, rows, ("team_id",))
+    team_ids = {row["team_id"] for row in rows}
+    known = db.session.scalars(select(NHLTeam.team_id).where(NHLTeam.team_id.in_(team_ids)))
+    if set(known) == team_ids:
+        http_cache.record_applied(db.session, "nhl:standings", digest)
     db.session.commit()
     logging.getLogger(__name__).info("Synced NHL standings")
     return records
@@ -141,18 +145,13 @@ def sync_standings(client: NHLAPIClient):
 def sync_games(client: NHLAPIClient, team_id: int, season: Optional[str] = None):
     """Fetch schedule for a team and store the games."""
     games = client.get_games(team_id=team_id, season=season)
-    for g in games:
-        mapped = map_nhl_game(g)
-        game = NHLGame.query.get(mapped["game_id"])
-        if not game:
-            game = NHLGame(game_id=mapped["game_id"])
-        game.date = mapped["date"]
-        game.season = mapped["season"]
-        game.home_team_id = mapped["home_team_id"]
-        game.visitor_team_id = mapped["visitor_team_id"]
-        game.home_team_score = mapped["home_team_score"]
-        game.visitor_team_score = mapped["visitor_team_score"]
-        db.session.add(game)
+    name = f"nhl:games:{team_id}:{season}"
+    digest = http_cache.fingerprint(games)
+    if http_cache.already_applied(db.session, name, digest):
+        logging.getLogger(__name__).info("NHL games unchanged for team %s", team_id)
+        return games
+    upsert_games(NHLGame, [map_nhl_game(g) for g in games])
+    http_cache.record_applied(db.session, name, digest)
     db.session.commit()
     logging.getLogger(__name__).info(
         "Synced %d NHL games for team %s", len(games), team_id
@@ -169,6 +168,10 @@ def sync_player_stats(
         return None
 
     data = client.get_player_stats(player_id, season=season) or {}
+    name = f"nhl:stats:{athlete.athlete_id}:{season}"
+    digest = http_cache.fingerprint(data)
+    if http_cache.already_applied(db.session, name, digest):
+        return data
 
     mapping = {"goals": "Goals", "assists": "Assists", "points": "Points"}
     season_str = str(season) if season else None
@@ -187,6 +190,7 @@ def sync_player_stats(
         stat.stat_type = "NHL"
         db.session.add(stat)
 
+    http_cache.record_applied(db.session, name, digest)
     db.session.commit()
     logging.getLogger(__name__).info(
         "Synced NHL stats for athlete %s season %s", athlete.athlete_id, season_str
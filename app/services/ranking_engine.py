@@ -0,0 +1,400 @@
+"""Vectorized multi-metric athlete scoring.
+
+Each sport has a small catalog of metrics. The latest season value of every
+metric is pulled for the whole league in one statement and pivoted into an
+athletes x metrics NumPy matrix. Every column is standardised to a z-score
+(sign flipped where lower is better), clipped to +/-3 standard deviations and
+mapped onto 0-100. The per-athlete stat score is the position-weighted mean of
+the metrics that athlete has, which is then blended with ``overall_rating``.
+Missing values are NaN and simply drop out of the weighted mean, so an athlete
+is never penalised for a stat their position does not record.
+
+``score_select`` computes the same scores in one SQL statement, for callers
+that only need the top few rows.
+"""
+import warnings
+
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy import func, select
+
+from app.models import (
+    AthleteProfile,
+    AthleteStat,
+    Position,
+    SeasonStat,
+    Sport,
+    StatDefinition,
+)
+
+# Metrics per sport as (stat name, higher is better).
+METRICS = {
+    "NBA": (
+        ("PointsPerGame", True),
+        ("ReboundsPerGame", True),
+        ("AssistsPerGame", True),
+    ),
+    "NFL": (
+        ("PassingYards", True),
+        ("RushingYards", True),
+        ("ReceivingYards", True),
+        ("Tackles", True),
+        ("Sacks", True),
+    ),
+    "MLB": (
+        ("BattingAverage", True),
+        ("EarnedRunAverage", False),
+        ("FieldingPercentage", True),
+    ),
+    "NHL": (
+        ("Points", True),
+        ("Goals", True),
+        ("Assists", True),
+    ),
+    "SOC": (
+        ("Goals", True),
+        ("Assists", True),
+    ),
+}
+
+# Relative metric weights per sport and position code. Metrics left out get
+# no weight; positions left out weigh every metric equally. Positions with
+# no tracked metric (offensive linemen) are ranked on ``overall_rating``.
+POSITION_WEIGHTS = {
+    "NBA": {
+        "PG": {"AssistsPerGame": 0.5, "PointsPerGame": 0.35, "ReboundsPerGame": 0.15},
+        "SG": {"PointsPerGame": 0.6, "AssistsPerGame": 0.25, "ReboundsPerGame": 0.15},
+        "SF": {"PointsPerGame": 0.5, "ReboundsPerGame": 0.25, "AssistsPerGame": 0.25},
+        "PF": {"PointsPerGame": 0.4, "ReboundsPerGame": 0.45, "AssistsPerGame": 0.15},
+        "C": {"ReboundsPerGame": 0.5, "PointsPerGame": 0.35, "AssistsPerGame": 0.15},
+    },
+    "NFL": {
+        "QB": {"PassingYards": 0.85, "RushingYards": 0.15},
+        "RB": {"RushingYards": 0.75, "ReceivingYards": 0.25},
+        "WR": {"ReceivingYards": 0.9, "RushingYards": 0.1},
+        "TE": {"ReceivingYards": 1.0},
+        "OL": {},
+    },
+    "MLB": {
+        "P": {"EarnedRunAverage": 0.8, "FieldingPercentage": 0.2},
+        "C": {"BattingAverage": 0.5, "FieldingPercentage": 0.5},
+        "SS": {"BattingAverage": 0.6, "FieldingPercentage": 0.4},
+    },
+    "NHL": {
+        "C": {"Points": 0.4, "Assists": 0.35, "Goals": 0.25},
+        "LW": {"Goals": 0.45, "Points": 0.35, "Assists": 0.2},
+        "RW": {"Goals": 0.45, "Points": 0.35, "Assists": 0.2},
+        "D": {"Assists": 0.5, "Points": 0.3, "Goals": 0.2},
+    },
+    "SOC": {
+        "FW": {"Goals": 0.75, "Assists": 0.25},
+        "MF": {"Assists": 0.6, "Goals": 0.4},
+    },
+}
+
+# Share of the final score taken from ``overall_rating`` when both exist.
+RATING_WEIGHT = 0.3
+Z_CLIP = 3.0
+
+_athletes = AthleteProfile.__table__
+_positions = Position.__table__
+_sports = Sport.__table__
+_definitions = StatDefinition.__table__
+
+
+def score_matrix(values, higher_is_better, weights, ratings, rating_weight=RATING_WEIGHT):
+    """Score every row of ``values`` in one vectorized pass.
+
+    ``values`` is an ``(athletes, metrics)`` float array with NaN for missing
+    values, ``higher_is_better`` a boolean per metric, ``weights`` an
+    ``(athletes, metrics)`` array of metric weights and ``ratings`` the
+    ``overall_rating`` per athlete (NaN when unset). Returns 0-100 scores.
+    """
+    values = np.asarray(values, dtype=float)
+    ratings = np.asarray(ratings, dtype=float)
+    if values.shape[1] == 0:
+        return np.nan_to_num(ratings)
+
+    with warnings.catch_warnings():
+        # All-NaN columns are expected for metrics nobody has yet.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+    std = np.where((std > 0) & np.isfinite(std), std, 1.0)
+
+    z = (values - mean) / std
+    z *= np.where(higher_is_better, 1.0, -1.0)
+    scaled = 50.0 + np.clip(z, -Z_CLIP, Z_CLIP) * (50.0 / Z_CLIP)
+
+    present = ~np.isnan(scaled)
+    weights = np.where(present, weights, 0.0)
+    total = weights.sum(axis=1)
+    weighted = (np.where(present, scaled, 0.0) * weights).sum(axis=1)
+    stat_score = np.divide(
+        weighted, total, out=np.full(len(total), np.nan), where=total > 0
+    )
+
+    blended = (1 - rating_weight) * stat_score + rating_weight * ratings
+    scores = np.where(
+        np.isnan(stat_score), ratings, np.where(np.isnan(ratings), stat_score, blended)
+    )
+    return np.round(np.nan_to_num(scores), 1)
+
+
+def weight_matrix(sport_code, positions):
+    """Return the ``(athletes, metrics)`` weight array for ``positions``."""
+    metrics = METRICS.get(sport_code, ())
+    by_position = POSITION_WEIGHTS.get(sport_code, {})
+    codes = sorted(by_position)
+    table = np.ones((len(codes) + 1, len(metrics)))
+    for i, code in enumerate(codes):
+        table[i] = [by_position[code].get(name, 0.0) for name, _ in metrics]
+    lookup = {code: i for i, code in enumerate(codes)}
+    rows = np.fromiter(
+        (lookup.get(p, len(codes)) for p in positions), dtype=np.intp, count=len(positions)
+    )
+    return table[rows]
+
+
+def _latest_values(criterion):
+    """Return a subquery with each athlete's latest value per tracked metric."""
+    tracked = select(_definitions.c.stat_definition_id).where(
+        sa.or_(*(
+            sa.and_(
+                _definitions.c.sport == sport,
+                _definitions.c.name.in_([name for name, _ in metrics]),
+            )
+            for sport, metrics in METRICS.items()
+        ))
+    )
+    sources = [
+        select(t.c.athlete_id, t.c.stat_definition_id, t.c.season, t.c.numeric_value).where(
+            t.c.stat_definition_id.in_(tracked)
+        )
+        for t in (AthleteStat.__table__, SeasonStat.__table__)
+    ]
+    stats = sa.union_all(*sources).subquery()
+    return (
+        select(
+            stats.c.athlete_id,
+            _definitions.c.name,
+            stats.c.numeric_value.label("value"),
+            func.row_number()
+            .over(
+                partition_by=(stats.c.athlete_id, stats.c.stat_definition_id),
+                order_by=stats.c.season.desc().nulls_last(),
+            )
+            .label("season_order"),
+        )
+        .join(_athletes, _athletes.c.athlete_id == stats.c.athlete_id)
+        .join(
+            _definitions,
+            _definitions.c.stat_definition_id == stats.c.stat_definition_id,
+        )
+        .where(criterion)
+        .subquery()
+    )
+
+
+def _literal_table(name, columns, rows):
+    """Return ``rows`` as a derived table; SQLite cannot name ``VALUES`` columns."""
+    selects = [
+        select(*(
+            sa.literal(value, type_).label(column)
+            for (column, type_), value in zip(columns, row)
+        ))
+        for row in rows
+    ]
+    return sa.union_all(*selects).subquery(name)
+
+
+def _metric_table():
+    """Return the metric catalog as a table ``(sport, name, sign)``."""
+    return _literal_table(
+        "metrics",
+        (("sport", sa.String), ("name", sa.String), ("sign", sa.Float)),
+        [
+            (sport, name, 1.0 if better else -1.0)
+            for sport, metrics in METRICS.items()
+            for name, better in metrics
+        ],
+    )
+
+
+def _weight_table():
+    """Return the position weights as a table ``(sport, position, name, weight)``."""
+    return _literal_table(
+        "position_weights",
+        (("sport", sa.String), ("position", sa.String), ("name", sa.String), ("weight", sa.Float)),
+        [
+            (sport, code, name, float(weights.get(name, 0.0)))
+            for sport, positions in POSITION_WEIGHTS.items()
+            for code, weights in positions.items()
+            for name, _ in METRICS[sport]
+        ],
+    )
+
+
+def score_select(criterion=sa.true()):
+    """Return a SELECT of ``(athlete_id, sport_id, score)`` scored in SQL.
+
+    The set-based counterpart of ``load_leagues`` plus ``League.score`` for
+    callers that want a few top rows without loading every league: the
+    latest metric values, the per-sport z-scores, position weights and the
+    rating blend are all computed by the database, so the caller can order
+    and ``LIMIT`` the result in the same statement.
+    """
+    criterion = sa.and_(criterion, _athletes.c.is_deleted.isnot(True))
+    latest = _latest_values(criterion)
+    metrics = _metric_table()
+    weights = _weight_table()
+    league = (_athletes.c.primary_sport_id, latest.c.name)
+    value = latest.c.value
+    cells = (
+        select(
+            latest.c.athlete_id,
+            value,
+            metrics.c.sign,
+            func.coalesce(weights.c.weight, 1.0).label("weight"),
+            func.avg(value).over(partition_by=league).label("mean"),
+            func.avg(value * value).over(partition_by=league).label("mean_square"),
+        )
+        .join(_athletes, _athletes.c.athlete_id == latest.c.athlete_id)
+        .join(_sports, _sports.c.sport_id == _athletes.c.primary_sport_id)
+        .join(metrics, sa.and_(metrics.c.sport == _sports.c.code, metrics.c.name == latest.c.name))
+        .outerjoin(_positions, _positions.c.position_id == _athletes.c.primary_position_id)
+        .outerjoin(
+            weights,
+            sa.and_(
+                weights.c.sport == _sports.c.code,
+                weights.c.position == _positions.c.code,
+                weights.c.name == latest.c.name,
+            ),
+        )
+        .where(latest.c.season_order == 1, value.isnot(None))
+        .subquery()
+    )
+
+    variance = cells.c.mean_square - cells.c.mean * cells.c.mean
+    std = func.sqrt(sa.case((variance > 0, variance), else_=0.0))
+    std = sa.case((std > 0, std), else_=1.0)
+    z = (cells.c.value - cells.c.mean) / std * cells.c.sign
+    z = sa.case((z > Z_CLIP, Z_CLIP), (z < -Z_CLIP, -Z_CLIP), else_=z)
+    scaled = 50.0 + z * (50.0 / Z_CLIP)
+    stat_scores = (
+        select(
+            cells.c.athlete_id,
+            (
+                func.sum(scaled * cells.c.weight) / func.nullif(func.sum(cells.c.weight), 0)
+            ).label("stat_score"),
+        )
+        .group_by(cells.c.athlete_id)
+        .subquery()
+    )
+
+    stat_score = stat_scores.c.stat_score
+    rating = sa.cast(_athletes.c.overall_rating, sa.Float)
+    score = sa.case(
+        (stat_score.is_(None), func.coalesce(rating, 0.0)),
+        (rating.is_(None), stat_score),
+        else_=(1 - RATING_WEIGHT) * stat_score + RATING_WEIGHT * rating,
+    )
+    return (
+        select(
+            _athletes.c.athlete_id,
+            _athletes.c.primary_sport_id.label("sport_id"),
+            sa.cast(func.round(sa.cast(score, sa.Numeric), 1), sa.Float).label("score"),
+        )
+        .select_from(
+            _athletes.outerjoin(stat_scores, stat_scores.c.athlete_id == _athletes.c.athlete_id)
+        )
+        .where(criterion)
+    )
+
+
+class League:
+    """Scoring inputs and results for the athletes of one sport."""
+
+    def __init__(self, sport_id, sport_code):
+        self.sport_id = sport_id
+        self.sport_code = sport_code
+        self.metrics = METRICS.get(sport_code, ())
+        self.athlete_ids = []
+        self.positions = []
+        self.ratings = []
+        self.values = None
+        self.scores = None
+
+    def score(self):
+        weights = weight_matrix(self.sport_code, self.positions)
+        higher = np.array([better for _, better in self.metrics], dtype=bool)
+        self.scores = score_matrix(self.values, higher, weights, self.ratings)
+        return self.scores
+
+
+def load_leagues(connection, criterion=sa.true()):
+    """Load every non-deleted athlete matching ``criterion`` grouped by sport.
+
+    One statement returns each athlete with the latest value of every tracked
+    metric; the rows are pivoted into one ``League`` per sport.
+    """
+    criterion = sa.and_(criterion, _athletes.c.is_deleted.isnot(True))
+    latest = _latest_values(criterion)
+    rows = connection.execute(
+        select(
+            _athletes.c.athlete_id,
+            _athletes.c.primary_sport_id,
+            _sports.c.code.label("sport_code"),
+            _positions.c.code.label("position_code"),
+            _athletes.c.overall_rating,
+            latest.c.name,
+            latest.c.value,
+        )
+        .select_from(
+            _athletes.outerjoin(_sports, _sports.c.sport_id == _athletes.c.primary_sport_id)
+            .outerjoin(
+                _positions, _positions.c.position_id == _athletes.c.primary_position_id
+            )
+            .outerjoin(
+                latest,
+                sa.and_(
+                    latest.c.athlete_id == _athletes.c.athlete_id,
+                    latest.c.season_order == 1,
+                ),
+            )
+        )
+        .where(criterion)
+    )
+
+    leagues = {}
+    index = {}
+    cells = {}
+    for row in rows:
+        league = leagues.get(row.primary_sport_id)
+        if league is None:
+            league = leagues[row.primary_sport_id] = League(row.primary_sport_id, row.sport_code)
+            index[row.primary_sport_id] = {}
+            cells[row.primary_sport_id] = ([], [], [])
+        athletes = index[row.primary_sport_id]
+        i = athletes.get(row.athlete_id)
+        if i is None:
+            i = athletes[row.athlete_id] = len(league.athlete_ids)
+            league.athlete_ids.append(row.athlete_id)
+            league.positions.append(row.position_code)
+            rating = row.overall_rating
+            league.ratings.append(np.nan if rating is None else float(rating))
+        if row.value is not None:
+            rows_i, names, values = cells[row.primary_sport_id]
+            rows_i.append(i)
+            names.append(row.name)
+            values.append(row.value)
+
+    for sport_id, league in leagues.items():
+        columns = {name: j for j, (name, _) in enumerate(league.metrics)}
+        league.values = np.full((len(league.athlete_ids), len(columns)), np.nan)
+        league.ratings = np.array(league.ratings, dtype=float)
+        for i, name, value in zip(*cells[sport_id]):
+            j = columns.get(name)
+            if j is not None:
+                league.values[i, j] = value
+    return list(leagues.values())
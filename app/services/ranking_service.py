@@ -0,0 +1,349 @@
+"""Precomputed athlete rankings.
+
+Scores live in the ``athlete_rankings`` snapshot table together with the
+per-sport rank, so pages showing the top athletes read a handful of rows by
+index instead of scoring the whole roster per request. Scores come from the
+multi-metric engine in ``ranking_engine``; because they are relative to the
+rest of the league, writes to an athlete's rating or stats append the
+athlete's sport to the ``ranking_dirty`` queue in the writer's transaction.
+``refresh_dirty_rankings`` runs every ``RANKING_REFRESH_SECONDS`` from the
+scheduler, rescores each queued sport once in one vectorized pass and
+renumbers its ``sport_rank``, so writers never rescore a sport themselves.
+The overall ``rank`` is only renumbered by ``rebuild_rankings``, which
+rescores every sport nightly to repair any drift; the overall top list is
+read in ``(score, athlete_id)`` order instead.
+"""
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session, joinedload, object_session
+
+from app import db
+from app.models import (
+    AthleteProfile,
+    AthleteRanking,
+    AthleteStat,
+    Position,
+    RankingDirty,
+    SeasonStat,
+    Sport,
+    User,
+)
+from app.services.leaderboard_service import ALL_SPORTS, invalidate_on_commit
+from app.services.ranking_engine import load_leagues, score_select
+
+_PENDING = "pending_ranking_athletes"
+_PENDING_SPORTS = "pending_ranking_sports"
+_MARKED = "marked_ranking_sports"
+
+_athletes = AthleteProfile.__table__
+_users = User.__table__
+_rankings = AthleteRanking.__table__
+_dirty = RankingDirty.__table__
+_sports = Sport.__table__
+
+
+def _sport_criterion(column, sport_ids):
+    known = [s for s in sport_ids if s is not None]
+    criterion = column.in_(known)
+    if None in sport_ids:
+        criterion = sa.or_(criterion, column.is_(None))
+    return criterion
+
+
+def _renumber(connection, sport_ids=None):
+    """Recompute ``sport_rank`` for ``sport_ids`` in one UPDATE.
+
+    Without ``sport_ids`` every row is renumbered and the overall ``rank``
+    is recomputed as well; a partial refresh only touches its own sports'
+    rows, so concurrent refreshes of different sports never lock the same
+    rows.
+    """
+    order = (_rankings.c.score.desc(), _rankings.c.athlete_id)
+    columns = [
+        _rankings.c.athlete_id,
+        func.row_number()
+        .over(partition_by=_rankings.c.sport_id, order_by=order)
+        .label("sport_rank"),
+    ]
+    if sport_ids is None:
+        columns.append(func.row_number().over(order_by=order).label("rank"))
+        ranked = select(*columns).subquery()
+        values = {"rank": ranked.c.rank, "sport_rank": ranked.c.sport_rank}
+    else:
+        ranked = (
+            select(*columns)
+            .where(_sport_criterion(_rankings.c.sport_id, sport_ids))
+            .subquery()
+        )
+        values = {"sport_rank": ranked.c.sport_rank}
+    connection.execute(
+        sa.update(_rankings)
+        .where(_rankings.c.athlete_id == ranked.c.athlete_id)
+        .values(values)
+    )
+
+
+def refresh_rankings(connection, sport_ids=None):
+    """Rescore the sports ``sport_ids`` (every sport when ``None``).
+
+    Returns the codes of the sports whose scores were recomputed.
+    """
+    if sport_ids is None:
+        criterion = sa.true()
+        connection.execute(sa.delete(_rankings))
+    else:
+        sport_ids = set(sport_ids)
+        if not sport_ids:
+            return set()
+        criterion = _sport_criterion(_athletes.c.primary_sport_id, sport_ids)
+        connection.execute(
+            sa.delete(_rankings).where(_sport_criterion(_rankings.c.sport_id, sport_ids))
+        )
+
+    computed_at = datetime.utcnow()
+    rows = []
+    sports = set()
+    for league in load_leagues(connection, criterion):
+        league.score()
+        sports.add(league.sport_code)
+        rows.extend(
+            {
+                "athlete_id": athlete_id,
+                "sport_id": league.sport_id,
+                "score": float(score),
+                "computed_at": computed_at,
+            }
+            for athlete_id, score in zip(league.athlete_ids, league.scores)
+        )
+    if rows:
+        connection.execute(sa.insert(_rankings), rows)
+    _renumber(connection, sport_ids)
+    return sports
+
+
+def rebuild_rankings():
+    """Recompute the whole ranking snapshot."""
+    connection = db.session.connection()
+    refresh_rankings(connection)
+    connection.execute(sa.delete(_dirty))
+    invalidate_on_commit(db.session, {ALL_SPORTS})
+    db.session.commit()
+
+
+def refresh_dirty_rankings():
+    """Rescore the sports queued in ``ranking_dirty`` and return their codes.
+
+    Queue rows locked by a concurrent refresh are skipped rather than
+    waited for; rows added while the sports are rescored stay queued for
+    the next run.
+    """
+    session = db.session
+    connection = session.connection()
+    dirty = connection.execute(
+        select(_dirty.c.id, _dirty.c.sport_id).with_for_update(skip_locked=True)
+    ).all()
+    sports = set()
+    if dirty:
+        sport_ids = {sport_id for _, sport_id in dirty}
+        sports = refresh_rankings(connection, sport_ids)
+        # Sports left without ranked athletes still need their boards dropped.
+        sports |= set(
+            connection.scalars(
+                select(_sports.c.code).where(_sports.c.sport_id.in_(sport_ids - {None}))
+            )
+        )
+        connection.execute(
+            sa.delete(_dirty).where(_dirty.c.id.in_([row_id for row_id, _ in dirty]))
+        )
+        invalidate_on_commit(session, sports)
+    session.commit()
+    return sports
+
+
+def _filters(sport=None, position=None):
+    criterion = []
+    if sport:
+        criterion.append(Sport.code == sport.upper())
+    if position:
+        criterion.append(Position.code == position.upper())
+    return criterion
+
+
+def compute_rankings(limit=5, sport=None, position=None):
+    """Score athletes live and return the top ``limit`` in one statement.
+
+    Used while the snapshot is still empty, e.g. right after the migration.
+    Scoring, ordering and the ``LIMIT`` all run in the database through
+    ``ranking_engine.score_select``.
+    """
+    criterion = sa.true()
+    matching = None
+    if sport or position:
+        matching = (
+            select(AthleteProfile.athlete_id)
+            .outerjoin(Sport, Sport.sport_id == AthleteProfile.primary_sport_id)
+            .outerjoin(Position, Position.position_id == AthleteProfile.primary_position_id)
+            .where(*_filters(sport, position))
+        )
+        sport_ids = select(AthleteProfile.primary_sport_id).where(
+            AthleteProfile.athlete_id.in_(matching)
+        )
+        # Score the whole sport so z-scores match the snapshot, then filter.
+        criterion = _athletes.c.primary_sport_id.in_(sport_ids)
+
+    scores = score_select(criterion).subquery()
+    query = (
+        select(
+            scores.c.athlete_id,
+            scores.c.score,
+            (_users.c.first_name + " " + _users.c.last_name).label("name"),
+        )
+        .select_from(
+            scores.join(_athletes, _athletes.c.athlete_id == scores.c.athlete_id).outerjoin(
+                _users, _users.c.user_id == _athletes.c.user_id
+            )
+        )
+        .order_by(scores.c.score.desc(), scores.c.athlete_id)
+        .limit(limit)
+    )
+    if matching is not None:
+        query = query.where(scores.c.athlete_id.in_(matching))
+    return [
+        {
+            "id": row.athlete_id,
+            "name": row.name or row.athlete_id,
+            "score": row.score,
+            "rank": rank,
+        }
+        for rank, row in enumerate(db.session.execute(query), start=1)
+    ]
+
+
+def top_rankings(limit=5, sport=None, position=None):
+    """Return the ``limit`` best ranked athletes, or ``None`` if nobody can be ranked.
+
+    ``sport`` and ``position`` are codes narrowing the leaderboard; ranks in
+    the result are then the athlete's place within that subset.
+    """
+    query = AthleteRanking.query.options(
+        joinedload(AthleteRanking.athlete).joinedload(AthleteProfile.user)
+    )
+    if sport or position:
+        query = (
+            query.join(AthleteRanking.athlete)
+            .outerjoin(Sport, Sport.sport_id == AthleteProfile.primary_sport_id)
+            .outerjoin(Position, Position.position_id == AthleteProfile.primary_position_id)
+            .filter(*_filters(sport, position))
+        )
+    # Ordered like ``rank`` but read from the score index, so athletes
+    # rescored since the last full rebuild are placed correctly.
+    rows = (
+        query.order_by(AthleteRanking.score.desc(), AthleteRanking.athlete_id)
+        .limit(limit)
+        .all()
+    )
+    if not rows:
+        if AthleteRanking.query.first() is None:
+            return compute_rankings(limit, sport, position) or None
+        return None
+    return [
+        {
+            "id": row.athlete_id,
+            "name": row.athlete.user.full_name if row.athlete.user else row.athlete_id,
+            "score": row.score,
+            "rank": rank,
+        }
+        for rank, row in enumerate(rows, start=1)
+    ]
+
+
+def _queue(target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING, set()).add(target.athlete_id)
+        if isinstance(target, AthleteProfile):
+            # Deleted athletes can no longer be resolved to their sport.
+            session.info.setdefault(_PENDING_SPORTS, set()).add(target.primary_sport_id)
+
+
+def _written(mapper, connection, target):
+    _queue(target)
+
+
+def _athlete_updated(mapper, connection, target):
+    state = inspect(target)
+    fields = ("overall_rating", "primary_sport_id", "primary_position_id", "is_deleted")
+    if any(state.attrs[name].history.has_changes() for name in fields):
+        _queue(target)
+
+
+for _model in (AthleteStat, SeasonStat):
+    event.listen(_model, "after_insert", _written)
+    event.listen(_model, "after_update", _written)
+    event.listen(_model, "after_delete", _written)
+event.listen(AthleteProfile, "after_insert", _written)
+event.listen(AthleteProfile, "after_update", _athlete_updated)
+event.listen(AthleteProfile, "after_delete", _written)
+
+
+def _mark_dirty(session, athlete_ids, sport_ids=()):
+    """Queue the current and ranked sports of ``athlete_ids`` in ``ranking_dirty``.
+
+    Each sport is queued at most once per transaction.
+    """
+    connection = session.connection()
+    sport_ids = set(sport_ids)
+    athlete_ids = list(athlete_ids)
+    if athlete_ids:
+        # Old and new sports both change when an athlete switches sport.
+        sport_ids.update(
+            connection.scalars(
+                select(_athletes.c.primary_sport_id).where(
+                    _athletes.c.athlete_id.in_(athlete_ids)
+                )
+            )
+        )
+        sport_ids.update(
+            connection.scalars(
+                select(_rankings.c.sport_id).where(_rankings.c.athlete_id.in_(athlete_ids))
+            )
+        )
+    marked = session.info.setdefault(_MARKED, set())
+    new = sport_ids - marked
+    if new:
+        connection.execute(
+            sa.insert(_dirty),
+            [{"sport_id": sport_id, "marked_at": datetime.utcnow()} for sport_id in new],
+        )
+        marked.update(new)
+
+
+def stats_written(session, athlete_ids):
+    """Queue the sports of ``athlete_ids`` for rescoring after a bulk stat write.
+
+    Bulk Core statements do not fire the mapper events that normally queue
+    the sports, so their callers hand the affected athletes over directly.
+    """
+    _mark_dirty(session, athlete_ids)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _mark_flushed(session, flush_context):
+    athlete_ids = session.info.pop(_PENDING, None)
+    sport_ids = session.info.pop(_PENDING_SPORTS, None)
+    if athlete_ids or sport_ids:
+        _mark_dirty(session, athlete_ids or (), sport_ids or ())
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_marked(session):
+    session.info.pop(_MARKED, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
+    session.info.pop(_PENDING_SPORTS, None)
+    session.info.pop(_MARKED, None)
@@ -1,19 +1,163 @@
+"""Token-bucket rate limiting for outbound API requests.
+
+A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+second; each request takes one. ``wait`` reserves a token and sleeps until
+it is due, ``acquire`` does the same for asyncio callers and
+``try_acquire`` takes a token only if one is available now. The lock only
+guards the refill arithmetic, never a sleep, so concurrent sync workers
+queue for consecutive slots instead of serializing on the lock.
+
+``provider_limiter`` returns one bucket per provider and app. With
+``CACHE_REDIS_URL`` configured the bucket state lives in Redis, so every
+process (scheduler, web workers, CLI back-fills) draws from the same
+allowance.
+"""
+import asyncio
+import logging
+import math
 import threading
 import time
 
-class RateLimiter:
-    """Simple rate limiter enforcing a minimum interval between requests."""
+from flask import current_app
 
-    def __init__(self, min_interval: float = 1.0):
-        self.min_interval = float(min_interval)
+logger = logging.getLogger(__name__)
+
+# Refill and take atomically on the Redis server, using its clock.
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local reserve = ARGV[4] == '1'
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local delay = 0
+if tokens < cost then
+  delay = (cost - tokens) / rate
+  if not reserve then
+    return tostring(delay)
+  end
+end
+tokens = tokens - cost
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return tostring(delay)
+"""
+
+
+class TokenBucket:
+    """In-process token bucket allowing ``rate`` requests per second.
+
+    Up to ``burst`` requests may go out back to back after an idle period.
+    A ``rate`` of ``math.inf`` disables limiting.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 1, clock=time.monotonic):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = float(rate)
+        self.burst = burst
+        self._clock = clock
         self._lock = threading.Lock()
-        self._last_time = 0.0
+        self._tokens = float(burst)
+        self._updated = clock()
 
-    def wait(self) -> None:
-        """Block until it is OK to perform the next request."""
+    def _take(self, tokens: int, reserve: bool) -> float:
+        """Return seconds until ``tokens`` are due; take them if due or ``reserve``.
+
+        Reserved tokens may drive the balance negative, which makes later
+        callers wait behind the reservation.
+        """
+        if math.isinf(self.rate):
+            return 0.0
         with self._lock:
-            now = time.monotonic()
-            elapsed = now - self._last_time
-            if elapsed < self.min_interval:
-                time.sleep(self.min_interval - elapsed)
-            self._last_time = time.monotonic()
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            delay = max(tokens - self._tokens, 0.0) / self.rate
+            if reserve or not delay:
+                self._tokens -= tokens
+            return delay
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Take ``tokens`` if available right now; never blocks."""
+        return not self._take(tokens, reserve=False)
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Claim the next ``tokens`` and return how long to wait before using them."""
+        return self._take(tokens, reserve=True)
+
+    def wait(self, tokens: int = 1) -> None:
+        """Block until it is OK to perform the next request."""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire(self, tokens: int = 1) -> None:
+        """Wait for ``tokens`` without blocking the event loop."""
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter(TokenBucket):
+    """Rate limiter enforcing a minimum interval between requests."""
+
+    def __init__(self, min_interval: float = 1.0, burst: int = 1):
+        self.min_interval = float(min_interval)
+        rate = 1.0 / self.min_interval if self.min_interval > 0 else math.inf
+        super().__init__(rate, burst)
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket whose state is kept in Redis under ``key``.
+
+    If Redis is unreachable the bucket falls back to its in-process state,
+    so syncs slow to the per-process limit instead of failing.
+    """
+
+    def __init__(self, client, key: str, rate: float = 1.0, burst: int = 1):
+        super().__init__(rate, burst)
+        self.key = key
+        self._script = client.register_script(_REDIS_TAKE)
+
+    def _take(self, tokens: int, reserve: bool) -> float:
+        import redis
+
+        try:
+            delay = self._script(
+                keys=[self.key],
+                args=[self.rate, self.burst, tokens, int(reserve)],
+            )
+            return float(delay)
+        except redis.RedisError as exc:
+            logger.warning("Shared rate limit %s unavailable: %s", self.key, exc)
+            return super()._take(tokens, reserve)
+
+
+def provider_limiter(provider: str) -> TokenBucket:
+    """Return the app's shared limiter for ``provider`` (``"nba"``, ``"nhl"``...).
+
+    Rate and burst come from ``<PROVIDER>_API_RATE_LIMIT`` and
+    ``<PROVIDER>_API_BURST``.
+    """
+    limiters = current_app.extensions.setdefault("rate_limiters", {})
+    limiter = limiters.get(provider)
+    if limiter is None:
+        config = current_app.config
+        name = provider.upper()
+        rate = config.get(f"{name}_API_RATE_LIMIT", 1.0)
+        burst = config.get(f"{name}_API_BURST", 1)
+        url = config.get("CACHE_REDIS_URL")
+        if url:
+            import redis
+
+            key = "{}ratelimit:{}".format(config.get("CACHE_KEY_PREFIX", ""), provider)
+            limiter = SharedTokenBucket(redis.from_url(url), key, rate, burst)
+        else:
+            limiter = TokenBucket(rate, burst)
+        limiter = limiters.setdefault(provider, limiter)
+    return limiter
@@ -0,0 +1,280 @@
+"""Season totals rolled up from per-game stats.
+
+Every ``GameStat`` insert, update or delete adds its change in numeric value
+and game count to a queue on the session, keyed by athlete, game and stat
+definition.
+After the flush the queue is resolved to seasons through ``games`` and
+applied to ``season_stats`` as increments of ``total`` and ``game_count``,
+so the season row is correct in the same transaction without reading the
+athlete's other games. ``value`` is the season total, or the per-game
+average for the stats in ``AVERAGED_STATS``. Ratios such as batting average
+are not the mean of their per-game values, so ``RATIO_STATS`` are left to
+the providers' season figures. Season rows a provider wrote itself have no
+``game_count`` and are never rolled into. ``rebuild_season_stats``
+recomputes every rolled-up row from ``game_stats`` for back-fills.
+"""
+import sqlalchemy as sa
+from sqlalchemy import event, func, inspect, select, tuple_
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import Game, GameStat, SeasonStat, StatDefinition
+from app.services.ranking_service import rebuild_rankings, stats_written
+from app.services.upsert_service import bulk_upsert
+from app.utils.cache import invalidate_model_on_commit
+
+_PENDING = "pending_season_rollups"
+
+# Stats whose season value is the per-game average rather than the total.
+AVERAGED_STATS = frozenset({
+    "PointsPerGame",
+    "ReboundsPerGame",
+    "AssistsPerGame",
+})
+# Ratios of season counts (H/AB, ER*9/IP...); averaging per-game values
+# would weight a one at-bat game like a five at-bat one, so these are not
+# rolled up.
+RATIO_STATS = frozenset({
+    "QBRating",
+    "BattingAverage",
+    "EarnedRunAverage",
+    "FieldingPercentage",
+})
+
+_season_stats = SeasonStat.__table__
+_game_stats = GameStat.__table__
+_games = Game.__table__
+_definitions = StatDefinition.__table__
+_CHUNK = 500
+
+
+def season_value(name, total, game_count):
+    """Return the season ``(value, numeric_value)`` for a rolled-up stat."""
+    number = total / game_count if name in AVERAGED_STATS else total
+    number = round(number, 3)
+    return (str(int(number)) if number.is_integer() else str(number)), number
+
+
+def _season_keys(connection, deltas):
+    """Group ``{(athlete_id, game_id, stat_definition_id): delta}`` by athlete, season and stat."""
+    game_ids = sorted({game_id for _, game_id, _ in deltas})
+    games = {}
+    for i in range(0, len(game_ids), _CHUNK):
+        games.update(
+            (game_id, (season, sport_id))
+            for game_id, season, sport_id in connection.execute(
+                select(_games.c.game_id, _games.c.season, _games.c.sport_id).where(
+                    _games.c.game_id.in_(game_ids[i:i + _CHUNK])
+                )
+            )
+        )
+    seasons = {}
+    for (athlete_id, game_id, definition_id), (total, count, name) in deltas.items():
+        season, sport_id = games.get(game_id, (None, None))
+        if season is None or name in RATIO_STATS:
+            continue
+        key = (athlete_id, season, definition_id)
+        previous = seasons.get(key, (0.0, 0, sport_id, name))
+        seasons[key] = (previous[0] + total, previous[1] + count, sport_id, name)
+    return seasons
+
+
+def _key_column():
+    return tuple_(
+        _season_stats.c.athlete_id,
+        _season_stats.c.season,
+        _season_stats.c.stat_definition_id,
+    )
+
+
+def _existing_rows(connection, keys, *columns, criterion=sa.true()):
+    keys = sorted(keys)
+    for i in range(0, len(keys), _CHUNK):
+        yield from connection.execute(
+            select(*columns).where(_key_column().in_(keys[i:i + _CHUNK]), criterion)
+        )
+
+
+def _refresh_values(connection, keys):
+    """Recompute ``value`` for ``keys`` and drop rows left without games."""
+    updates, emptied = [], []
+    rows = _existing_rows(
+        connection,
+        keys,
+        _season_stats.c.season_stat_id,
+        _season_stats.c.name,
+        _season_stats.c.total,
+        _season_stats.c.game_count,
+    )
+    for season_stat_id, name, total, game_count in rows:
+        if not game_count:
+            emptied.append(season_stat_id)
+            continue
+        value, number = season_value(name, total, game_count)
+        updates.append({"b_id": season_stat_id, "b_value": value, "b_number": number})
+    if updates:
+        connection.execute(
+            sa.update(_season_stats)
+            .where(_season_stats.c.season_stat_id == sa.bindparam("b_id"))
+            .values(value=sa.bindparam("b_value"), numeric_value=sa.bindparam("b_number")),
+            updates,
+        )
+    if emptied:
+        connection.execute(
+            sa.delete(_season_stats).where(_season_stats.c.season_stat_id.in_(emptied))
+        )
+
+
+def apply_season_deltas(connection, seasons):
+    """Add ``{(athlete_id, season, stat_definition_id): (total, count, sport_id, name)}``.
+
+    Rows are inserted or incremented with one ``INSERT ... ON CONFLICT DO
+    UPDATE`` per chunk, so concurrent writers neither lose increments nor
+    collide inserting the first game of a season. Keys that already hold a
+    provider's season figure (no ``game_count``) are left alone. Returns
+    the number of season rows written.
+    """
+    seasons = {key: delta for key, delta in seasons.items() if delta[0] or delta[1]}
+    if not seasons:
+        return 0
+    provided = _existing_rows(
+        connection,
+        seasons,
+        _season_stats.c.athlete_id,
+        _season_stats.c.season,
+        _season_stats.c.stat_definition_id,
+        criterion=_season_stats.c.game_count.is_(None),
+    )
+    for key in provided:
+        seasons.pop(tuple(key))
+    if not seasons:
+        return 0
+    rows = [
+        {
+            "athlete_id": athlete_id,
+            "season": season,
+            "stat_definition_id": definition_id,
+            "sport_id": sport_id,
+            "name": name,
+            "total": total,
+            "game_count": count,
+        }
+        for (athlete_id, season, definition_id), (total, count, sport_id, name)
+        in seasons.items()
+    ]
+    bulk_upsert(
+        connection,
+        _season_stats,
+        rows,
+        ("athlete_id", "season", "stat_definition_id"),
+        update=[],
+        increment=("total", "game_count"),
+    )
+    _refresh_values(connection, seasons)
+    return len(seasons)
+
+
+def rebuild_season_stats():
+    """Recompute every rolled-up ``season_stats`` row from ``game_stats``."""
+    connection = db.session.connection()
+    connection.execute(sa.delete(_season_stats).where(_season_stats.c.game_count.isnot(None)))
+    rows = connection.execute(
+        select(
+            _game_stats.c.athlete_id,
+            _games.c.season,
+            _game_stats.c.stat_definition_id,
+            func.sum(_game_stats.c.numeric_value),
+            func.count(_game_stats.c.numeric_value),
+            func.min(_games.c.sport_id),
+            func.max(_definitions.c.name),
+        )
+        .join(_games, _games.c.game_id == _game_stats.c.game_id)
+        .join(
+            _definitions,
+            _definitions.c.stat_definition_id == _game_stats.c.stat_definition_id,
+        )
+        .where(
+            _game_stats.c.numeric_value.isnot(None),
+            _games.c.season.isnot(None),
+            _definitions.c.name.notin_(RATIO_STATS),
+        )
+        .group_by(_game_stats.c.athlete_id, _games.c.season, _game_stats.c.stat_definition_id)
+    )
+    seasons = {
+        (athlete_id, season, definition_id): (total, count, sport_id, name)
+        for athlete_id, season, definition_id, total, count, sport_id, name in rows
+    }
+    count = apply_season_deltas(connection, seasons)
+    db.session.commit()
+    rebuild_rankings()
+    return count
+
+
+def _queue(session, key, total, count, name):
+    pending = session.info.setdefault(_PENDING, {})
+    previous = pending.get(key, (0.0, 0, name))
+    pending[key] = (previous[0] + total, previous[1] + count, name)
+
+
+def _game_stat_key(target):
+    return (target.athlete_id, target.game_id, target.stat_definition_id)
+
+
+def _game_stat_inserted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.numeric_value is not None:
+        _queue(session, _game_stat_key(target), target.numeric_value, 1, target.name)
+
+
+def _game_stat_updated(mapper, connection, target):
+    session = object_session(target)
+    state = inspect(target)
+    fields = ("athlete_id", "game_id", "stat_definition_id", "name", "numeric_value")
+    if session is None or not any(state.attrs[f].history.has_changes() for f in fields):
+        return
+    old = {}
+    for field in fields:
+        history = state.attrs[field].history
+        old[field] = history.deleted[0] if history.deleted else getattr(target, field)
+    if old["numeric_value"] is not None:
+        key = (old["athlete_id"], old["game_id"], old["stat_definition_id"])
+        _queue(session, key, -old["numeric_value"], -1, old["name"])
+    _game_stat_inserted(mapper, connection, target)
+
+
+def _game_stat_deleted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.numeric_value is not None:
+        _queue(session, _game_stat_key(target), -target.numeric_value, -1, target.name)
+
+
+def _load_replaced(target, value, oldvalue, initiator):
+    """No-op; registered with ``active_history`` so old values are loaded."""
+
+
+event.listen(GameStat, "after_insert", _game_stat_inserted)
+event.listen(GameStat, "after_update", _game_stat_updated)
+event.listen(GameStat, "after_delete", _game_stat_deleted)
+# Load the replaced value on assignment so updates can subtract what they
+# replace even when the row was expired by an earlier commit.
+for _field in ("athlete_id", "game_id", "stat_definition_id", "name", "numeric_value"):
+    event.listen(getattr(GameStat, _field), "set", _load_replaced, active_history=True)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _roll_up_flushed(session, flush_context):
+    deltas = session.info.pop(_PENDING, None)
+    if not deltas:
+        return
+    connection = session.connection()
+    seasons = _season_keys(connection, deltas)
+    if seasons and apply_season_deltas(connection, seasons):
+        # Core writes skip the SeasonStat mapper events; queue the athletes'
+        # sports for the scheduled rescore rather than rescoring them here.
+        stats_written(session, {athlete_id for athlete_id, _, _ in seasons})
+        invalidate_model_on_commit(session, SeasonStat)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,216 @@
+"""Per-team game schedules.
+
+``team_games`` stores every NBA and NHL game twice, once from each team's
+side, with the opponent's display name and both scores inlined. Writes to the
+provider game tables (normally by ``sync_games``) queue the game ids, and
+after the flush those games' rows are replaced with one INSERT ... SELECT in
+the same transaction; renaming a team refreshes the opponent name on its
+rows. A team's recent games are then one range of the
+``(sport, team_id, season, date)`` index with no per-row team lookups.
+"""
+import sqlalchemy as sa
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import NBAGame, NBATeam, NHLGame, NHLTeam, TeamGame
+
+_PENDING_GAMES = "pending_team_games"
+_PENDING_TEAMS = "pending_team_game_names"
+
+_team_games = TeamGame.__table__
+
+# Provider game and team tables per sport, with the type seasons are served as.
+SCHEDULES = {
+    "NBA": (NBAGame.__table__, NBATeam.__table__, int),
+    "NHL": (NHLGame.__table__, NHLTeam.__table__, str),
+}
+_GAME_SPORTS = {NBAGame: "NBA", NHLGame: "NHL"}
+_TEAM_SPORTS = {NBATeam: "NBA", NHLTeam: "NHL"}
+_CHUNK = 500
+
+
+def _display_name(teams):
+    if "full_name" in teams.c:
+        return func.coalesce(teams.c.full_name, teams.c.name)
+    return teams.c.name
+
+
+def _side(sport, games, teams, is_home):
+    team_id, opponent_id = games.c.home_team_id, games.c.visitor_team_id
+    team_score, opponent_score = games.c.home_team_score, games.c.visitor_team_score
+    if not is_home:
+        team_id, opponent_id = opponent_id, team_id
+        team_score, opponent_score = opponent_score, team_score
+    return (
+        select(
+            sa.literal(sport),
+            team_id,
+            games.c.game_id,
+            games.c.date,
+            sa.cast(games.c.season, sa.String(10)),
+            sa.literal(is_home),
+            opponent_id,
+            _display_name(teams),
+            team_score,
+            opponent_score,
+        )
+        .select_from(games.outerjoin(teams, teams.c.team_id == opponent_id))
+        .where(team_id.isnot(None))
+    )
+
+
+def refresh_team_games(connection, sport, game_ids=None):
+    """Rebuild the ``team_games`` rows of ``game_ids`` (every game when ``None``)."""
+    games, teams, _ = SCHEDULES[sport]
+    columns = [
+        "sport",
+        "team_id",
+        "game_id",
+        "date",
+        "season",
+        "is_home",
+        "opponent_id",
+        "opponent_name",
+        "team_score",
+        "opponent_score",
+    ]
+    if game_ids is None:
+        batches = [None]
+    else:
+        game_ids = sorted(game_ids)
+        batches = [game_ids[i:i + _CHUNK] for i in range(0, len(game_ids), _CHUNK)]
+    for batch in batches:
+        delete = sa.delete(_team_games).where(_team_games.c.sport == sport)
+        sides = [_side(sport, games, teams, True), _side(sport, games, teams, False)]
+        if batch is not None:
+            delete = delete.where(_team_games.c.game_id.in_(batch))
+            sides = [side.where(games.c.game_id.in_(batch)) for side in sides]
+        connection.execute(delete)
+        connection.execute(
+            sa.insert(_team_games).from_select(columns, sa.union_all(*sides))
+        )
+
+
+def refresh_opponent_names(connection, sport, team_ids):
+    """Copy the current display name of ``team_ids`` onto their opponents' rows."""
+    _, teams, _ = SCHEDULES[sport]
+    connection.execute(
+        sa.update(_team_games)
+        .where(
+            _team_games.c.sport == sport,
+            _team_games.c.opponent_id.in_(team_ids),
+            teams.c.team_id == _team_games.c.opponent_id,
+        )
+        .values(opponent_name=_display_name(teams))
+    )
+
+
+def rebuild_team_games():
+    """Recompute ``team_games`` from the provider game tables."""
+    connection = db.session.connection()
+    for sport in SCHEDULES:
+        refresh_team_games(connection, sport)
+    db.session.commit()
+
+
+def _schedule_criteria(sport, team_id, season):
+    criteria = [TeamGame.sport == sport, TeamGame.team_id == team_id]
+    if season:
+        criteria.append(TeamGame.season == str(season))
+    return criteria
+
+
+def count_team_games(sport, team_id, season=None):
+    """Return how many games ``team_id`` has (in ``season`` when given)."""
+    return db.session.scalar(
+        select(func.count())
+        .select_from(TeamGame)
+        .where(*_schedule_criteria(sport, team_id, season))
+    )
+
+
+def team_schedule(sport, team_id, season=None, limit=5, offset=0):
+    """Return ``team_id``'s games, newest first, as game log dicts."""
+    _, teams, season_type = SCHEDULES[sport]
+    rows = db.session.execute(
+        select(TeamGame)
+        .where(*_schedule_criteria(sport, team_id, season))
+        .order_by(TeamGame.season.desc(), TeamGame.date.desc())
+        .offset(offset)
+        .limit(limit)
+    ).scalars().all()
+    if not rows:
+        return []
+    team_name = db.session.scalar(
+        select(_display_name(teams)).where(teams.c.team_id == team_id)
+    )
+
+    games = []
+    for row in rows:
+        home = (team_id, team_name, row.team_score)
+        visitor = (row.opponent_id, row.opponent_name, row.opponent_score)
+        if not row.is_home:
+            home, visitor = visitor, home
+        games.append(
+            {
+                "game_id": row.game_id,
+                "date": row.date,
+                "season": season_type(row.season) if row.season is not None else None,
+                "home_team_id": home[0],
+                "home_team_name": home[1],
+                "home_team_score": home[2],
+                "visitor_team_id": visitor[0],
+                "visitor_team_name": visitor[1],
+                "visitor_team_score": visitor[2],
+                "is_home": row.is_home,
+                "opponent_name": row.opponent_name,
+            }
+        )
+    return games
+
+
+def _game_written(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        pending = session.info.setdefault(_PENDING_GAMES, {})
+        pending.setdefault(_GAME_SPORTS[mapper.class_], set()).add(target.game_id)
+
+
+def _team_named(mapper, connection, target):
+    state = inspect(target)
+    fields = [name for name in ("name", "full_name") if name in state.attrs]
+    session = object_session(target)
+    if session is not None and any(
+        state.attrs[name].history.has_changes() for name in fields
+    ):
+        pending = session.info.setdefault(_PENDING_TEAMS, {})
+        pending.setdefault(_TEAM_SPORTS[mapper.class_], set()).add(target.team_id)
+
+
+for _model in _GAME_SPORTS:
+    event.listen(_model, "after_insert", _game_written)
+    event.listen(_model, "after_update", _game_written)
+    event.listen(_model, "after_delete", _game_written)
+for _model in _TEAM_SPORTS:
+    event.listen(_model, "after_insert", _team_named)
+    event.listen(_model, "after_update", _team_named)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _refresh_flushed(session, flush_context):
+    games = session.info.pop(_PENDING_GAMES, None)
+    teams = session.info.pop(_PENDING_TEAMS, None)
+    if not games and not teams:
+        return
+    connection = session.connection()
+    for sport, game_ids in (games or {}).items():
+        refresh_team_games(connection, sport, game_ids)
+    for sport, team_ids in (teams or {}).items():
+        refresh_opponent_names(connection, sport, team_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_GAMES, None)
+    session.info.pop(_PENDING_TEAMS, None)
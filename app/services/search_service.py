@@ -0,0 +1,207 @@
+"""Full-text search over athlete profiles.
+
+``AthleteProfile.search_vector`` holds a document built from the athlete's
+first and last name, position name and current team. On PostgreSQL the column
+is a ``tsvector`` covered by a GIN index; on SQLite the document is mirrored
+into an FTS5 shadow table. Mapper events rebuild the document whenever one of
+its source columns changes so the index never has to be refreshed by hand.
+"""
+import re
+
+import sqlalchemy as sa
+from sqlalchemy import DDL, event, func, inspect, literal_column, or_, select, text
+
+from app import db
+from app.models import AthleteProfile, AthleteStat, Position, User
+from app.utils.cache import invalidate_on_write
+
+FTS_TABLE = "athlete_search_fts"
+SEARCH_CACHE_TAG = "athlete_search"
+TS_CONFIG = "simple"
+MAX_QUERY_TOKENS = 8
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_athletes = AthleteProfile.__table__
+_users = User.__table__
+_positions = Position.__table__
+
+# The FTS5 table is not part of ``db.metadata``; it is created alongside
+# ``athlete_profiles`` by the DDL hooks below and only exists on SQLite.
+_fts = sa.Table(
+    FTS_TABLE,
+    sa.MetaData(),
+    sa.Column("athlete_id", sa.String(36)),
+    sa.Column("document", sa.Text),
+)
+
+event.listen(
+    _athletes,
+    "after_create",
+    DDL(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "athlete_id UNINDEXED, document, tokenize='unicode61 remove_diacritics 2')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    _athletes,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+
+def _document_expr():
+    """Return a SQL expression building the search document for each athlete row."""
+    first_name = (
+        select(_users.c.first_name)
+        .where(_users.c.user_id == _athletes.c.user_id)
+        .scalar_subquery()
+    )
+    last_name = (
+        select(_users.c.last_name)
+        .where(_users.c.user_id == _athletes.c.user_id)
+        .scalar_subquery()
+    )
+    position = (
+        select(_positions.c.name)
+        .where(_positions.c.position_id == _athletes.c.primary_position_id)
+        .scalar_subquery()
+    )
+    parts = [first_name, last_name, position, _athletes.c.current_team]
+    document = func.coalesce(parts[0], "")
+    for part in parts[1:]:
+        document = document + " " + func.coalesce(part, "")
+    return document
+
+
+def refresh_search_documents(connection, criterion):
+    """Rebuild search documents for athletes matching ``criterion``.
+
+    Runs as a single set-based ``UPDATE`` so a position rename refreshes every
+    affected athlete in one statement. ``updated_at`` is left untouched because
+    the document is derived data rather than a user edit.
+    """
+    document = _document_expr()
+    if connection.dialect.name == "postgresql":
+        document = func.to_tsvector(TS_CONFIG, document)
+    connection.execute(
+        sa.update(_athletes)
+        .where(criterion)
+        .values(search_vector=document, updated_at=_athletes.c.updated_at)
+    )
+    if connection.dialect.name == "sqlite":
+        ids = select(_athletes.c.athlete_id).where(criterion)
+        connection.execute(sa.delete(_fts).where(_fts.c.athlete_id.in_(ids)))
+        connection.execute(
+            sa.insert(_fts).from_select(
+                ["athlete_id", "document"],
+                select(_athletes.c.athlete_id, _athletes.c.search_vector).where(
+                    criterion, _athletes.c.is_deleted.isnot(True)
+                ),
+            )
+        )
+
+
+def rebuild_search_index():
+    """Recompute every athlete's search document."""
+    refresh_search_documents(db.session.connection(), sa.true())
+    db.session.commit()
+
+
+def _has_changes(target, fields):
+    state = inspect(target)
+    return any(state.attrs[name].history.has_changes() for name in fields)
+
+
+@event.listens_for(AthleteProfile, "after_insert")
+def _athlete_inserted(mapper, connection, target):
+    refresh_search_documents(connection, _athletes.c.athlete_id == target.athlete_id)
+
+
+@event.listens_for(AthleteProfile, "after_update")
+def _athlete_updated(mapper, connection, target):
+    fields = ("user_id", "primary_position_id", "current_team", "is_deleted")
+    if _has_changes(target, fields):
+        refresh_search_documents(
+            connection, _athletes.c.athlete_id == target.athlete_id
+        )
+
+
+@event.listens_for(AthleteProfile, "after_delete")
+def _athlete_deleted(mapper, connection, target):
+    if connection.dialect.name == "sqlite":
+        connection.execute(sa.delete(_fts).where(_fts.c.athlete_id == target.athlete_id))
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    if _has_changes(target, ("first_name", "last_name")):
+        refresh_search_documents(connection, _athletes.c.user_id == target.user_id)
+
+
+@event.listens_for(Position, "after_update")
+def _position_updated(mapper, connection, target):
+    if _has_changes(target, ("name",)):
+        refresh_search_documents(
+            connection, _athletes.c.primary_position_id == target.position_id
+        )
+
+
+# Cached search results depend on every athlete, their user and position,
+# and on stat values through the stat filters.
+invalidate_on_write(AthleteProfile, SEARCH_CACHE_TAG)
+invalidate_on_write(
+    User, SEARCH_CACHE_TAG, fields=("first_name", "last_name", "is_active")
+)
+invalidate_on_write(Position, SEARCH_CACHE_TAG)
+invalidate_on_write(
+    AthleteStat, SEARCH_CACHE_TAG, fields=("athlete_id", "name", "value", "season")
+)
+
+
+def search_tokens(q):
+    """Split free text into lower-case word tokens usable in a text query."""
+    return _TOKEN_RE.findall((q or "").lower())[:MAX_QUERY_TOKENS]
+
+
+def apply_text_search(query, q):
+    """Restrict ``query`` to athletes matching ``q``.
+
+    Every token is matched as a prefix so partially typed names still hit.
+    Returns the filtered query together with a relevance expression (higher is
+    better), or ``None`` when the backend has no full-text support and the
+    legacy ``ILIKE`` filter is used instead.
+    """
+    tokens = search_tokens(q)
+    if not tokens:
+        return query, None
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(TS_CONFIG, " & ".join(f"{t}:*" for t in tokens))
+        query = query.filter(AthleteProfile.search_vector.op("@@")(tsquery))
+        return query, func.ts_rank(AthleteProfile.search_vector, tsquery)
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{t}"*' for t in tokens)
+        hits = (
+            select(
+                _fts.c.athlete_id.label("athlete_id"),
+                (-func.bm25(literal_column(FTS_TABLE))).label("rank"),
+            )
+            .where(text(f"{FTS_TABLE} MATCH :match").bindparams(match=match))
+            .subquery()
+        )
+        query = query.join(hits, hits.c.athlete_id == AthleteProfile.athlete_id)
+        return query, hits.c.rank
+
+    pattern = f"%{q}%"
+    query = query.filter(
+        or_(
+            User.first_name.ilike(pattern),
+            User.last_name.ilike(pattern),
+            Position.name.ilike(pattern),
+            AthleteProfile.current_team.ilike(pattern),
+        )
+    )
+    return query, None
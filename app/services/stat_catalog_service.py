@@ -0,0 +1,259 @@
+"""Stat definition catalog and stat name normalization.
+
+``STAT_DEFINITIONS`` is the catalog of known stats per sport. It is mirrored
+into the ``stat_definitions`` table, seeded by its migration or when
+``create_all`` creates the table. Stat rows are keyed and indexed by their
+small-integer ``stat_definition_id``; the ``name`` they also carry is for
+display only. Every stat write passes through ``_normalize_stat``: an alias
+such as "PPG" or "points per game" is replaced by the canonical name and the
+row is linked to its definition, so seed data, provider syncs and API
+clients all store the same stat. Names the catalog does not know are added
+to it under the athlete's sport by ``define_stat``.
+"""
+import re
+
+import sqlalchemy as sa
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, object_session
+
+from app.models import (
+    AthleteProfile,
+    AthleteStat,
+    GameStat,
+    SeasonStat,
+    Sport,
+    StatDefinition,
+)
+
+_PENDING = "pending_stat_catalog_reload"
+# Definitions added in the current transaction, by (sport, stat key).
+_DEFINED = "defined_stat_definitions"
+# Sport of definitions added for athletes without a primary sport.
+NO_SPORT = ""
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# (sport, canonical name, unit, higher is better, aliases)
+STAT_DEFINITIONS = (
+    ("NBA", "PointsPerGame", "pts/g", True, ("PPG", "Points Per Game")),
+    ("NBA", "ReboundsPerGame", "reb/g", True, ("RPG", "Rebounds Per Game")),
+    ("NBA", "AssistsPerGame", "ast/g", True, ("APG", "Assists Per Game")),
+    ("NFL", "PassingYards", "yd", True, ("PassYds", "Pass Yds")),
+    ("NFL", "RushingYards", "yd", True, ("RushYds", "Rush Yds")),
+    ("NFL", "ReceivingYards", "yd", True, ("RecYds", "Rec Yds")),
+    ("NFL", "Touchdowns", None, True, ("TD", "TDs")),
+    ("NFL", "QBRating", None, True, ("QBR", "Passer Rating")),
+    ("NFL", "Tackles", None, True, ("Tkl",)),
+    ("NFL", "Sacks", None, True, ("Sk",)),
+    ("MLB", "BattingAverage", None, True, ("AVG", "BA")),
+    ("MLB", "HomeRuns", None, True, ("HR",)),
+    ("MLB", "RunsBattedIn", None, True, ("RBI",)),
+    ("MLB", "EarnedRunAverage", None, False, ("ERA",)),
+    ("MLB", "FieldingPercentage", None, True, ("FPCT", "FLD%")),
+    ("NHL", "Goals", None, True, ("G",)),
+    ("NHL", "Assists", None, True, ("A",)),
+    ("NHL", "Points", None, True, ("PTS", "P")),
+    ("SOC", "Goals", None, True, ("G",)),
+    ("SOC", "Assists", None, True, ("A",)),
+)
+
+_definitions = StatDefinition.__table__
+_athletes = AthleteProfile.__table__
+_sports = Sport.__table__
+
+
+def stat_key(name):
+    """Return the lookup key for a stat name: lower-case letters, digits and ``%``."""
+    return re.sub(r"[^a-z0-9%]", "", (name or "").lower())
+
+
+class StatCatalog:
+    """In-memory index of the ``stat_definitions`` table by sport and alias."""
+
+    def __init__(self, rows):
+        self.by_sport = {}
+        self.by_key = {}
+        for definition_id, sport, name, aliases in rows:
+            entry = (definition_id, name)
+            for key in {stat_key(name), *map(stat_key, aliases or ())}:
+                self.by_sport.setdefault((sport, key), entry)
+                self.by_key.setdefault(key, set()).add(entry)
+        self.sports = {sport for sport, _ in self.by_sport}
+
+    def resolve(self, name, sport=None):
+        """Return ``(stat_definition_id, canonical name)`` or ``None``.
+
+        Without a known ``sport`` the name must identify a single definition.
+        """
+        key = stat_key(name)
+        if sport in self.sports:
+            return self.by_sport.get((sport, key))
+        matches = self.by_key.get(key, ())
+        return next(iter(matches)) if len(matches) == 1 else None
+
+    def ids(self, name, sport=None):
+        """Return the ids of every definition ``name`` may refer to.
+
+        With a known ``sport`` that is at most one; otherwise every sport's
+        definition of the name.
+        """
+        if sport in self.sports:
+            found = self.by_sport.get((sport, stat_key(name)))
+            return {found[0]} if found else set()
+        return {definition_id for definition_id, _ in self.by_key.get(stat_key(name), ())}
+
+    def is_ambiguous(self, name):
+        return len(self.by_key.get(stat_key(name), ())) > 1
+
+
+def seed_stat_definitions(connection):
+    """Insert the catalog entries missing from ``stat_definitions``.
+
+    Migrated databases are seeded by the migration that creates the table;
+    this fills a table created by ``db.create_all()``.
+    """
+    existing = set(connection.execute(select(_definitions.c.sport, _definitions.c.name)))
+    rows = [
+        {
+            "sport": sport,
+            "name": name,
+            "unit": unit,
+            "higher_is_better": higher,
+            "aliases": list(aliases),
+        }
+        for sport, name, unit, higher, aliases in STAT_DEFINITIONS
+        if (sport, name) not in existing
+    ]
+    if rows:
+        connection.execute(sa.insert(_definitions), rows)
+    return len(rows)
+
+
+def get_stat_catalog(session):
+    """Return the app's ``StatCatalog``, loading it on first use."""
+    catalog = current_app.extensions.get("stat_catalog")
+    if catalog is None:
+        rows = session.connection().execute(
+            select(
+                _definitions.c.stat_definition_id,
+                _definitions.c.sport,
+                _definitions.c.name,
+                _definitions.c.aliases,
+            )
+        ).all()
+        catalog = current_app.extensions.setdefault("stat_catalog", StatCatalog(rows))
+    return catalog
+
+
+def define_stat(session, sport, name):
+    """Return ``(stat_definition_id, name)`` for ``sport``'s stat ``name``, adding it if missing.
+
+    Used for names the catalog does not resolve; the new definition has no
+    aliases and counts higher values as better. Other workers see it once
+    the transaction commits.
+    """
+    sport = sport or NO_SPORT
+    defined = session.info.setdefault(_DEFINED, {})
+    found = defined.get((sport, stat_key(name)))
+    if found is not None:
+        return found
+    connection = session.connection()
+    query = select(_definitions.c.stat_definition_id, _definitions.c.name).where(
+        _definitions.c.sport == sport, _definitions.c.name == name
+    )
+    row = connection.execute(query).first()
+    if row is None:
+        insert = _INSERTS.get(connection.dialect.name)
+        if insert is not None:
+            # A concurrent writer may be adding the same stat.
+            statement = insert(_definitions).on_conflict_do_nothing()
+        else:
+            statement = sa.insert(_definitions)
+        connection.execute(
+            statement.values(sport=sport, name=name, aliases=[], higher_is_better=True)
+        )
+        row = connection.execute(query).one()
+        session.info[_PENDING] = True
+    found = defined[(sport, stat_key(name))] = tuple(row)
+    return found
+
+
+def sport_of_stat_type(stat_type):
+    """Return the sport code prefixing a stat type such as "NFL_OFFENSE"."""
+    return (stat_type or "").split("_", 1)[0].upper() or None
+
+
+def canonical_stat_name(session, name, sport=None):
+    """Return the canonical spelling of ``name``, or ``name`` if it is unknown."""
+    found = get_stat_catalog(session).resolve(name, sport)
+    return found[1] if found else name
+
+
+def stat_ids(session, name, sport=None):
+    """Return the definition ids a filter on the stat ``name`` should match."""
+    return get_stat_catalog(session).ids(name, sport)
+
+
+def _athlete_sport(connection, athlete_id):
+    return connection.scalar(
+        select(_sports.c.code)
+        .join(_athletes, _athletes.c.primary_sport_id == _sports.c.sport_id)
+        .where(_athletes.c.athlete_id == athlete_id)
+    )
+
+
+def _row_sport(connection, target):
+    if isinstance(target, SeasonStat) and target.sport_id is not None:
+        return connection.scalar(
+            select(_sports.c.code).where(_sports.c.sport_id == target.sport_id)
+        )
+    return _athlete_sport(connection, target.athlete_id)
+
+
+def _normalize_stat(mapper, connection, target):
+    state = inspect(target)
+    if state.persistent and not state.attrs.name.history.has_changes():
+        return
+    session = object_session(target)
+    catalog = get_stat_catalog(session)
+    sport = None
+    if isinstance(target, AthleteStat):
+        sport = sport_of_stat_type(target.stat_type)
+    if sport not in catalog.sports and catalog.is_ambiguous(target.name):
+        sport = _row_sport(connection, target)
+    found = catalog.resolve(target.name, sport)
+    if found is None:
+        found = define_stat(session, _row_sport(connection, target), target.name)
+    target.stat_definition_id, target.name = found
+
+
+def _definition_written(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[_PENDING] = True
+
+
+for _model in (AthleteStat, SeasonStat, GameStat):
+    event.listen(_model, "before_insert", _normalize_stat)
+    event.listen(_model, "before_update", _normalize_stat)
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(StatDefinition, _event, _definition_written)
+
+
+@event.listens_for(_definitions, "after_create")
+def _seed_created(target, connection, **kw):
+    seed_stat_definitions(connection)
+
+
+@event.listens_for(Session, "after_commit")
+def _reload_committed(session):
+    session.info.pop(_DEFINED, None)
+    if session.info.pop(_PENDING, None) and has_app_context():
+        current_app.extensions.pop("stat_catalog", None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
+    session.info.pop(_DEFINED, None)
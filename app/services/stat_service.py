@@ -0,0 +1,101 @@
+"""Bulk athlete stat writes.
+
+``upsert_athlete_stats`` applies many stats for one athlete in a single
+transaction. Rows are keyed by ``(athlete_id, stat_definition_id, season)``,
+with a missing season matching only another missing one (the
+``uq_athlete_stat_key`` index coalesces it), and written through
+``upsert_service.bulk_upsert`` so concurrent writers cannot create
+duplicates. Names are resolved through the stat catalog exactly as single
+writes are. Core statements skip the mapper events, so the ranking
+refresh and cache invalidations those events would queue are queued here.
+"""
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import select
+
+from app import db
+from app.models import AthleteStat
+from app.models.stats import parse_stat_value
+from app.services.ranking_service import stats_written
+from app.services.stat_catalog_service import (
+    define_stat,
+    get_stat_catalog,
+    sport_of_stat_type,
+)
+from app.services.upsert_service import bulk_upsert
+from app.utils.cache import invalidate_model_on_commit
+
+_stats = AthleteStat.__table__
+_KEY = ("athlete_id", "stat_definition_id", "season")
+# Elements of the ``uq_athlete_stat_key`` expression index.
+_CONFLICT = (
+    _stats.c.athlete_id,
+    _stats.c.stat_definition_id,
+    sa.func.coalesce(_stats.c.season, sa.literal_column("''")),
+)
+_UPDATED = ("name", "stat_type", "value", "numeric_value", "updated_at")
+
+
+def _prepare(session, athlete, items):
+    """Return one row dict per stat key in ``items``; later items win."""
+    catalog = get_stat_catalog(session)
+    athlete_sport = athlete.primary_sport.code if athlete.primary_sport else None
+    now = datetime.utcnow()
+    rows = {}
+    for item in items:
+        if not isinstance(item, dict) or not item.get("name"):
+            raise ValueError("Every stat needs a name")
+        value = item.get("value")
+        if value is not None:
+            value = str(value)
+        # An empty type or season is stored as missing, like the index treats it.
+        stat_type = item.get("stat_type") or None
+        sport = sport_of_stat_type(stat_type)
+        if sport not in catalog.sports:
+            sport = athlete_sport
+        found = catalog.resolve(item["name"], sport)
+        if found is None:
+            found = define_stat(session, athlete_sport, item["name"])
+        definition_id, name = found
+        row = {
+            "athlete_id": athlete.athlete_id,
+            "name": name,
+            "stat_type": stat_type,
+            "season": item.get("season") or None,
+            "value": value,
+            "numeric_value": parse_stat_value(value),
+            "stat_definition_id": definition_id,
+            "updated_at": now,
+        }
+        rows[tuple(row[column] for column in _KEY)] = row
+    return rows
+
+
+def upsert_athlete_stats(athlete, items):
+    """Insert or update ``items`` (stat dicts) for ``athlete`` in one transaction.
+
+    Returns the stored ``AthleteStat`` rows in key order of first appearance.
+    Raises ``ValueError`` when an item has no name.
+    """
+    session = db.session
+    rows = _prepare(session, athlete, items)
+    if not rows:
+        return []
+    bulk_upsert(
+        session.connection(), _stats, rows.values(), _KEY, _UPDATED, conflict=_CONFLICT
+    )
+    stats_written(session, {athlete.athlete_id})
+    invalidate_model_on_commit(session, AthleteStat)
+    session.commit()
+
+    stored = {
+        tuple(getattr(stat, column) for column in _KEY): stat
+        for stat in session.scalars(
+            select(AthleteStat).where(
+                AthleteStat.athlete_id == athlete.athlete_id,
+                AthleteStat.stat_definition_id.in_({key[1] for key in rows}),
+            )
+        )
+    }
+    return [stored[key] for key in rows if key in stored]
@@ -0,0 +1,179 @@
+"""Resolve free-text team names to provider team ids.
+
+Every NBA, MLB, NFL and NHL team row written (normally by the providers'
+``sync_teams``) has its names, abbreviation, city and "city name" form
+normalized into ``team_aliases`` in the same transaction. Athlete writes that
+change ``current_team`` or the primary sport look the text up once and store
+the result in ``AthleteProfile.current_team_id``, so readers such as the game
+log start from the team's primary key instead of matching text. When new
+aliases appear, athletes of that sport that could not be resolved yet are
+retried.
+"""
+import re
+
+import sqlalchemy as sa
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import (
+    AthleteProfile,
+    MLBTeam,
+    NBATeam,
+    NFLTeam,
+    NHLTeam,
+    Sport,
+    TeamAlias,
+)
+from app.services.autocomplete_service import normalize
+
+_PENDING = "pending_team_aliases"
+
+# Sport code per provider team model and the columns naming the team's city.
+TEAM_MODELS = {
+    NBATeam: ("NBA", "city"),
+    MLBTeam: ("MLB", "location"),
+    NFLTeam: ("NFL", "city"),
+    NHLTeam: ("NHL", "location"),
+}
+_NAME_FIELDS = ("name", "full_name", "abbreviation")
+
+_aliases = TeamAlias.__table__
+_athletes = AthleteProfile.__table__
+_sports = Sport.__table__
+
+
+def normalize_team_name(text):
+    """Return ``text`` lower-cased without accents, punctuation or extra spaces."""
+    return " ".join(re.sub(r"[^\w\s]", " ", normalize(text)).split())
+
+
+def team_aliases(team, city_field):
+    """Return the normalized aliases of a provider ``team`` row."""
+    names = [getattr(team, field, None) for field in _NAME_FIELDS]
+    city = getattr(team, city_field, None)
+    names.append(city)
+    if city and team.name:
+        names.append(f"{city} {team.name}")
+    return {alias for alias in map(normalize_team_name, names) if alias}
+
+
+def resolve_team_id(connection, sport_id, name):
+    """Return the provider team id ``name`` refers to in ``sport_id``, if unique."""
+    alias = normalize_team_name(name)
+    if not alias or sport_id is None:
+        return None
+    team_ids = connection.scalars(
+        select(_aliases.c.team_id)
+        .join(_sports, _sports.c.code == _aliases.c.sport)
+        .where(_sports.c.sport_id == sport_id, _aliases.c.alias == alias)
+        .limit(2)
+    ).all()
+    return team_ids[0] if len(team_ids) == 1 else None
+
+
+def _resolve_athletes(connection, sport):
+    """Fill ``current_team_id`` for athletes of ``sport`` that are still unresolved."""
+    pending = connection.execute(
+        select(_athletes.c.athlete_id, _athletes.c.current_team)
+        .join(_sports, _sports.c.sport_id == _athletes.c.primary_sport_id)
+        .where(
+            _sports.c.code == sport,
+            _athletes.c.current_team.isnot(None),
+            _athletes.c.current_team_id.is_(None),
+        )
+    ).all()
+    if not pending:
+        return 0
+    teams = {}
+    for alias, team_id in connection.execute(
+        select(_aliases.c.alias, _aliases.c.team_id).where(_aliases.c.sport == sport)
+    ):
+        teams.setdefault(alias, set()).add(team_id)
+    rows = []
+    for athlete_id, current_team in pending:
+        found = teams.get(normalize_team_name(current_team), ())
+        if len(found) == 1:
+            rows.append({"b_athlete_id": athlete_id, "b_team_id": next(iter(found))})
+    if rows:
+        connection.execute(
+            sa.update(_athletes)
+            .where(_athletes.c.athlete_id == sa.bindparam("b_athlete_id"))
+            .values(current_team_id=sa.bindparam("b_team_id")),
+            rows,
+        )
+    return len(rows)
+
+
+def index_team_aliases(connection, sport, aliases):
+    """Add ``aliases`` (``{(alias, team_id), ...}``) for ``sport`` and resolve athletes."""
+    existing = set(
+        connection.execute(
+            select(_aliases.c.alias, _aliases.c.team_id).where(_aliases.c.sport == sport)
+        ).all()
+    )
+    added = [
+        {"sport": sport, "alias": alias, "team_id": team_id}
+        for alias, team_id in sorted(set(aliases) - existing)
+    ]
+    if added:
+        connection.execute(sa.insert(_aliases), added)
+    _resolve_athletes(connection, sport)
+    return len(added)
+
+
+def rebuild_team_index():
+    """Index every stored provider team and resolve every athlete's team."""
+    connection = db.session.connection()
+    for model, (sport, city_field) in TEAM_MODELS.items():
+        aliases = {
+            (alias, team.team_id)
+            for team in model.query.all()
+            for alias in team_aliases(team, city_field)
+        }
+        index_team_aliases(connection, sport, aliases)
+    db.session.commit()
+
+
+def _team_written(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    sport, city_field = TEAM_MODELS[mapper.class_]
+    pending = session.info.setdefault(_PENDING, {}).setdefault(sport, set())
+    pending.update((alias, target.team_id) for alias in team_aliases(target, city_field))
+
+
+def _resolve_athlete(mapper, connection, target):
+    state = inspect(target)
+    if not state.persistent and target.current_team_id is not None:
+        return
+    if state.persistent and not any(
+        state.attrs[name].history.has_changes()
+        for name in ("current_team", "primary_sport_id")
+    ):
+        return
+    target.current_team_id = resolve_team_id(
+        connection, target.primary_sport_id, target.current_team
+    )
+
+
+for _model in TEAM_MODELS:
+    event.listen(_model, "after_insert", _team_written)
+    event.listen(_model, "after_update", _team_written)
+event.listen(AthleteProfile, "before_insert", _resolve_athlete)
+event.listen(AthleteProfile, "before_update", _resolve_athlete)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _index_flushed(session, flush_context):
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        connection = session.connection()
+        for sport, aliases in pending.items():
+            index_team_aliases(connection, sport, aliases)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
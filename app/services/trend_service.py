@@ -0,0 +1,210 @@
+"""Per-game form trends for one athlete and stat.
+
+An athlete's numeric ``GameStat`` values for a stat, ordered by game date,
+are cached together with the number of rows they came from. Reads append
+games newer than the cached series with one small query instead of loading
+every game again; a row count that no longer adds up (a back-dated game or a
+deleted row), an edited value or a game moved to another date or season
+rebuilds the series. Rolling averages, streaks and season-to-date totals
+are then computed with vectorized NumPy over the whole series.
+"""
+import numpy as np
+from flask import current_app
+from sqlalchemy import event, func, inspect, select, tuple_
+from sqlalchemy.orm import object_session
+
+from app import cache, db
+from app.models import Game, GameStat
+from app.utils.cache import invalidate_on_commit
+
+DEFAULT_WINDOWS = (5, 10, 20)
+MAX_WINDOW = 100
+
+
+def _tag(athlete_id, name):
+    return f"trend:{athlete_id}:{name}"
+
+
+def _series_query(athlete_id, name):
+    return (
+        select(GameStat.game_id, Game.date, Game.season, GameStat.numeric_value)
+        .join(Game, Game.game_id == GameStat.game_id)
+        .where(
+            GameStat.athlete_id == athlete_id,
+            GameStat.name == name,
+            GameStat.numeric_value.isnot(None),
+            Game.date.isnot(None),
+        )
+    )
+
+
+def _count_query(athlete_id, name):
+    return _series_query(athlete_id, name).with_only_columns(func.count()).order_by(None)
+
+
+def _load_series(athlete_id, name, after=None):
+    query = _series_query(athlete_id, name).order_by(Game.date, GameStat.game_id)
+    if after is not None:
+        query = query.where(tuple_(Game.date, GameStat.game_id) > tuple_(*after))
+    return db.session.execute(query).all()
+
+
+def game_series(athlete_id, name):
+    """Return ``{"game_ids", "dates", "seasons", "values"}`` for the stat, oldest first.
+
+    The cached series is extended with newer games rather than reloaded.
+    """
+    key = f"trends:{athlete_id}:{name}"
+    tags = [_tag(athlete_id, name)]
+    series = cache.get(key, tags=tags)
+    if series is not None and series["game_ids"]:
+        after = (series["dates"][-1], series["game_ids"][-1])
+        rows = _load_series(athlete_id, name, after)
+        count = db.session.scalar(_count_query(athlete_id, name))
+        if count != len(series["game_ids"]) + len(rows):
+            series = None
+        elif not rows:
+            return series
+    else:
+        series, rows = None, None
+    if series is None:
+        series = {"game_ids": [], "dates": [], "seasons": [], "values": []}
+        rows = _load_series(athlete_id, name)
+    for game_id, day, season, value in rows:
+        series["game_ids"].append(game_id)
+        series["dates"].append(day)
+        series["seasons"].append(season)
+        series["values"].append(value)
+    cache.set(key, series, tags=tags, timeout=current_app.config.get("TREND_CACHE_TIMEOUT"))
+    return series
+
+
+def rolling_means(values, window):
+    """Return the mean of each ``window`` games ending at every game (NaN before)."""
+    means = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.concatenate(([0.0], np.cumsum(values)))
+        means[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return means
+
+
+def _longest_run(mask):
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return int((edges[1::2] - edges[::2]).max()) if edges.size else 0
+
+
+def streaks(values):
+    """Return the current and longest runs of games above and below the mean."""
+    if not len(values):
+        return {"baseline": None, "direction": None, "length": 0,
+                "longest_above": 0, "longest_below": 0}
+    baseline = float(values.mean())
+    above, below = values > baseline, values < baseline
+    last = above if above[-1] else below if below[-1] else None
+    length = 0
+    if last is not None:
+        misses = np.flatnonzero(~last[::-1])
+        length = int(misses[0]) if misses.size else len(values)
+    return {
+        "baseline": baseline,
+        "direction": "above" if above[-1] else "below" if below[-1] else None,
+        "length": length,
+        "longest_above": _longest_run(above),
+        "longest_below": _longest_run(below),
+    }
+
+
+def athlete_trends(athlete_id, name, windows=DEFAULT_WINDOWS, limit=None):
+    """Return rolling averages, streaks and season-to-date totals for a stat.
+
+    ``games`` lists the most recent ``limit`` games (all when ``None``),
+    oldest first; averages are still taken over the full series.
+    """
+    series = game_series(athlete_id, name)
+    values = np.asarray(series["values"], dtype=float)
+    seasons = np.asarray(series["seasons"], dtype=object)
+    count = len(values)
+
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    new_season = np.ones(count, dtype=bool)
+    new_season[1:] = seasons[1:] != seasons[:-1]
+    starts = np.flatnonzero(new_season)
+    group = np.cumsum(new_season) - 1
+    season_totals = sums[1:] - sums[starts][group]
+    season_games = np.arange(count) - starts[group] + 1
+    rolling = {window: rolling_means(values, window) for window in windows}
+
+    first = 0 if limit is None else max(count - limit, 0)
+    games = [
+        {
+            "game_id": series["game_ids"][i],
+            "date": series["dates"][i].isoformat(),
+            "season": series["seasons"][i],
+            "value": float(values[i]),
+            "season_total": float(season_totals[i]),
+            "season_games": int(season_games[i]),
+            "rolling": {
+                str(window): None if np.isnan(means[i]) else float(means[i])
+                for window, means in rolling.items()
+            },
+        }
+        for i in range(first, count)
+    ]
+    totals = {}
+    for start, end in zip(starts, np.append(starts[1:], count)):
+        games_played = int(end - start)
+        total = float(sums[end] - sums[start])
+        totals[series["seasons"][start] or ""] = {
+            "games": games_played,
+            "total": total,
+            "average": total / games_played,
+        }
+    return {
+        "athlete_id": athlete_id,
+        "stat": name,
+        "windows": list(windows),
+        "games": games,
+        "streak": streaks(values),
+        "seasons": totals,
+    }
+
+
+def _previous_tags(target):
+    """Return the trend tags of ``target`` before and after the pending change."""
+    state = inspect(target)
+    athlete_ids = {target.athlete_id, *state.attrs.athlete_id.history.deleted}
+    names = {target.name, *state.attrs.name.history.deleted}
+    return [_tag(athlete_id, name) for athlete_id in athlete_ids for name in names]
+
+
+def _game_stat_updated(mapper, connection, target):
+    state = inspect(target)
+    fields = ("numeric_value", "name", "game_id", "athlete_id")
+    if any(state.attrs[f].history.has_changes() for f in fields):
+        invalidate_on_commit(object_session(target), *_previous_tags(target))
+
+
+def _game_stat_deleted(mapper, connection, target):
+    invalidate_on_commit(object_session(target), _tag(target.athlete_id, target.name))
+
+
+def _game_updated(mapper, connection, target):
+    # Moving a game to another date or season reorders or regroups every
+    # series it is part of.
+    state = inspect(target)
+    if not any(state.attrs[f].history.has_changes() for f in ("date", "season")):
+        return
+    rows = connection.execute(
+        select(GameStat.athlete_id, GameStat.name)
+        .where(GameStat.game_id == target.game_id)
+        .distinct()
+    )
+    tags = [_tag(athlete_id, name) for athlete_id, name in rows]
+    if tags:
+        invalidate_on_commit(object_session(target), *tags)
+
+
+# New games are appended on read; edits and deletions rebuild the series.
+event.listen(GameStat, "after_update", _game_stat_updated)
+event.listen(GameStat, "after_delete", _game_stat_deleted)
+event.listen(Game, "after_update", _game_updated)
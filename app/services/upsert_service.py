@@ -0,0 +1,189 @@
+"""Bulk inserts and updates for provider syncs.
+
+``bulk_upsert`` writes many rows keyed by a unique column set with the
+dialect's ``INSERT ... ON CONFLICT DO UPDATE`` in chunks of ``CHUNK`` rows.
+Other dialects read which keys exist with one ``IN`` query per chunk and
+then issue one executemany ``UPDATE`` and one ``INSERT``. Either way a sync
+costs a few statements per chunk instead of a ``SELECT`` and a write per row.
+
+Core statements skip the mapper events, so ``upsert_teams`` and
+``upsert_games`` refresh what those events would: the team alias index, the
+autocomplete entries and the per-team schedule rows.
+"""
+import logging
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import sqlalchemy as sa
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models import NBAGame, NHLGame
+from app.services.autocomplete_service import queue_teams
+from app.services.schedule_service import (
+    SCHEDULES,
+    refresh_opponent_names,
+    refresh_team_games,
+)
+from app.services.team_service import TEAM_MODELS, index_team_aliases, team_aliases
+
+logger = logging.getLogger(__name__)
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_GAME_SPORTS = {NBAGame: "NBA", NHLGame: "NHL"}
+CHUNK = 500
+
+
+def _stamped(table, rows, key, nulls=False):
+    """Return ``rows`` deduplicated by ``key`` (later rows win) with ``updated_at`` set."""
+    now = datetime.utcnow()
+    unique = {}
+    for row in rows:
+        values = tuple(row[column] for column in key)
+        if None in values and not nulls:
+            continue
+        row = dict(row)
+        if "updated_at" in table.c:
+            row.setdefault("updated_at", now)
+        unique[values] = row
+    return list(unique.values())
+
+
+def _matches(column, value, nulls):
+    return column.is_not_distinct_from(value) if nulls else column == value
+
+
+def _key_criteria(table, key, keys, nulls=False):
+    if nulls:
+        return sa.or_(*(
+            sa.and_(*(_matches(table.c[column], value, nulls) for column, value in zip(key, values)))
+            for values in keys
+        ))
+    if len(key) == 1:
+        return table.c[key[0]].in_([values[0] for values in keys])
+    return tuple_(*(table.c[column] for column in key)).in_(keys)
+
+
+def _update_statement(table, key, columns, increment=(), nulls=False):
+    values = {column: sa.bindparam(f"b_{column}") for column in columns}
+    values.update(
+        (column, sa.func.coalesce(table.c[column], 0) + sa.bindparam(f"b_{column}"))
+        for column in increment
+    )
+    return (
+        sa.update(table)
+        .where(*(_matches(table.c[column], sa.bindparam(f"b_{column}"), nulls) for column in key))
+        .values(values)
+    )
+
+
+def _bound(rows, columns):
+    return [{f"b_{column}": row[column] for column in columns} for row in rows]
+
+
+def bulk_upsert(connection, table, rows, key, update=None, increment=(), conflict=None):
+    """Insert or update ``rows`` (column dicts) of ``table`` keyed by ``key``.
+
+    ``update`` names the columns overwritten for existing rows (every
+    non-key column of the rows by default) and ``increment`` the columns
+    added to the stored value instead. Rows sharing a key are written once,
+    the last one winning; rows with a NULL key column are skipped.
+
+    ``conflict`` gives the elements of a unique expression index standing
+    for ``key``, such as ``coalesce(season, '')`` so that NULLs collide.
+    Rows with NULL key columns are then written too, and matched with ``IS
+    NOT DISTINCT FROM`` on dialects without ``ON CONFLICT``.
+    Returns the number of rows written.
+    """
+    started = time.perf_counter()
+    nulls = conflict is not None
+    rows = _stamped(table, rows, key, nulls)
+    if not rows:
+        return 0
+    if update is None:
+        update = [column for column in rows[0] if column not in key and column not in increment]
+    elif "updated_at" in rows[0] and "updated_at" not in update:
+        update = [*update, "updated_at"]
+    insert = _INSERTS.get(connection.dialect.name)
+    for i in range(0, len(rows), CHUNK):
+        chunk = rows[i:i + CHUNK]
+        if insert is not None:
+            statement = insert(table)
+            set_ = {column: statement.excluded[column] for column in update}
+            set_.update(
+                (column, sa.func.coalesce(table.c[column], 0) + statement.excluded[column])
+                for column in increment
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=conflict if nulls else [table.c[column] for column in key],
+                set_=set_,
+            )
+            connection.execute(statement, chunk)
+            continue
+        keyed = {tuple(row[column] for column in key): row for row in chunk}
+        existing = set(
+            connection.execute(
+                select(*(table.c[column] for column in key)).where(
+                    _key_criteria(table, key, list(keyed), nulls)
+                )
+            ).all()
+        )
+        updates = [row for values, row in keyed.items() if values in existing]
+        inserts = [row for values, row in keyed.items() if values not in existing]
+        if updates:
+            connection.execute(
+                _update_statement(table, key, update, increment, nulls),
+                _bound(updates, [*key, *update, *increment]),
+            )
+        if inserts:
+            connection.execute(sa.insert(table), inserts)
+    elapsed = time.perf_counter() - started
+    logger.debug(
+        "Upserted %d %s rows in %.3fs (%.0f rows/s)",
+        len(rows), table.name, elapsed, len(rows) / elapsed if elapsed else 0,
+    )
+    return len(rows)
+
+
+def bulk_update(connection, table, rows, key):
+    """Update existing rows of ``table`` from ``rows``; unknown keys are ignored."""
+    rows = _stamped(table, rows, key)
+    if not rows:
+        return 0
+    columns = [column for column in rows[0] if column not in key]
+    statement = _update_statement(table, key, columns)
+    for i in range(0, len(rows), CHUNK):
+        connection.execute(statement, _bound(rows[i:i + CHUNK], [*key, *columns]))
+    return len(rows)
+
+
+def upsert_teams(model, rows):
+    """Upsert provider team ``rows`` and index their aliases, names and autocomplete entries."""
+    connection = db.session.connection()
+    count = bulk_upsert(connection, model.__table__, rows, ("team_id",))
+    rows = [row for row in rows if row["team_id"] is not None]
+    if not rows:
+        return count
+    sport, city_field = TEAM_MODELS[model]
+    aliases = {
+        (alias, row["team_id"])
+        for row in rows
+        for alias in team_aliases(SimpleNamespace(**row), city_field)
+    }
+    index_team_aliases(connection, sport, aliases)
+    queue_teams(connection, db.session, model, {row["team_id"] for row in rows})
+    if sport in SCHEDULES:
+        refresh_opponent_names(connection, sport, {row["team_id"] for row in rows})
+    return count
+
+
+def upsert_games(model, rows):
+    """Upsert provider game ``rows`` and rebuild their per-team schedule rows."""
+    connection = db.session.connection()
+    count = bulk_upsert(connection, model.__table__, rows, ("game_id",))
+    game_ids = {row["game_id"] for row in rows if row["game_id"] is not None}
+    if game_ids:
+        refresh_team_games(connection, _GAME_SPORTS[model], game_ids)
+    return count
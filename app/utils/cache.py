@@ -0,0 +1,186 @@
+"""Shared result cache with TTLs and tag-based invalidation.
+
+Entries live in Redis when ``CACHE_REDIS_URL`` is configured so every worker
+sees the same warm results, and in an in-process ``cachelib.SimpleCache``
+otherwise. Each entry is stored under one or more tags. Invalidating a tag
+gives it a new version, and every key cached under the old version stops
+matching, so stale entries are never served and simply age out.
+
+Writes are tied to the database transaction: model listeners queue tags on the
+session and they are only invalidated once the transaction commits.
+"""
+import logging
+import time
+
+from cachelib import RedisCache, SimpleCache
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+logger = logging.getLogger(__name__)
+
+_PENDING_TAGS = "pending_cache_tags"
+# Static tags registered per model by ``invalidate_on_write``.
+_MODEL_TAGS = {}
+
+
+def _backend():
+    return current_app.extensions["result_cache"]
+
+
+def _tag_key(tag):
+    return f"tag:{tag}"
+
+
+class ResultCache:
+    """Flask extension exposing a tag-aware cache on top of cachelib."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CACHE_REDIS_URL", None)
+        app.config.setdefault("CACHE_KEY_PREFIX", "prosports:")
+        app.config.setdefault("CACHE_DEFAULT_TIMEOUT", 300)
+        app.config.setdefault("CACHE_THRESHOLD", 1000)
+
+        url = app.config["CACHE_REDIS_URL"]
+        timeout = app.config["CACHE_DEFAULT_TIMEOUT"]
+        if url:
+            import redis
+
+            backend = RedisCache(
+                host=redis.from_url(url),
+                key_prefix=app.config["CACHE_KEY_PREFIX"],
+                default_timeout=timeout,
+            )
+        else:
+            backend = SimpleCache(
+                threshold=app.config["CACHE_THRESHOLD"], default_timeout=timeout
+            )
+        app.extensions["result_cache"] = backend
+
+    def _versioned_key(self, key, tags):
+        if not tags:
+            return key
+        backend = _backend()
+        tag_keys = [_tag_key(t) for t in tags]
+        versions = backend.get_many(*tag_keys)
+        parts = []
+        for tag, tag_key, version in zip(tags, tag_keys, versions):
+            if version is None:
+                # Unknown or evicted tag: start a fresh version so entries
+                # written under an earlier one can never match again.
+                backend.add(tag_key, time.time_ns(), timeout=0)
+                version = backend.get(tag_key)
+            parts.append(f"{tag}={version}")
+        return f"{key}|{','.join(parts)}"
+
+    def get(self, key, tags=()):
+        """Return the cached value for ``key`` or ``None`` on a miss."""
+        try:
+            entry = _backend().get(self._versioned_key(key, tags))
+        except Exception as exc:
+            logger.warning("Result cache read failed for %s: %s", key, exc)
+            return None
+        return entry[0] if entry is not None else None
+
+    def set(self, key, value, tags=(), timeout=None):
+        """Store ``value`` under ``key`` for ``timeout`` seconds."""
+        try:
+            _backend().set(self._versioned_key(key, tags), (value,), timeout=timeout)
+        except Exception as exc:
+            logger.warning("Result cache write failed for %s: %s", key, exc)
+
+    def get_or_set(self, key, factory, tags=(), timeout=None):
+        """Return the cached value for ``key``, computing it with ``factory`` on a miss."""
+        tags = list(tags)
+        try:
+            versioned = self._versioned_key(key, tags)
+            entry = _backend().get(versioned)
+        except Exception as exc:
+            logger.warning("Result cache unavailable for %s: %s", key, exc)
+            return factory()
+        if entry is not None:
+            return entry[0]
+        value = factory()
+        try:
+            _backend().set(versioned, (value,), timeout=timeout)
+        except Exception as exc:
+            logger.warning("Result cache write failed for %s: %s", key, exc)
+        return value
+
+    def invalidate(self, *tags):
+        """Expire every entry stored under any of ``tags``."""
+        invalidate_tags(*tags)
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        _backend().clear()
+
+
+def invalidate_tags(*tags):
+    """Give each tag a new version so entries cached under it stop matching."""
+    if not tags:
+        return
+    version = time.time_ns()
+    try:
+        _backend().set_many({_tag_key(t): version for t in tags}, timeout=0)
+    except Exception as exc:
+        logger.warning("Result cache invalidation failed for %s: %s", tags, exc)
+
+
+def invalidate_on_commit(session, *tags):
+    """Queue ``tags`` for invalidation when ``session`` commits."""
+    if session is not None and tags:
+        session.info.setdefault(_PENDING_TAGS, set()).update(tags)
+
+
+def invalidate_model_on_commit(session, model):
+    """Queue every static tag registered for ``model`` with ``invalidate_on_write``.
+
+    For bulk Core statements, which write ``model`` rows without firing the
+    mapper events those registrations listen to.
+    """
+    invalidate_on_commit(session, *_MODEL_TAGS.get(model, ()))
+
+
+def invalidate_on_write(model, *tags, fields=None):
+    """Invalidate ``tags`` after commits that insert, update or delete ``model`` rows.
+
+    A tag may be a callable receiving the written instance, for per-row tags.
+    When ``fields`` is given, updates only count if one of those attributes
+    changed.
+    """
+
+    _MODEL_TAGS.setdefault(model, set()).update(t for t in tags if not callable(t))
+
+    def _resolve(target):
+        return [t(target) if callable(t) else t for t in tags]
+
+    def _written(mapper, connection, target):
+        invalidate_on_commit(object_session(target), *_resolve(target))
+
+    def _updated(mapper, connection, target):
+        if fields is not None:
+            state = inspect(target)
+            if not any(state.attrs[f].history.has_changes() for f in fields):
+                return
+        invalidate_on_commit(object_session(target), *_resolve(target))
+
+    event.listen(model, "after_insert", _written)
+    event.listen(model, "after_update", _updated)
+    event.listen(model, "after_delete", _written)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    tags = session.info.pop(_PENDING_TAGS, None)
+    if tags and has_app_context() and "result_cache" in current_app.extensions:
+        invalidate_tags(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_TAGS, None)
@@ -0,0 +1,70 @@
+"""Conditional GET support (ETag / Last-Modified / 304) for read endpoints.
+
+A resource's version is taken from the rows it is built from: the latest
+``updated_at`` and the row count of each source, all fetched in one query.
+The count catches deletions that leave the maximum timestamp unchanged. When
+the client's validators still match, a bare ``304 Not Modified`` is returned
+and the payload is never loaded or serialized.
+"""
+import hashlib
+from datetime import timezone
+
+from flask import current_app, request
+from sqlalchemy import func, select
+
+from app import db
+
+
+def _timestamp_column(source):
+    return source.updated_at if hasattr(source, "__table__") else source
+
+
+def row_versions(*sources):
+    """Return ``[(latest_timestamp, count), ...]`` for each source in one query.
+
+    Each source is a tuple of a model (versioned by ``updated_at``) or a
+    timestamp column, followed by the criteria selecting its rows.
+    """
+    columns = []
+    for target, *criteria in sources:
+        stamp = _timestamp_column(target)
+        columns.append(select(func.max(stamp)).where(*criteria).scalar_subquery())
+        columns.append(
+            select(func.count()).select_from(stamp.table).where(*criteria).scalar_subquery()
+        )
+    row = db.session.execute(select(*columns)).one()
+    return list(zip(row[::2], row[1::2]))
+
+
+def conditional_response(versions, build):
+    """Return ``304`` if the request's validators match ``versions``, else ``build()``.
+
+    ``build`` is only called when the client needs the body; its response is
+    given the ``ETag`` and ``Last-Modified`` headers for ``versions``.
+    """
+    digest = hashlib.sha1(
+        "|".join(f"{stamp}:{count}" for stamp, count in versions).encode()
+    ).hexdigest()
+    etag = digest[:32]
+    stamps = [stamp for stamp, _ in versions if stamp is not None]
+    last_modified = max(stamps).replace(tzinfo=timezone.utc) if stamps else None
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        not_modified = (
+            last_modified is not None
+            and request.if_modified_since is not None
+            and last_modified.replace(microsecond=0) <= request.if_modified_since
+        )
+
+    if not_modified:
+        response = current_app.response_class(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Clients may store the body but must revalidate before reusing it.
+    response.cache_control.no_cache = True
+    return response
@@ -1,6 +1,64 @@
+import base64
+import json
+
 from flask_sqlalchemy import BaseQuery
+from sqlalchemy import tuple_
+
+MAX_PAGE_SIZE = 100
 
 
 def paginate_query(query: BaseQuery, page: int = 1, per_page: int = 10):
     """Return pagination for a SQLAlchemy query."""
     return query.paginate(page=page, per_page=per_page, error_out=False)
+
+
+def encode_cursor(values):
+    """Return an opaque, URL-safe cursor for a list of key values."""
+    raw = json.dumps(values, default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the key values stored in ``cursor``.
+
+    Raises ``ValueError`` if the cursor was not produced by ``encode_cursor``.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def keyset_paginate(query: BaseQuery, keys, cursor=None, limit: int = 10):
+    """Return ``(items, next_cursor)`` for ``query`` ordered by ``keys`` descending.
+
+    Rows after the cursor are selected with a row-value comparison on the sort
+    keys, so with a matching index every page costs the same as the first and
+    no ``COUNT(*)`` is needed. ``next_cursor`` is ``None`` on the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(keys):
+            raise ValueError('Invalid cursor')
+        try:
+            values = [key.type.python_type(v) for key, v in zip(keys, values)]
+        except (TypeError, ValueError, ArithmeticError) as exc:
+            raise ValueError('Invalid cursor') from exc
+        query = query.filter(tuple_(*keys) < tuple_(*values))
+
+    rows = (
+        query.add_columns(*keys)
+        .order_by(*[key.desc() for key in keys])
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(list(rows[-1][1:]))
+    return [row[0] for row in rows], next_cursor
@@ -25,6 +25,40 @@ class Config:
     CLIENT_SATISFACTION_PERCENT = float(os.environ.get('CLIENT_SATISFACTION_PERCENT', '98.7'))
     TOP_RANKINGS_FILE = os.environ.get('TOP_RANKINGS_FILE')
     ENABLE_SCHEDULER = os.environ.get('ENABLE_SCHEDULER', 'false').lower() == 'true'
+    SYNC_WORKERS = int(os.environ.get('SYNC_WORKERS', '4'))
+
+    # Outbound API rate limits: requests per second and back-to-back burst
+    NBA_API_RATE_LIMIT = float(os.environ.get('NBA_API_RATE_LIMIT', '1.0'))
+    NBA_API_BURST = int(os.environ.get('NBA_API_BURST', '1'))
+    NHL_API_RATE_LIMIT = float(os.environ.get('NHL_API_RATE_LIMIT', '1.0'))
+    NHL_API_BURST = int(os.environ.get('NHL_API_BURST', '1'))
+    NFL_API_RATE_LIMIT = float(os.environ.get('NFL_API_RATE_LIMIT', '1.0'))
+    NFL_API_BURST = int(os.environ.get('NFL_API_BURST', '1'))
+    MLB_API_RATE_LIMIT = float(os.environ.get('MLB_API_RATE_LIMIT', '1.0'))
+    MLB_API_BURST = int(os.environ.get('MLB_API_BURST', '1'))
+
+    # Shared result cache (falls back to an in-process cache without Redis)
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL')
+    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', '300'))
+    SEARCH_CACHE_TIMEOUT = int(os.environ.get('SEARCH_CACHE_TIMEOUT', '120'))
+    FACET_CACHE_TIMEOUT = int(os.environ.get('FACET_CACHE_TIMEOUT', '30'))
+    FEATURED_CACHE_TIMEOUT = int(os.environ.get('FEATURED_CACHE_TIMEOUT', '600'))
+    KPI_CACHE_TIMEOUT = int(os.environ.get('KPI_CACHE_TIMEOUT', '60'))
+    COMPARE_CACHE_TIMEOUT = int(os.environ.get('COMPARE_CACHE_TIMEOUT', '300'))
+    TREND_CACHE_TIMEOUT = int(os.environ.get('TREND_CACHE_TIMEOUT', '3600'))
+    AUTOCOMPLETE_REFRESH_SECONDS = int(os.environ.get('AUTOCOMPLETE_REFRESH_SECONDS', '600'))
+    RANKING_REFRESH_SECONDS = int(os.environ.get('RANKING_REFRESH_SECONDS', '60'))
+    LEADERBOARD_REFRESH_SECONDS = int(os.environ.get('LEADERBOARD_REFRESH_SECONDS', '300'))
+    DISTRIBUTION_REFRESH_SECONDS = int(os.environ.get('DISTRIBUTION_REFRESH_SECONDS', '600'))
+    STATS_BULK_LIMIT = int(os.environ.get('STATS_BULK_LIMIT', '1000'))
+
+    # Shared external API response cache (Redis when CACHE_REDIS_URL is set)
+    HTTP_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR') or os.path.join(basedir, 'instance', 'http_cache')
+    HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', '604800'))
+    HTTP_CACHE_TEAMS_TTL = int(os.environ.get('HTTP_CACHE_TEAMS_TTL', '86400'))
+    HTTP_CACHE_STANDINGS_TTL = int(os.environ.get('HTTP_CACHE_STANDINGS_TTL', '900'))
+    HTTP_CACHE_GAMES_TTL = int(os.environ.get('HTTP_CACHE_GAMES_TTL', '900'))
+    HTTP_CACHE_STATS_TTL = int(os.environ.get('HTTP_CACHE_STATS_TTL', '3600'))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -35,6 +69,8 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///:memory:'
+    CACHE_REDIS_URL = None
+    HTTP_CACHE_DIR = None
 
 config = {
     'development': DevelopmentConfig,
@@ -1,6 +1,8 @@
 import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 
+const PAGE_SIZE = 25;
+
 export default function AthleteList() {
   const [athletes, setAthletes] = useState([]);
   const [q, setQ] = useState('');
@@ -12,8 +14,9 @@ export default function AthleteList() {
   const [name, setName] = useState('');
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
 
-  const fetchAthletes = () => {
+  const fetchAthletes = (cursor = null) => {
     setLoading(true);
     setError(null);
 
@@ -25,13 +28,23 @@ export default function AthleteList() {
     if (minAge) params.append('min_age', minAge);
     if (maxAge) params.append('max_age', maxAge);
     if (name) params.append('name', name);
+    // Text searches come back as one relevance-ranked page; only browsing
+    // pages through every match with the cursor.
+    if (!q) {
+      params.append('limit', PAGE_SIZE);
+      if (cursor) params.append('cursor', cursor);
+    }
 
     fetch(`/api/athletes/search?${params.toString()}`)
       .then((res) => {
         if (!res.ok) throw new Error('Failed to fetch');
         return res.json();
       })
-      .then((data) => setAthletes(data.results || []))
+      .then((data) => {
+        const results = data.results || [];
+        setAthletes((prev) => (cursor ? [...prev, ...results] : results));
+        setNextCursor(data.next_cursor || null);
+      })
       .catch((err) => {
         console.error('Failed to fetch athletes', err);
         setError('Failed to fetch athletes');
@@ -89,19 +102,19 @@ export default function AthleteList() {
           value={maxAge}
           onChange={(e) => setMaxAge(e.target.value)}
         />
-        <button onClick={fetchAthletes}>Search</button>
+        <button onClick={() => fetchAthletes()}>Search</button>
       </div>
       {error && <div style={{ color: 'red' }}>{error}</div>}
-      {loading ? (
-        <div>Loading...</div>
-      ) : (
-        <ul>
-          {athletes.map((a) => (
-            <li key={a.athlete_id}>
-              <Link to={`/athletes/${a.athlete_id}`}>{a.user.full_name}</Link>
-            </li>
-          ))}
-        </ul>
+      <ul>
+        {athletes.map((a) => (
+          <li key={a.athlete_id}>
+            <Link to={`/athletes/${a.athlete_id}`}>{a.user.full_name}</Link>
+          </li>
+        ))}
+      </ul>
+      {loading && <div>Loading...</div>}
+      {!loading && nextCursor && (
+        <button onClick={() => fetchAthletes(nextCursor)}>Load more</button>
       )}
     </div>
   );
@@ -0,0 +1,66 @@
+"""turn athlete search_vector into a maintained full-text document
+
+Revision ID: 3c1d7a9e5b42
+Revises: f29d5d6ebc1b
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3c1d7a9e5b42'
+down_revision = 'f29d5d6ebc1b'
+branch_labels = None
+depends_on = None
+
+
+DOCUMENT_SQL = """
+    coalesce((SELECT first_name FROM users WHERE users.user_id = athlete_profiles.user_id), '')
+    || ' ' || coalesce((SELECT last_name FROM users WHERE users.user_id = athlete_profiles.user_id), '')
+    || ' ' || coalesce((SELECT name FROM positions
+                        WHERE positions.position_id = athlete_profiles.primary_position_id), '')
+    || ' ' || coalesce(current_team, '')
+"""
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('idx_athletes_search', table_name='athlete_profiles')
+        op.execute(
+            'ALTER TABLE athlete_profiles '
+            'ALTER COLUMN search_vector TYPE tsvector USING NULL'
+        )
+        op.execute(
+            f"UPDATE athlete_profiles SET search_vector = to_tsvector('simple', {DOCUMENT_SQL})"
+        )
+        op.create_index(
+            'idx_athletes_search',
+            'athlete_profiles',
+            ['search_vector'],
+            postgresql_using='gin',
+        )
+    elif bind.dialect.name == 'sqlite':
+        op.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS athlete_search_fts USING fts5('
+            "athlete_id UNINDEXED, document, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(f'UPDATE athlete_profiles SET search_vector = {DOCUMENT_SQL}')
+        op.execute(
+            'INSERT INTO athlete_search_fts (athlete_id, document) '
+            'SELECT athlete_id, search_vector FROM athlete_profiles '
+            'WHERE coalesce(is_deleted, 0) = 0'
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('idx_athletes_search', table_name='athlete_profiles')
+        op.execute(
+            'ALTER TABLE athlete_profiles '
+            'ALTER COLUMN search_vector TYPE text USING search_vector::text'
+        )
+        op.create_index('idx_athletes_search', 'athlete_profiles', ['search_vector'])
+    elif bind.dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS athlete_search_fts')
@@ -0,0 +1,27 @@
+"""add index backing keyset pagination of athletes
+
+Revision ID: 7a2e4f0c9d13
+Revises: 3c1d7a9e5b42
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7a2e4f0c9d13'
+down_revision = '3c1d7a9e5b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_athletes_rating_keyset',
+        'athlete_profiles',
+        [sa.text('coalesce(overall_rating, 0)'), 'athlete_id'],
+    )
+
+
+def downgrade():
+    op.drop_index('idx_athletes_rating_keyset', table_name='athlete_profiles')
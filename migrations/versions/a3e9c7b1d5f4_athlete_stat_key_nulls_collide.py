@@ -0,0 +1,58 @@
+"""make athlete stats without a type or season unique too
+
+Revision ID: a3e9c7b1d5f4
+Revises: f5d9a1c3e7b2
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a3e9c7b1d5f4'
+down_revision = 'f5d9a1c3e7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the most recently updated row of each key, now treating a
+    # missing stat_type or season as equal to another missing one.
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM athlete_stats WHERE stat_id IN (
+                SELECT stat_id FROM (
+                    SELECT stat_id, ROW_NUMBER() OVER (
+                        PARTITION BY athlete_id, name,
+                            COALESCE(stat_type, ''), COALESCE(season, '')
+                        ORDER BY updated_at DESC, stat_id DESC
+                    ) AS position
+                    FROM athlete_stats
+                ) AS ranked
+                WHERE position > 1
+            )
+            """
+        )
+    )
+    with op.batch_alter_table('athlete_stats') as batch_op:
+        batch_op.drop_constraint('uq_athlete_stat_key', type_='unique')
+    op.create_index(
+        'uq_athlete_stat_key',
+        'athlete_stats',
+        [
+            'athlete_id',
+            'name',
+            sa.text("coalesce(stat_type, '')"),
+            sa.text("coalesce(season, '')"),
+        ],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index('uq_athlete_stat_key', table_name='athlete_stats')
+    with op.batch_alter_table('athlete_stats') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_athlete_stat_key', ['athlete_id', 'name', 'stat_type', 'season']
+        )
@@ -0,0 +1,46 @@
+"""drop duplicate athlete stats and make (athlete_id, name, stat_type, season) unique
+
+Revision ID: a8c4e2f6b1d3
+Revises: f1b3d5e7a9c2
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a8c4e2f6b1d3'
+down_revision = 'f1b3d5e7a9c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the most recently updated row of each key. Rows with a NULL
+    # stat_type or season never conflict, so they are left alone.
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM athlete_stats WHERE stat_id IN (
+                SELECT stat_id FROM (
+                    SELECT stat_id, ROW_NUMBER() OVER (
+                        PARTITION BY athlete_id, name, stat_type, season
+                        ORDER BY updated_at DESC, stat_id DESC
+                    ) AS position
+                    FROM athlete_stats
+                    WHERE stat_type IS NOT NULL AND season IS NOT NULL
+                ) AS ranked
+                WHERE position > 1
+            )
+            """
+        )
+    )
+    with op.batch_alter_table('athlete_stats') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_athlete_stat_key', ['athlete_id', 'name', 'stat_type', 'season']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('athlete_stats') as batch_op:
+        batch_op.drop_constraint('uq_athlete_stat_key', type_='unique')
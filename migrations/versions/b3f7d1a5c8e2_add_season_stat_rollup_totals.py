@@ -0,0 +1,28 @@
+"""add running total and game count to season_stats
+
+Revision ID: b3f7d1a5c8e2
+Revises: a8c4e2f6b1d3
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b3f7d1a5c8e2'
+down_revision = 'a8c4e2f6b1d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing game stats are rolled up with ``flask rebuild-season-stats``.
+    with op.batch_alter_table('season_stats') as batch_op:
+        batch_op.add_column(sa.Column('total', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('game_count', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('season_stats') as batch_op:
+        batch_op.drop_column('game_count')
+        batch_op.drop_column('total')
@@ -0,0 +1,42 @@
+"""create athlete_rankings snapshot table
+
+Revision ID: b5d8e1f2a604
+Revises: 7a2e4f0c9d13
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b5d8e1f2a604'
+down_revision = '7a2e4f0c9d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'athlete_rankings',
+        sa.Column('athlete_id', sa.String(length=36), nullable=False),
+        sa.Column('sport_id', sa.Integer(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=True),
+        sa.Column('sport_rank', sa.Integer(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['athlete_id'], ['athlete_profiles.athlete_id'], ondelete='CASCADE'
+        ),
+        sa.ForeignKeyConstraint(['sport_id'], ['sports.sport_id']),
+        sa.PrimaryKeyConstraint('athlete_id'),
+    )
+    op.create_index('idx_rankings_rank', 'athlete_rankings', ['rank'])
+    op.create_index(
+        'idx_rankings_sport_rank', 'athlete_rankings', ['sport_id', 'sport_rank']
+    )
+
+
+def downgrade():
+    op.drop_index('idx_rankings_sport_rank', table_name='athlete_rankings')
+    op.drop_index('idx_rankings_rank', table_name='athlete_rankings')
+    op.drop_table('athlete_rankings')
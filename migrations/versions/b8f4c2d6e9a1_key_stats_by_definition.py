@@ -0,0 +1,189 @@
+"""key stat rows by their stat definition instead of the stat name
+
+Revision ID: b8f4c2d6e9a1
+Revises: a3e9c7b1d5f4
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8f4c2d6e9a1'
+down_revision = 'a3e9c7b1d5f4'
+branch_labels = None
+depends_on = None
+
+# (table, primary key, columns of the unique key besides the stat)
+TABLES = (
+    ('athlete_stats', 'stat_id', ('athlete_id', "COALESCE(season, '')")),
+    ('season_stats', 'season_stat_id', ('athlete_id', 'season')),
+    ('game_stats', 'game_stat_id', ('athlete_id', 'game_id')),
+)
+BATCH_SIZE = 1000
+
+
+def _define_unlinked(bind, table_name, key):
+    """Link rows whose name the catalog did not know to a new definition.
+
+    The definition belongs to the sport of the row (its athlete's primary
+    sport), or to no sport ('') when that is unknown.
+    """
+    table = sa.table(
+        table_name,
+        sa.column(key, sa.String),
+        sa.column('athlete_id', sa.String),
+        sa.column('name', sa.String),
+        sa.column('stat_definition_id', sa.SmallInteger),
+    )
+    athletes = sa.table(
+        'athlete_profiles',
+        sa.column('athlete_id', sa.String),
+        sa.column('primary_sport_id', sa.Integer),
+    )
+    sports = sa.table('sports', sa.column('sport_id', sa.Integer), sa.column('code', sa.String))
+    definitions = sa.table(
+        'stat_definitions',
+        sa.column('stat_definition_id', sa.SmallInteger),
+        sa.column('sport', sa.String),
+        sa.column('name', sa.String),
+        sa.column('aliases', sa.JSON),
+        sa.column('higher_is_better', sa.Boolean),
+    )
+    defined = {
+        (sport, name): definition_id
+        for definition_id, sport, name in bind.execute(
+            sa.select(definitions.c.stat_definition_id, definitions.c.sport, definitions.c.name)
+        )
+    }
+    pk = table.c[key]
+    while True:
+        rows = bind.execute(
+            sa.select(pk, table.c.name, sports.c.code)
+            .select_from(
+                table.outerjoin(athletes, athletes.c.athlete_id == table.c.athlete_id)
+                .outerjoin(sports, sports.c.sport_id == athletes.c.primary_sport_id)
+            )
+            .where(table.c.stat_definition_id.is_(None))
+            .order_by(pk)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for row_key, name, sport in rows:
+            sport = sport or ''
+            if (sport, name) not in defined:
+                bind.execute(
+                    definitions.insert().values(
+                        sport=sport, name=name, aliases=[], higher_is_better=True
+                    )
+                )
+                defined[(sport, name)] = bind.scalar(
+                    sa.select(definitions.c.stat_definition_id).where(
+                        definitions.c.sport == sport, definitions.c.name == name
+                    )
+                )
+            updates.append({'b_key': row_key, 'b_id': defined[(sport, name)]})
+        bind.execute(
+            table.update()
+            .where(pk == sa.bindparam('b_key'))
+            .values(stat_definition_id=sa.bindparam('b_id')),
+            updates,
+        )
+
+
+def _dedupe(table_name, key, columns):
+    # Spellings that now share a definition ("PPG" and "PointsPerGame")
+    # collide; keep the most recently updated row of each key.
+    partition = ', '.join((*columns, 'stat_definition_id'))
+    op.execute(
+        sa.text(
+            f"""
+            DELETE FROM {table_name} WHERE {key} IN (
+                SELECT {key} FROM (
+                    SELECT {key}, ROW_NUMBER() OVER (
+                        PARTITION BY {partition}
+                        ORDER BY updated_at DESC, {key} DESC
+                    ) AS position
+                    FROM {table_name}
+                ) AS ranked
+                WHERE position > 1
+            )
+            """
+        )
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table_name, key, columns in TABLES:
+        _define_unlinked(bind, table_name, key)
+        _dedupe(table_name, key, columns)
+
+    op.drop_index('uq_athlete_stat_key', table_name='athlete_stats')
+    op.drop_index('idx_stats_name_value', table_name='athlete_stats')
+    op.drop_index('idx_season_stats_name_value', table_name='season_stats')
+    with op.batch_alter_table('athlete_stats') as batch_op:
+        batch_op.alter_column('stat_definition_id', existing_type=sa.SmallInteger(), nullable=False)
+    with op.batch_alter_table('season_stats') as batch_op:
+        batch_op.alter_column('stat_definition_id', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.drop_constraint('uq_season_stat_player_season_name', type_='unique')
+        batch_op.create_unique_constraint(
+            'uq_season_stat_player_season_stat', ['athlete_id', 'season', 'stat_definition_id']
+        )
+    with op.batch_alter_table('game_stats') as batch_op:
+        batch_op.alter_column('stat_definition_id', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.drop_constraint('uq_game_stat_unique', type_='unique')
+        batch_op.create_unique_constraint(
+            'uq_game_stat_unique', ['athlete_id', 'game_id', 'stat_definition_id']
+        )
+
+    op.create_index(
+        'uq_athlete_stat_key',
+        'athlete_stats',
+        ['athlete_id', 'stat_definition_id', sa.text("coalesce(season, '')")],
+        unique=True,
+    )
+    op.create_index(
+        'idx_stats_definition_value', 'athlete_stats', ['stat_definition_id', 'numeric_value']
+    )
+    op.create_index(
+        'idx_season_stats_definition_value',
+        'season_stats',
+        ['stat_definition_id', 'numeric_value'],
+    )
+
+
+def downgrade():
+    op.drop_index('idx_season_stats_definition_value', table_name='season_stats')
+    op.drop_index('idx_stats_definition_value', table_name='athlete_stats')
+    op.drop_index('uq_athlete_stat_key', table_name='athlete_stats')
+    with op.batch_alter_table('game_stats') as batch_op:
+        batch_op.drop_constraint('uq_game_stat_unique', type_='unique')
+        batch_op.create_unique_constraint(
+            'uq_game_stat_unique', ['athlete_id', 'game_id', 'name']
+        )
+        batch_op.alter_column('stat_definition_id', existing_type=sa.SmallInteger(), nullable=True)
+    with op.batch_alter_table('season_stats') as batch_op:
+        batch_op.drop_constraint('uq_season_stat_player_season_stat', type_='unique')
+        batch_op.create_unique_constraint(
+            'uq_season_stat_player_season_name', ['athlete_id', 'season', 'name']
+        )
+        batch_op.alter_column('stat_definition_id', existing_type=sa.SmallInteger(), nullable=True)
+    with op.batch_alter_table('athlete_stats') as batch_op:
+        batch_op.alter_column('stat_definition_id', existing_type=sa.SmallInteger(), nullable=True)
+
+    op.create_index('idx_season_stats_name_value', 'season_stats', ['name', 'numeric_value'])
+    op.create_index('idx_stats_name_value', 'athlete_stats', ['name', 'numeric_value'])
+    op.create_index(
+        'uq_athlete_stat_key',
+        'athlete_stats',
+        [
+            'athlete_id',
+            'name',
+            sa.text("coalesce(stat_type, '')"),
+            sa.text("coalesce(season, '')"),
+        ],
+        unique=True,
+    )
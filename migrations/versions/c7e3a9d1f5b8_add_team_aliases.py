@@ -0,0 +1,116 @@
+"""add team_aliases and athlete current_team_id
+
+Revision ID: c7e3a9d1f5b8
+Revises: b5d8e1f2a604
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c7e3a9d1f5b8'
+down_revision = 'b5d8e1f2a604'
+branch_labels = None
+depends_on = None
+
+# (sport, provider team table, city column, name columns) as of this revision
+TEAM_TABLES = (
+    ('NBA', 'nba_teams', 'city', ('name', 'full_name', 'abbreviation')),
+    ('MLB', 'mlb_teams', 'location', ('name', 'abbreviation')),
+    ('NFL', 'nfl_teams', 'city', ('name', 'abbreviation')),
+    ('NHL', 'nhl_teams', 'location', ('name', 'abbreviation')),
+)
+
+
+def _normalize(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+
+
+def _aliases(row, city_field, name_fields):
+    names = [row[field] for field in name_fields]
+    city = row[city_field]
+    names.append(city)
+    if city and row['name']:
+        names.append(f"{city} {row['name']}")
+    return {alias for alias in map(_normalize, names) if alias}
+
+
+def _backfill(bind):
+    """Index the stored provider teams and resolve every athlete's team."""
+    aliases = sa.table(
+        'team_aliases',
+        sa.column('sport', sa.String),
+        sa.column('alias', sa.String),
+        sa.column('team_id', sa.Integer),
+    )
+    athletes = sa.table(
+        'athlete_profiles',
+        sa.column('athlete_id', sa.String),
+        sa.column('primary_sport_id', sa.Integer),
+        sa.column('current_team', sa.String),
+        sa.column('current_team_id', sa.Integer),
+    )
+    sports = sa.table('sports', sa.column('sport_id', sa.Integer), sa.column('code', sa.String))
+    inspector = sa.inspect(bind)
+    for sport, table_name, city_field, name_fields in TEAM_TABLES:
+        if not inspector.has_table(table_name):
+            continue
+        columns = ['team_id', city_field, *name_fields]
+        teams = sa.table(table_name, *(sa.column(column) for column in columns))
+        index = {}
+        for row in bind.execute(sa.select(teams)).mappings():
+            for alias in _aliases(row, city_field, name_fields):
+                index.setdefault(alias, set()).add(row['team_id'])
+        if not index:
+            continue
+        bind.execute(
+            aliases.insert(),
+            [
+                {'sport': sport, 'alias': alias, 'team_id': team_id}
+                for alias, team_ids in sorted(index.items())
+                for team_id in sorted(team_ids)
+            ],
+        )
+        rows = bind.execute(
+            sa.select(athletes.c.athlete_id, athletes.c.current_team)
+            .join(sports, sports.c.sport_id == athletes.c.primary_sport_id)
+            .where(sports.c.code == sport, athletes.c.current_team.isnot(None))
+        )
+        updates = []
+        for athlete_id, current_team in rows:
+            # An alias shared by several teams (e.g. a city) resolves to none.
+            found = index.get(_normalize(current_team), ())
+            if len(found) == 1:
+                updates.append({'b_athlete_id': athlete_id, 'b_team_id': next(iter(found))})
+        if updates:
+            bind.execute(
+                athletes.update()
+                .where(athletes.c.athlete_id == sa.bindparam('b_athlete_id'))
+                .values(current_team_id=sa.bindparam('b_team_id')),
+                updates,
+            )
+
+
+def upgrade():
+    op.create_table(
+        'team_aliases',
+        sa.Column('sport', sa.String(length=10), nullable=False),
+        sa.Column('alias', sa.String(length=150), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('sport', 'alias', 'team_id'),
+    )
+    with op.batch_alter_table('athlete_profiles') as batch_op:
+        batch_op.add_column(sa.Column('current_team_id', sa.Integer(), nullable=True))
+    _backfill(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('athlete_profiles') as batch_op:
+        batch_op.drop_column('current_team_id')
+    op.drop_table('team_aliases')
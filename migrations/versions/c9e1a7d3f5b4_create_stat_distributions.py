@@ -0,0 +1,45 @@
+"""create stat_distributions for percentile lookups
+
+Revision ID: c9e1a7d3f5b4
+Revises: b3f7d1a5c8e2
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c9e1a7d3f5b4'
+down_revision = 'b3f7d1a5c8e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by ``flask rebuild-stat-distributions`` and the nightly job.
+    op.create_table(
+        'stat_distributions',
+        sa.Column('distribution_id', sa.Integer(), nullable=False),
+        sa.Column('sport_id', sa.Integer(), nullable=False),
+        sa.Column('position_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('season', sa.String(length=20), nullable=True),
+        sa.Column('sample_size', sa.Integer(), nullable=False),
+        sa.Column('higher_is_better', sa.Boolean(), nullable=False),
+        sa.Column('quantiles', sa.LargeBinary(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['sport_id'], ['sports.sport_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['position_id'], ['positions.position_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('distribution_id'),
+    )
+    op.create_index(
+        'idx_stat_distributions_lookup',
+        'stat_distributions',
+        ['sport_id', 'name', 'season'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('idx_stat_distributions_lookup', table_name='stat_distributions')
+    op.drop_table('stat_distributions')
@@ -0,0 +1,66 @@
+"""create team_games schedule projection
+
+Revision ID: d2f6b8a4c1e9
+Revises: c7e3a9d1f5b8
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6b8a4c1e9'
+down_revision = 'c7e3a9d1f5b8'
+branch_labels = None
+depends_on = None
+
+# (sport, games table, teams table, opponent display name)
+SCHEDULES = (
+    ('NBA', 'nba_games', 'nba_teams', 'COALESCE(t.full_name, t.name)'),
+    ('NHL', 'nhl_games', 'nhl_teams', 't.name'),
+)
+
+
+def upgrade():
+    op.create_table(
+        'team_games',
+        sa.Column('sport', sa.String(length=10), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=True),
+        sa.Column('season', sa.String(length=10), nullable=True),
+        sa.Column('is_home', sa.Boolean(), nullable=False),
+        sa.Column('opponent_id', sa.Integer(), nullable=True),
+        sa.Column('opponent_name', sa.String(length=100), nullable=True),
+        sa.Column('team_score', sa.Integer(), nullable=True),
+        sa.Column('opponent_score', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('sport', 'team_id', 'game_id'),
+    )
+    op.create_index(
+        'idx_team_games_schedule',
+        'team_games',
+        ['sport', 'team_id', sa.text('season DESC'), sa.text('date DESC')],
+    )
+
+    for sport, games, teams, name in SCHEDULES:
+        for is_home, team, opponent in (
+            ('TRUE', 'home', 'visitor'),
+            ('FALSE', 'visitor', 'home'),
+        ):
+            op.execute(
+                f"""
+                INSERT INTO team_games (sport, team_id, game_id, date, season, is_home,
+                                        opponent_id, opponent_name, team_score, opponent_score)
+                SELECT '{sport}', g.{team}_team_id, g.game_id, g.date,
+                       CAST(g.season AS VARCHAR(10)), {is_home}, g.{opponent}_team_id,
+                       {name}, g.{team}_team_score, g.{opponent}_team_score
+                FROM {games} g
+                LEFT JOIN {teams} t ON t.team_id = g.{opponent}_team_id
+                WHERE g.{team}_team_id IS NOT NULL
+                """
+            )
+
+
+def downgrade():
+    op.drop_index('idx_team_games_schedule', table_name='team_games')
+    op.drop_table('team_games')
@@ -0,0 +1,27 @@
+"""index athlete_rankings by score for read-time ordering
+
+Revision ID: d4a8f2c6e1b7
+Revises: c9e1a7d3f5b4
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8f2c6e1b7'
+down_revision = 'c9e1a7d3f5b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_rankings_score',
+        'athlete_rankings',
+        [sa.text('score DESC'), 'athlete_id'],
+    )
+
+
+def downgrade():
+    op.drop_index('idx_rankings_score', table_name='athlete_rankings')
@@ -0,0 +1,30 @@
+"""create ranking_dirty queue of sports awaiting a rescore
+
+Revision ID: e2c7b5f9a3d6
+Revises: d4a8f2c6e1b7
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e2c7b5f9a3d6'
+down_revision = 'd4a8f2c6e1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ranking_dirty',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('sport_id', sa.Integer(), nullable=True),
+        sa.Column('marked_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['sport_id'], ['sports.sport_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    op.drop_table('ranking_dirty')
@@ -0,0 +1,84 @@
+"""add numeric_value to stat tables
+
+Revision ID: e4a7c2b9d0f3
+Revises: d2f6b8a4c1e9
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e4a7c2b9d0f3'
+down_revision = 'd2f6b8a4c1e9'
+branch_labels = None
+depends_on = None
+
+# (table, primary key, name/value index)
+TABLES = (
+    ('athlete_stats', 'stat_id', 'idx_stats_name_value'),
+    ('season_stats', 'season_stat_id', 'idx_season_stats_name_value'),
+    ('game_stats', 'game_stat_id', None),
+)
+BATCH_SIZE = 1000
+_NUMBER = re.compile(r'^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)\s*$')
+
+
+def _backfill(bind, table_name, key):
+    table = sa.table(
+        table_name,
+        sa.column(key, sa.String),
+        sa.column('value', sa.String),
+        sa.column('numeric_value', sa.Float),
+    )
+    pk = table.c[key]
+    last = None
+    while True:
+        query = (
+            sa.select(pk, table.c.value)
+            .where(table.c.value.isnot(None))
+            .order_by(pk)
+            .limit(BATCH_SIZE)
+        )
+        if last is not None:
+            query = query.where(pk > last)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+        last = rows[-1][0]
+        updates = [
+            {'b_key': row_key, 'b_value': float(value)}
+            for row_key, value in rows
+            if _NUMBER.match(value)
+        ]
+        if updates:
+            bind.execute(
+                table.update()
+                .where(pk == sa.bindparam('b_key'))
+                .values(numeric_value=sa.bindparam('b_value')),
+                updates,
+            )
+
+
+def upgrade():
+    for table_name, _, _ in TABLES:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column('numeric_value', sa.Float(), nullable=True))
+
+    bind = op.get_bind()
+    for table_name, key, _ in TABLES:
+        _backfill(bind, table_name, key)
+
+    for table_name, _, index in TABLES:
+        if index:
+            op.create_index(index, table_name, ['name', 'numeric_value'])
+
+
+def downgrade():
+    for table_name, _, index in TABLES:
+        if index:
+            op.drop_index(index, table_name=table_name)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('numeric_value')
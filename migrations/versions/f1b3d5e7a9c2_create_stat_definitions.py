@@ -0,0 +1,164 @@
+"""create stat_definitions catalog and link stat rows to it
+
+Revision ID: f1b3d5e7a9c2
+Revises: e4a7c2b9d0f3
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f1b3d5e7a9c2'
+down_revision = 'e4a7c2b9d0f3'
+branch_labels = None
+depends_on = None
+
+# Catalog as of this revision: (sport, canonical name, unit, higher is better, aliases)
+STAT_DEFINITIONS = (
+    ('NBA', 'PointsPerGame', 'pts/g', True, ('PPG', 'Points Per Game')),
+    ('NBA', 'ReboundsPerGame', 'reb/g', True, ('RPG', 'Rebounds Per Game')),
+    ('NBA', 'AssistsPerGame', 'ast/g', True, ('APG', 'Assists Per Game')),
+    ('NFL', 'PassingYards', 'yd', True, ('PassYds', 'Pass Yds')),
+    ('NFL', 'RushingYards', 'yd', True, ('RushYds', 'Rush Yds')),
+    ('NFL', 'ReceivingYards', 'yd', True, ('RecYds', 'Rec Yds')),
+    ('NFL', 'Touchdowns', None, True, ('TD', 'TDs')),
+    ('NFL', 'QBRating', None, True, ('QBR', 'Passer Rating')),
+    ('NFL', 'Tackles', None, True, ('Tkl',)),
+    ('NFL', 'Sacks', None, True, ('Sk',)),
+    ('MLB', 'BattingAverage', None, True, ('AVG', 'BA')),
+    ('MLB', 'HomeRuns', None, True, ('HR',)),
+    ('MLB', 'RunsBattedIn', None, True, ('RBI',)),
+    ('MLB', 'EarnedRunAverage', None, False, ('ERA',)),
+    ('MLB', 'FieldingPercentage', None, True, ('FPCT', 'FLD%')),
+    ('NHL', 'Goals', None, True, ('G',)),
+    ('NHL', 'Assists', None, True, ('A',)),
+    ('NHL', 'Points', None, True, ('PTS', 'P')),
+    ('SOC', 'Goals', None, True, ('G',)),
+    ('SOC', 'Assists', None, True, ('A',)),
+)
+
+# (table, primary key, rename rows to the canonical name)
+# season_stats and game_stats are unique on name, so only the link is added.
+TABLES = (
+    ('athlete_stats', 'stat_id', True),
+    ('season_stats', 'season_stat_id', False),
+    ('game_stats', 'game_stat_id', False),
+)
+BATCH_SIZE = 1000
+
+
+def _key(name):
+    return re.sub(r'[^a-z0-9%]', '', (name or '').lower())
+
+
+def _backfill(bind, table_name, key, rename, by_sport, by_key):
+    table = sa.table(
+        table_name,
+        sa.column(key, sa.String),
+        sa.column('athlete_id', sa.String),
+        sa.column('name', sa.String),
+        sa.column('stat_definition_id', sa.SmallInteger),
+    )
+    athletes = sa.table(
+        'athlete_profiles',
+        sa.column('athlete_id', sa.String),
+        sa.column('primary_sport_id', sa.Integer),
+    )
+    sports = sa.table('sports', sa.column('sport_id', sa.Integer), sa.column('code', sa.String))
+    pk = table.c[key]
+    last = None
+    while True:
+        query = (
+            sa.select(pk, table.c.name, sports.c.code)
+            .select_from(
+                table.outerjoin(athletes, athletes.c.athlete_id == table.c.athlete_id)
+                .outerjoin(sports, sports.c.sport_id == athletes.c.primary_sport_id)
+            )
+            .order_by(pk)
+            .limit(BATCH_SIZE)
+        )
+        if last is not None:
+            query = query.where(pk > last)
+        rows = bind.execute(query).all()
+        if not rows:
+            break
+        last = rows[-1][0]
+        updates = []
+        for row_key, name, sport in rows:
+            found = by_sport.get((sport, _key(name)))
+            if found is None and len(by_key.get(_key(name), ())) == 1:
+                found = next(iter(by_key[_key(name)]))
+            if found:
+                updates.append(
+                    {'b_key': row_key, 'b_id': found[0], 'b_name': found[1] if rename else name}
+                )
+        if updates:
+            bind.execute(
+                table.update()
+                .where(pk == sa.bindparam('b_key'))
+                .values(stat_definition_id=sa.bindparam('b_id'), name=sa.bindparam('b_name')),
+                updates,
+            )
+
+
+def upgrade():
+    definitions = op.create_table(
+        'stat_definitions',
+        sa.Column('stat_definition_id', sa.SmallInteger(), nullable=False),
+        sa.Column('sport', sa.String(length=10), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('aliases', sa.JSON(), nullable=False),
+        sa.Column('unit', sa.String(length=20), nullable=True),
+        sa.Column('higher_is_better', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('stat_definition_id'),
+        sa.UniqueConstraint('sport', 'name', name='uq_stat_definition_sport_name'),
+    )
+    op.bulk_insert(
+        definitions,
+        [
+            {
+                'stat_definition_id': i,
+                'sport': sport,
+                'name': name,
+                'aliases': list(aliases),
+                'unit': unit,
+                'higher_is_better': higher,
+            }
+            for i, (sport, name, unit, higher, aliases) in enumerate(STAT_DEFINITIONS, start=1)
+        ],
+    )
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('stat_definitions', 'stat_definition_id'), "
+            "(SELECT MAX(stat_definition_id) FROM stat_definitions))"
+        )
+
+    for table_name, _, _ in TABLES:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column('stat_definition_id', sa.SmallInteger(), nullable=True))
+            batch_op.create_foreign_key(
+                f'fk_{table_name}_stat_definition',
+                'stat_definitions',
+                ['stat_definition_id'],
+                ['stat_definition_id'],
+            )
+
+    by_sport, by_key = {}, {}
+    for i, (sport, name, _, _, aliases) in enumerate(STAT_DEFINITIONS, start=1):
+        for alias in {_key(name), *map(_key, aliases)}:
+            by_sport.setdefault((sport, alias), (i, name))
+            by_key.setdefault(alias, set()).add((i, name))
+    for table_name, key, rename in TABLES:
+        _backfill(bind, table_name, key, rename, by_sport, by_key)
+
+
+def downgrade():
+    for table_name, _, _ in TABLES:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_constraint(f'fk_{table_name}_stat_definition', type_='foreignkey')
+            batch_op.drop_column('stat_definition_id')
+    op.drop_table('stat_definitions')
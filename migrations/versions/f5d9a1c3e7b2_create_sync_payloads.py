@@ -0,0 +1,30 @@
+"""create sync_payloads to record what each provider sync applied
+
+Revision ID: f5d9a1c3e7b2
+Revises: e2c7b5f9a3d6
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f5d9a1c3e7b2'
+down_revision = 'e2c7b5f9a3d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sync_payloads',
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('digest', sa.String(length=40), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade():
+    op.drop_table('sync_payloads')
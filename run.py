@@ -427,5 +427,50 @@ def backfill_stats_cmd(seasons: int):
     from app import jobs
     jobs.historical_backfill_stats(num_seasons=seasons)
 
+
+@app.cli.command('rebuild-rankings')
+@with_appcontext
+def rebuild_rankings_cmd():
+    """Recompute the athlete ranking snapshot."""
+    from app.services.ranking_service import rebuild_rankings
+    rebuild_rankings()
+    click.echo('Ranking snapshot rebuilt.')
+
+
+@app.cli.command('rebuild-team-index')
+@with_appcontext
+def rebuild_team_index_cmd():
+    """Rebuild team aliases and resolve every athlete's current team."""
+    from app.services.team_service import rebuild_team_index
+    rebuild_team_index()
+    click.echo('Team index rebuilt.')
+
+
+@app.cli.command('rebuild-team-games')
+@with_appcontext
+def rebuild_team_games_cmd():
+    """Recompute the per-team game schedules."""
+    from app.services.schedule_service import rebuild_team_games
+    rebuild_team_games()
+    click.echo('Team schedules rebuilt.')
+
+
+@app.cli.command('rebuild-stat-distributions')
+@with_appcontext
+def rebuild_stat_distributions_cmd():
+    """Recompute the stat percentile distributions."""
+    from app.services.distribution_service import rebuild_stat_distributions
+    count = rebuild_stat_distributions()
+    click.echo(f'Rebuilt {count} stat distributions.')
+
+
+@app.cli.command('rebuild-season-stats')
+@with_appcontext
+def rebuild_season_stats_cmd():
+    """Recompute season totals from per-game stats."""
+    from app.services.rollup_service import rebuild_season_stats
+    count = rebuild_season_stats()
+    click.echo(f'Rolled up {count} season stats.')
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,110 @@
+import sys
+import time
+import uuid
+from datetime import date
+
+import numpy as np
+import sqlalchemy as sa
+
+from app import create_app, db
+from app.models import AthleteProfile, AthleteStat, Sport, StatDefinition, User
+from app.services.ranking_engine import (
+    METRICS,
+    POSITION_WEIGHTS,
+    load_leagues,
+    score_matrix,
+    weight_matrix,
+)
+from config import TestingConfig, config
+
+
+class BenchmarkConfig(TestingConfig):
+    # Seed a throwaway in-memory database, whatever DATABASE_URL points at.
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+
+
+config["benchmark"] = BenchmarkConfig
+
+
+def benchmark(athletes: int = 100_000, sport: str = "NBA", repeat: int = 5) -> float:
+    """Score ``athletes`` synthetic players and return the best time in seconds."""
+    rng = np.random.default_rng(0)
+    metrics = METRICS[sport]
+    values = rng.normal(15, 5, size=(athletes, len(metrics)))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    ratings = rng.uniform(40, 99, size=athletes)
+    ratings[rng.random(athletes) < 0.2] = np.nan
+    codes = [*POSITION_WEIGHTS[sport], None]
+    positions = [codes[i] for i in rng.integers(0, len(codes), size=athletes)]
+    higher = np.array([better for _, better in metrics], dtype=bool)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        weights = weight_matrix(sport, positions)
+        score_matrix(values, higher, weights, ratings)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _seed(connection, athletes, sport, seasons=3):
+    """Insert ``athletes`` players of ``sport`` with every metric for ``seasons`` seasons."""
+    rng = np.random.default_rng(0)
+    sport_id = connection.execute(
+        sa.insert(Sport.__table__).values(name=sport, code=sport)
+    ).inserted_primary_key[0]
+    definitions = dict(
+        connection.execute(
+            sa.select(StatDefinition.name, StatDefinition.stat_definition_id).where(
+                StatDefinition.sport == sport
+            )
+        ).all()
+    )
+    users, profiles, stats = [], [], []
+    for _ in range(athletes):
+        user_id, athlete_id = str(uuid.uuid4()), str(uuid.uuid4())
+        users.append({
+            "user_id": user_id, "username": user_id, "email": f"{user_id}@example.com",
+            "first_name": "Bench", "last_name": "Mark",
+        })
+        profiles.append({
+            "athlete_id": athlete_id, "user_id": user_id, "primary_sport_id": sport_id,
+            "date_of_birth": date(2000, 1, 1), "overall_rating": round(rng.uniform(40, 99), 2),
+        })
+        for season in range(2024 - seasons + 1, 2025):
+            for name, _ in METRICS[sport]:
+                value = round(float(rng.normal(15, 5)), 1)
+                stats.append({
+                    "stat_id": str(uuid.uuid4()), "athlete_id": athlete_id, "name": name,
+                    "stat_definition_id": definitions[name], "season": str(season),
+                    "value": str(value), "numeric_value": value,
+                })
+    connection.execute(sa.insert(User.__table__), users)
+    connection.execute(sa.insert(AthleteProfile.__table__), profiles)
+    connection.execute(sa.insert(AthleteStat.__table__), stats)
+
+
+def benchmark_load(athletes: int = 10_000, sport: str = "NBA", repeat: int = 3) -> float:
+    """Load a seeded league of ``athletes`` players and return the best time in seconds."""
+    app = create_app("benchmark")
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            _seed(connection, athletes, sport)
+        best = float("inf")
+        with db.engine.connect() as connection:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                load_leagues(connection)
+                best = min(best, time.perf_counter() - start)
+        db.drop_all()
+    return best
+
+
+if __name__ == "__main__":  # pragma: no cover
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    elapsed = benchmark(count)
+    print(f"Scored {count} athletes in {elapsed * 1000:.1f} ms")
+    count = min(count, 10_000)
+    elapsed = benchmark_load(count)
+    print(f"Loaded {count} seeded athletes in {elapsed * 1000:.1f} ms")
@@ -1,44 +1,13 @@
 import os
 from datetime import date
-from typing import Dict
 
 from app import create_app, db
-from app.models import AthleteProfile, AthleteStat
 from app.services import nba_service, nfl_service, mlb_service, nhl_service
-
-
-def _collect_stats(athlete: AthleteProfile, year: int) -> Dict[str, str]:
-    """Return relevant stats for the given athlete."""
-    sport = athlete.primary_sport.code if athlete.primary_sport else None
-    mapping = {}
-    if sport == "NBA":
-        mapping = {
-            "PPG": "PointsPerGame",
-            "RPG": "ReboundsPerGame",
-            "APG": "AssistsPerGame",
-        }
-    elif sport == "NFL":
-        mapping = {
-            "PassingYards": "PassingYards",
-            "Touchdowns": "Touchdowns",
-            "QBRating": "QBRating",
-        }
-    elif sport == "MLB":
-        mapping = {
-            "AVG": "BattingAverage",
-            "HR": "HomeRuns",
-            "RBI": "RunsBattedIn",
-        }
-    elif sport == "NHL":
-        mapping = {"Goals": "Goals", "Assists": "Assists", "Points": "Points"}
-
-    stats = {}
-    for label, name in mapping.items():
-        stat = AthleteStat.query.filter_by(
-            athlete_id=athlete.athlete_id, name=name, season=str(year)
-        ).first()
-        stats[label] = stat.value if stat else "N/A"
-    return stats
+from app.services.featured_service import (
+    featured_athletes,
+    format_stat_value,
+    load_featured_stats,
+)
 
 
 def main() -> None:
@@ -47,9 +16,7 @@ def main() -> None:
 
     with app.app_context():
         year = date.today().year
-        athletes = (
-            AthleteProfile.query.filter_by(is_deleted=False, is_featured=True).all()
-        )
+        athletes = featured_athletes()
 
         nba_client = nba_service.NBAAPIClient()
         nfl_client = nfl_service.NFLAPIClient()
@@ -71,8 +38,12 @@ def main() -> None:
                 app.logger.error("Stat sync failed for %s: %s", ath.athlete_id, exc)
                 db.session.rollback()
 
-            stats = _collect_stats(ath, year)
-
+        # Reload after the syncs committed, then read every card stat at once.
+        athletes = featured_athletes()
+        all_stats = load_featured_stats(athletes, year)
+        for ath in athletes:
+            sport = ath.primary_sport.code if ath.primary_sport else None
+            stats = all_stats[ath.athlete_id]
             name = f"{ath.user.first_name} {ath.user.last_name}" if ath.user else ath.athlete_id
             pos = ath.primary_position.name if ath.primary_position else "N/A"
             print(f"- {name}")
@@ -80,10 +51,10 @@ def main() -> None:
             print(f"  - Team: {ath.current_team or 'N/A'}")
             print(f"  - Sport: {sport}")
             shown = 0
-            for label, value in stats.items():
+            for label, value in stats:
                 if shown >= 2:
                     break
-                print(f"    - {label}: {value}")
+                print(f"    - {label}: {'N/A' if value is None else format_stat_value(value)}")
                 shown += 1
             print()
 
@@ -0,0 +1,30 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import db
+
+
+@pytest.fixture
+def count_statements():
+    """Return a context manager collecting the SQL run on ``db.engine`` inside it.
+
+    Call it within an app context: ``with count_statements() as statements:``.
+    """
+    @contextmanager
+    def counting():
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+
+    return counting
@@ -112,3 +112,72 @@ def test_create_skill_missing_name(client):
     athlete = _create_athlete()
     resp = client.post(f'/api/athletes/{athlete.athlete_id}/skills', json={})
     assert resp.status_code == 400
+
+
+def test_list_athletes_cursor_pages(client):
+    ratings = [90, 80, 80, None, 70]
+    for i, rating in enumerate(ratings):
+        user = User(username=f'page{i}', email=f'page{i}@example.com', first_name='P', last_name=str(i))
+        user.save()
+        AthleteProfile(
+            user_id=user.user_id,
+            date_of_birth=date.fromisoformat('2000-01-01'),
+            overall_rating=rating,
+        ).save()
+
+    seen = []
+    cursor = None
+    for _ in range(len(ratings)):
+        url = '/api/athletes?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        resp = client.get(url)
+        assert resp.status_code == 200
+        data = json.loads(resp.data)
+        seen.extend(item['overall_rating'] for item in data['items'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert len(seen) == len(ratings)
+    assert [float(r) if r is not None else None for r in seen] == [90, 80, 80, 70, None]
+
+
+def test_list_athletes_invalid_cursor(client):
+    resp = client.get('/api/athletes?cursor=not-a-cursor')
+    assert resp.status_code == 400
+
+
+def test_conditional_get_athlete_and_stats(client):
+    from app.models import AthleteStat
+
+    user = User(username='etag', email='etag@example.com', first_name='E', last_name='Tag')
+    user.save()
+    athlete = AthleteProfile(user_id=user.user_id, date_of_birth=date.fromisoformat('2000-01-01'))
+    athlete.save()
+    athlete_id = athlete.athlete_id
+
+    resp = client.get(f'/api/athletes/{athlete_id}')
+    etag = resp.headers['ETag']
+    assert resp.headers['Last-Modified']
+    resp = client.get(f'/api/athletes/{athlete_id}', headers={'If-None-Match': etag})
+    assert resp.status_code == 304
+    assert resp.data == b''
+
+    user.first_name = 'Changed'
+    db.session.commit()
+    resp = client.get(f'/api/athletes/{athlete_id}', headers={'If-None-Match': etag})
+    assert resp.status_code == 200
+
+    url = f'/api/athletes/{athlete_id}/stats'
+    etag = client.get(url).headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    stat = AthleteStat(athlete_id=athlete_id, name='PTS', value='1')
+    db.session.add(stat)
+    db.session.commit()
+    resp = client.get(url, headers={'If-None-Match': etag})
+    assert resp.status_code == 200
+    etag = resp.headers['ETag']
+    db.session.delete(stat)
+    db.session.commit()
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+    assert client.get('/api/athletes/missing/stats').status_code == 404
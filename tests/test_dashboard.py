@@ -177,3 +177,23 @@ def test_dashboard_zero_and_percentage_formatting(client, app_instance):
     assert html.count('>0<') >= 3
     assert '98.7%' in html
 
+
+
+def test_dashboard_kpis_single_query_and_invalidation(app_instance, count_statements):
+    from app.services.athlete_service import dashboard_kpis
+
+    _create_athlete(active=True)
+    _create_athlete(active=False, created_at=datetime.utcnow() - timedelta(days=10))
+
+    with count_statements() as statements:
+        kpis = dashboard_kpis()
+        assert dashboard_kpis() == kpis
+
+    assert len(statements) == 1
+    assert kpis == {'total_athletes': 2, 'active_contracts': 1, 'new_this_week': 1}
+
+    athlete = _create_athlete(active=True)
+    assert dashboard_kpis()['active_contracts'] == 2
+    athlete.contract_active = False
+    db.session.commit()
+    assert dashboard_kpis()['active_contracts'] == 1
@@ -62,3 +62,47 @@ def test_featured_format(client, app_instance):
     assert len(item['stats']) == 3
     assert item['stats'][0]['label'] == 'AVG'
     assert item['stats'][0]['value'] == '.283'
+
+
+def test_featured_constant_queries_and_invalidation(client, app_instance, count_statements):
+    with app_instance.app_context():
+        sport = Sport(name='Basketball', code='NBA')
+        db.session.add(sport)
+        db.session.commit()
+        year = str(date.today().year)
+        ids = []
+        for i in range(5):
+            user = User(username=f'n{i}', email=f'n{i}@example.com', first_name='N', last_name=str(i))
+            user.save()
+            athlete = AthleteProfile(
+                user_id=user.user_id,
+                primary_sport_id=sport.sport_id,
+                date_of_birth=date.fromisoformat('2000-01-01'),
+                is_featured=True,
+                overall_rating=90 - i,
+            )
+            athlete.save()
+            ids.append(athlete.athlete_id)
+            db.session.add(AthleteStat(athlete_id=athlete.athlete_id, name='PointsPerGame', value=str(20 + i), season=year))
+        db.session.commit()
+
+        with count_statements() as statements:
+            data = json.loads(client.get('/api/athletes/featured').data)
+            built = len(statements)
+            json.loads(client.get('/api/athletes/featured').data)
+            cached = len(statements) - built
+
+        assert len(data) == 5
+        assert data[0]['stats'][0] == {'label': 'PPG', 'value': '20'}
+        assert data[0]['stats'][1] == {'label': 'RPG', 'value': 'N/A'}
+        assert built == 2
+        assert cached == 0
+
+        stat = AthleteStat.query.filter_by(athlete_id=ids[0]).first()
+        stat.value = '31.5'
+        AthleteProfile.query.get(ids[4]).is_featured = False
+        db.session.commit()
+
+    data = json.loads(client.get('/api/athletes/featured').data)
+    assert len(data) == 4
+    assert data[0]['stats'][0]['value'] == '31.5'
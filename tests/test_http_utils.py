@@ -37,3 +37,36 @@ def test_request_with_retry_failure(monkeypatch):
         pass
     else:
         assert False, "expected exception"
+
+
+def _response(status, body=b"", headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body
+    resp.url = "http://test/teams"
+    resp.headers.update(headers or {})
+    return resp
+
+
+def test_request_with_retry_revalidates_cached_body(monkeypatch):
+    from app import create_app
+
+    session = requests.Session()
+    sent = []
+
+    def respond(method, url, **kwargs):
+        sent.append(kwargs.get("headers") or {})
+        if len(sent) == 1:
+            return _response(200, b'{"teams": [1]}', {"ETag": '"v1"'})
+        return _response(304)
+
+    monkeypatch.setattr(session, "request", respond)
+    with create_app("testing").app_context():
+        first = http_utils.request_with_retry(session, "get", "http://test/teams", cache_ttl=0)
+        second = http_utils.request_with_retry(session, "get", "http://test/teams", cache_ttl=60)
+        third = http_utils.request_with_retry(session, "get", "http://test/teams", cache_ttl=60)
+
+    assert sent == [{}, {"If-None-Match": '"v1"'}]
+    assert first.json() == second.json() == third.json() == {"teams": [1]}
+    assert second.from_cache and third.from_cache
+    assert second.digest == first.digest
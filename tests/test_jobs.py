@@ -43,3 +43,38 @@ def test_nightly_sync_logs_failure(app_ctx, monkeypatch):
     jobs.nightly_sync_games()
     log = SyncLog.query.filter_by(job_name='nightly_sync_games').order_by(SyncLog.log_id.desc()).first()
     assert log and not log.success
+
+
+@pytest.fixture
+def file_db_ctx(tmp_path, monkeypatch):
+    """App context on a SQLite file, so worker threads get their own connections."""
+    import config
+
+    monkeypatch.setattr(
+        config.TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "jobs.db"}'
+    )
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield
+        db.session.remove()
+        db.drop_all()
+
+
+def test_nightly_sync_runs_providers_concurrently(file_db_ctx, monkeypatch):
+    import threading
+
+    both_started = threading.Barrier(2, timeout=5)
+
+    def sync_teams(client):
+        # Fails with BrokenBarrierError unless both providers run at once.
+        both_started.wait()
+
+    monkeypatch.setattr(jobs.nba_service, 'NBAAPIClient', lambda: None)
+    monkeypatch.setattr(jobs.nba_service, 'sync_teams', sync_teams)
+    monkeypatch.setattr(jobs.nhl_service, 'NHLAPIClient', lambda: None)
+    monkeypatch.setattr(jobs.nhl_service, 'sync_teams', sync_teams)
+
+    jobs.nightly_sync_games()
+    log = SyncLog.query.filter_by(job_name='nightly_sync_games').first()
+    assert log and log.success
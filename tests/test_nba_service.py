@@ -9,8 +9,8 @@ import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app, db
-from app.models import NBATeam, NBAGame
-from app.services import nba_service
+from app.models import NBATeam, NBAGame, TeamAlias, TeamGame
+from app.services import nba_service, upsert_service
 
 
 @pytest.fixture
@@ -77,6 +77,49 @@ def test_sync_games(app_ctx):
     assert games[0]['id'] == 10
 
 
+
+@pytest.mark.parametrize('native', [True, False])
+def test_sync_upserts_in_bulk(app_ctx, monkeypatch, native):
+    if not native:
+        # Exercise the SELECT ... IN path used by other dialects.
+        monkeypatch.setattr(upsert_service, '_INSERTS', {})
+    teams = {'data': [
+        {'id': 1, 'abbreviation': 'LAL', 'city': 'Los Angeles', 'name': 'Lakers',
+         'full_name': 'Los Angeles Lakers'},
+        {'id': 2, 'abbreviation': 'MIA', 'city': 'Miami', 'name': 'Heat',
+         'full_name': 'Miami Heat'},
+    ]}
+
+    def games(home_score):
+        return {'data': [
+            {'id': 10, 'date': '2024-01-01T00:00:00Z', 'season': 2024,
+             'home_team': {'id': 1}, 'visitor_team': {'id': 2},
+             'home_team_score': home_score, 'visitor_team_score': 90},
+            {'id': 11, 'date': '2024-01-03T00:00:00Z', 'season': 2024,
+             'home_team': {'id': 2}, 'visitor_team': {'id': 1},
+             'home_team_score': 99, 'visitor_team_score': 98},
+        ]}
+
+    client = nba_service.NBAAPIClient()
+    with patch.object(client, '_get', return_value=teams):
+        nba_service.sync_teams(client)
+    with patch.object(client, '_get', return_value=games(100)):
+        nba_service.sync_games(client, team_id=1, season=2024)
+    teams['data'][1]['full_name'] = 'Miami Heatwave'
+    with patch.object(client, '_get', return_value=teams):
+        nba_service.sync_teams(client)
+    with patch.object(client, '_get', return_value=games(101)):
+        nba_service.sync_games(client, team_id=1, season=2024)
+
+    assert NBATeam.query.count() == 2
+    assert NBATeam.query.get(2).full_name == 'Miami Heatwave'
+    assert NBAGame.query.count() == 2
+    assert NBAGame.query.get(10).home_team_score == 101
+    assert TeamAlias.query.filter_by(sport='NBA', alias='miami heatwave', team_id=2).count() == 1
+    lakers = TeamGame.query.filter_by(sport='NBA', team_id=1, game_id=10).one()
+    assert (lakers.team_score, lakers.opponent_name) == (101, 'Miami Heatwave')
+
+
 def test_get_handles_request_errors(monkeypatch):
     client = nba_service.NBAAPIClient()
     def fail(*args, **kwargs):
@@ -98,3 +141,22 @@ def test_get_handles_bad_json(monkeypatch):
     monkeypatch.setattr(nba_service, "request_with_retry", fake)
     data = client._get("/bad-json")
     assert data == {}
+
+
+def test_synced_teams_reach_autocomplete(app_ctx):
+    from app.services.autocomplete_service import autocomplete
+
+    assert autocomplete('lak') == []
+    teams = {'data': [
+        {'id': 1, 'abbreviation': 'LAL', 'city': 'Los Angeles', 'name': 'Lakers',
+         'full_name': 'Los Angeles Lakers'},
+    ]}
+    client = nba_service.NBAAPIClient()
+    with patch.object(client, '_get', return_value=teams):
+        nba_service.sync_teams(client)
+    assert [r['label'] for r in autocomplete('lak')] == ['Los Angeles Lakers']
+
+    teams['data'][0]['full_name'] = 'Los Angeles Lakeshow'
+    with patch.object(client, '_get', return_value=teams):
+        nba_service.sync_teams(client)
+    assert [r['label'] for r in autocomplete('lakes')] == ['Los Angeles Lakeshow']
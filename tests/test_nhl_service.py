@@ -9,7 +9,7 @@ import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app, db
-from app.models import NHLTeam, NHLGame, AthleteProfile
+from app.models import NHLTeam, NHLGame, AthleteProfile, TeamGame
 from app.services import nhl_service
 
 
@@ -102,6 +102,11 @@ def test_sync_games(app_ctx):
         games = nhl_service.sync_games(client, team_id=1, season='20242025')
     assert NHLGame.query.count() == 1
     assert games[0]['gamePk'] == 99
+    schedule = {
+        (row.team_id, row.is_home, row.opponent_name, row.team_score)
+        for row in TeamGame.query.filter_by(sport='NHL', game_id=99)
+    }
+    assert schedule == {(1, True, 'Rangers', 3), (2, False, 'Devils', 2)}
 
 
 def test_sync_player_stats(app_ctx):
@@ -143,3 +148,24 @@ def test_get_handles_bad_json(monkeypatch):
     monkeypatch.setattr(nhl_service, "request_with_retry", lambda *a, **k: BadResp())
     data = client._get("/bad-json")
     assert data == {}
+
+
+def test_sync_standings_reapplied_until_every_team_exists(app_ctx):
+    db.session.add(NHLTeam(team_id=1, name='Devils'))
+    db.session.commit()
+    records = {'records': [{'teamRecords': [
+        {'team': {'id': team_id}, 'leagueRecord': {'wins': 10}, 'points': 20}
+        for team_id in (1, 2)
+    ]}]}
+
+    client = nhl_service.NHLAPIClient()
+    with patch.object(client, '_get', return_value=records):
+        nhl_service.sync_standings(client)
+    assert NHLTeam.query.get(1).wins == 10
+
+    # Team 2 is synced later; the same payload still reaches it.
+    db.session.add(NHLTeam(team_id=2, name='Rangers'))
+    db.session.commit()
+    with patch.object(client, '_get', return_value=records):
+        nhl_service.sync_standings(client)
+    assert NHLTeam.query.get(2).wins == 10
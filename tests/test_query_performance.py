@@ -34,7 +34,8 @@ def test_athlete_stats_query_speed(app_instance):
             for i in range(500):
                 stat = AthleteStat(
                     athlete_id=athlete.athlete_id,
-                    name='points',
+                    # One row per stat key; the key is unique even without a stat type.
+                    name=f'points_{i}',
                     value=str(i),
                     season=season,
                 )
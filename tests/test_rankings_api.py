@@ -80,3 +80,194 @@ def test_top_rankings_dynamic(client, app_instance):
     assert data[0]["id"]
     scores = [r["score"] for r in data]
     assert scores == sorted(scores, reverse=True)
+
+
+def test_ranking_snapshot_tracks_stat_changes(client, app_instance):
+    from app import jobs
+    from app.models import AthleteRanking, RankingDirty
+
+    with app_instance.app_context():
+        a1 = _create_athlete("NBA", 30)
+        a2 = _create_athlete("NBA", 20)
+        a3 = _create_athlete("NHL", 50)
+        a1_id, a2_id, a3_id = a1.athlete_id, a2.athlete_id, a3.athlete_id
+        # Writers only queue their sports; the scheduled job rescores them.
+        assert AthleteRanking.query.count() == 0
+        jobs.refresh_stale_rankings()
+        assert RankingDirty.query.count() == 0
+
+        ranks = {r.athlete_id: r.sport_rank for r in AthleteRanking.query}
+        assert ranks == {a1_id: 1, a2_id: 2, a3_id: 1}
+
+        stat = AthleteStat.query.filter_by(athlete_id=a2_id).first()
+        stat.value = "35"
+        db.session.commit()
+        assert [d.sport_id for d in RankingDirty.query] == [a2.primary_sport_id]
+        assert db.session.get(AthleteRanking, a2_id).sport_rank == 2
+        jobs.refresh_stale_rankings()
+
+        assert db.session.get(AthleteRanking, a2_id).sport_rank == 1
+        assert db.session.get(AthleteRanking, a1_id).sport_rank == 2
+        # Only the NBA rows were rewritten.
+        assert db.session.get(AthleteRanking, a3_id).sport_rank == 1
+
+    data = json.loads(client.get("/api/rankings/top?sport=NBA").data)
+    assert [r["id"] for r in data] == [a2_id, a1_id]
+    assert json.loads(client.get("/api/rankings/top?sport=MLB").data) == []
+
+
+def test_rebuild_rankings_job(app_instance):
+    from app import jobs
+    from app.models import AthleteRanking
+
+    with app_instance.app_context():
+        _create_athlete("NBA", 30)
+        _create_athlete("NHL", 60)
+        db.session.query(AthleteRanking).delete()
+        db.session.commit()
+
+        jobs.nightly_rebuild_rankings()
+
+        assert [r.rank for r in AthleteRanking.query.order_by(AthleteRanking.rank)] == [1, 2]
+
+
+def test_compute_rankings_constant_queries(app_instance, count_statements):
+    from app.services.ranking_service import compute_rankings
+
+    with app_instance.app_context():
+        top_id = _create_athlete("NBA", 34).athlete_id
+        second_id = _create_athlete("NBA", 10).athlete_id
+        nhl = _create_athlete("NHL", 60)
+        db.session.add(AthleteStat(athlete_id=nhl.athlete_id, name="Points", value="n/a", season="2025"))
+        nhl.overall_rating = 12
+        db.session.commit()
+
+        with count_statements() as statements:
+            ranked = compute_rankings(limit=2)
+
+        # Scoring, ordering, the limit and the names come from one statement.
+        assert len(statements) == 1
+        assert [r["id"] for r in ranked] == [top_id, second_id]
+        # The non-numeric latest season value falls back to the rating.
+        scores = sorted(r["score"] for r in compute_rankings(limit=10))
+        assert scores == [12.0, 33.3, 66.7]
+
+
+def test_compute_rankings_match_snapshot(app_instance):
+    from app.models import AthleteRanking, Position
+    from app.services.ranking_service import compute_rankings, rebuild_rankings
+
+    with app_instance.app_context():
+        athletes = [_create_athlete("NBA", points) for points in (12, 25, 31, 18)]
+        sport_id = athletes[0].primary_sport_id
+        center = Position(sport_id=sport_id, name="Center", code="C")
+        guard = Position(sport_id=sport_id, name="Point Guard", code="PG")
+        db.session.add_all([center, guard])
+        db.session.commit()
+        for athlete, position, rating, rebounds, assists in zip(
+            athletes, (center, guard, None, center), (70, None, 85, 60), (11, 4, 7, None),
+            (2, 9, 5, 3),
+        ):
+            athlete.primary_position_id = position.position_id if position else None
+            athlete.overall_rating = rating
+            if rebounds is not None:
+                db.session.add(AthleteStat(athlete_id=athlete.athlete_id, name="RPG",
+                                           value=str(rebounds), season="2025"))
+            db.session.add(AthleteStat(athlete_id=athlete.athlete_id, name="APG",
+                                       value=str(assists), season="2025"))
+        _create_athlete("NHL", 40)
+        db.session.commit()
+        rebuild_rankings()
+
+        snapshot = {r.athlete_id: r.score for r in AthleteRanking.query}
+        live = {r["id"]: r["score"] for r in compute_rankings(limit=10)}
+        assert live == pytest.approx(snapshot, abs=0.1)
+        filtered = compute_rankings(limit=2, sport="NBA", position="C")
+        assert [r["id"] for r in filtered] == sorted(
+            (athletes[0].athlete_id, athletes[3].athlete_id), key=lambda i: -snapshot[i]
+        )
+
+
+def test_score_matrix_weights_and_blend():
+    import numpy as np
+    from app.services.ranking_engine import score_matrix, weight_matrix
+
+    values = np.array([[30.0, 5.0], [20.0, 15.0], [np.nan, np.nan]])
+    higher = np.array([True, False])
+    weights = np.ones_like(values)
+    ratings = np.array([np.nan, 50.0, 80.0])
+
+    scores = score_matrix(values, higher, weights, ratings)
+    # Row 0 is best on both metrics; row 1 blends its stat score with its
+    # rating; row 2 has no stats and keeps its rating.
+    assert scores[0] == 66.7
+    assert scores[1] == round(0.7 * (100 / 3) + 0.3 * 50, 1)
+    assert scores[2] == 80.0
+
+    weights = weight_matrix("NBA", ["C", "PG", None])
+    assert weights.shape == (3, 3)
+    assert weights[2].tolist() == [1.0, 1.0, 1.0]
+    assert weights[0][1] > weights[0][2]
+
+    # Offensive linemen have no weighted metric and keep their rating.
+    weights = weight_matrix("NFL", ["OL"])
+    assert weights.tolist() == [[0.0] * 5]
+    scores = score_matrix(np.array([[1.0, 2.0, 3.0, 40.0, 2.0]]), np.ones(5, bool), weights, [70.0])
+    assert scores.tolist() == [70.0]
+
+
+def test_top_rankings_filtered_by_position(client, app_instance):
+    from app.models import Position
+
+    with app_instance.app_context():
+        center = _create_athlete("NBA", 25)
+        _create_athlete("NBA", 30)
+        sport_id = center.primary_sport_id
+        position = Position(sport_id=sport_id, name="Center", code="C")
+        db.session.add(position)
+        db.session.commit()
+        center.primary_position_id = position.position_id
+        db.session.commit()
+        center_id = center.athlete_id
+
+    data = json.loads(client.get("/api/rankings/top?sport=nba&position=c").data)
+    assert [r["id"] for r in data] == [center_id]
+    assert data[0]["rank"] == 1
+
+
+def test_leaderboard_ranges_and_standing(client, app_instance):
+    from app.models import Position
+    from app.services.ranking_service import refresh_dirty_rankings
+
+    with app_instance.app_context():
+        ids = [_create_athlete("NHL", points).athlete_id for points in (10, 40, 20, 30, 50)]
+        sport_id = AthleteProfile.query.get(ids[0]).primary_sport_id
+        center = Position(sport_id=sport_id, name="Center", code="C")
+        db.session.add(center)
+        db.session.commit()
+        for athlete_id in (ids[0], ids[2]):
+            AthleteProfile.query.get(athlete_id).primary_position_id = center.position_id
+        db.session.commit()
+        refresh_dirty_rankings()
+
+    data = json.loads(client.get("/api/rankings/leaderboard?sport=nhl&start=2&stop=3").data)
+    assert data["total"] == 5
+    assert [(e["rank"], e["id"]) for e in data["entries"]] == [(2, ids[1]), (3, ids[3])]
+
+    data = json.loads(client.get(f"/api/rankings/athletes/{ids[0]}").data)
+    assert data["sport"]["rank"] == 5
+    assert data["position"] == {"code": "C", "rank": 2, "total": 2, "score": data["sport"]["score"]}
+
+    # Rescoring the sport replaces the cached boards on commit.
+    with app_instance.app_context():
+        stat = AthleteStat.query.filter_by(athlete_id=ids[0]).first()
+        stat.value = "90"
+        db.session.commit()
+        refresh_dirty_rankings()
+
+    data = json.loads(client.get(f"/api/rankings/athletes/{ids[0]}").data)
+    assert data["sport"]["rank"] == 1
+    assert data["position"]["rank"] == 1
+
+    assert client.get("/api/rankings/athletes/missing").status_code == 404
+    assert client.get("/api/rankings/leaderboard").status_code == 400
@@ -0,0 +1,72 @@
+import asyncio
+import math
+import os
+import sys
+
+import redis
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services import nhl_service, rate_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_burst_and_refill():
+    clock = FakeClock()
+    bucket = rate_limit.TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    # Reservations queue behind each other instead of sharing a slot.
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    clock.now += 10
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_rate_limiter_keeps_min_interval():
+    limiter = rate_limit.RateLimiter(0.5)
+    assert limiter.rate == 2.0
+    assert limiter.reserve() == 0
+    assert 0.4 < limiter.reserve() <= 0.5
+
+    unlimited = rate_limit.RateLimiter(0)
+    assert math.isinf(unlimited.rate)
+    assert all(unlimited.try_acquire() for _ in range(10))
+    asyncio.run(unlimited.acquire())
+
+
+def test_shared_bucket_falls_back_when_redis_is_down():
+    class DownClient:
+        def register_script(self, script):
+            def run(keys, args):
+                raise redis.ConnectionError("down")
+            return run
+
+    bucket = rate_limit.SharedTokenBucket(DownClient(), "ratelimit:nba", rate=1, burst=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_provider_limiter_is_shared_per_app():
+    app = create_app('testing')
+    app.config['NHL_API_RATE_LIMIT'] = 5.0
+    app.config['NHL_API_BURST'] = 2
+    with app.app_context():
+        limiter = rate_limit.provider_limiter('nhl')
+        assert nhl_service.NHLAPIClient().rate_limiter is limiter
+        assert nhl_service.NHLAPIClient().rate_limiter is limiter
+        assert (limiter.rate, limiter.burst) == (5.0, 2)
+        assert nhl_service.NHLAPIClient(rate_limit_interval=0).rate_limiter is not limiter
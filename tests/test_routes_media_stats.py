@@ -141,3 +141,91 @@ def test_add_stat_missing_name(client, auth_headers):
         headers=auth_headers
     )
     assert resp.status_code == 400
+
+
+def test_stat_aliases_normalized(client, app_instance, auth_headers):
+    from app.models import Sport, StatDefinition
+
+    with app_instance.app_context():
+        sport = Sport(name='Basketball', code='NBA')
+        db.session.add(sport)
+        db.session.commit()
+        athlete = create_athlete()
+        athlete.primary_sport_id = sport.sport_id
+        db.session.commit()
+        athlete_id = athlete.athlete_id
+
+    for value in ('27.0', '28.1'):
+        resp = client.post(
+            f'/api/athletes/{athlete_id}/stats',
+            json={'name': 'ppg', 'value': value, 'season': '2024'},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200
+        assert json.loads(resp.data)['name'] == 'PointsPerGame'
+
+    with app_instance.app_context():
+        stat = AthleteStat.query.filter_by(athlete_id=athlete_id).one()
+        definition = db.session.get(StatDefinition, stat.stat_definition_id)
+        assert (definition.sport, definition.name) == ('NBA', 'PointsPerGame')
+        assert stat.value == '28.1'
+
+        # Ambiguous names use the stat type's sport, then the athlete's.
+        db.session.add_all([
+            AthleteStat(athlete_id=athlete_id, name='Goals', value='3', stat_type='NHL'),
+            AthleteStat(athlete_id=athlete_id, name='G', value='1', stat_type='SOC'),
+            AthleteStat(athlete_id=athlete_id, name='Steals', value='2'),
+        ])
+        db.session.commit()
+        rows = {
+            (s.name, s.stat_type): db.session.get(StatDefinition, s.stat_definition_id)
+            for s in AthleteStat.query.filter(AthleteStat.name != 'PointsPerGame')
+        }
+        assert rows[('Goals', 'NHL')].sport == 'NHL'
+        assert rows[('Goals', 'SOC')].sport == 'SOC'
+        # Unknown names are added to the catalog under the athlete's sport.
+        assert (rows[('Steals', None)].sport, rows[('Steals', None)].name) == ('NBA', 'Steals')
+
+
+def test_bulk_stat_upsert(client, app_instance, auth_headers):
+    with app_instance.app_context():
+        athlete_id = create_athlete().athlete_id
+        db.session.add(AthleteStat(
+            athlete_id=athlete_id, name='Points', value='10',
+            stat_type='NBA_SEASON', season='2024',
+        ))
+        db.session.commit()
+
+    stats = [
+        {'name': 'Points', 'value': '25', 'stat_type': 'NBA_SEASON', 'season': '2024'},
+        {'name': 'Steals', 'value': 1, 'stat_type': 'NBA_SEASON', 'season': '2024'},
+        {'name': 'Steals', 'value': 2, 'stat_type': 'NBA_SEASON', 'season': '2024'},
+        {'name': 'Blocks', 'value': '4'},
+    ]
+    resp = client.post(
+        f'/api/athletes/{athlete_id}/stats/bulk', json={'stats': stats}, headers=auth_headers
+    )
+    assert resp.status_code == 200
+    assert [(s['name'], s['value']) for s in json.loads(resp.data)] == [
+        ('Points', '25'), ('Steals', '2'), ('Blocks', '4'),
+    ]
+    # Posting again updates rows without a stat type or season too.
+    resp = client.post(
+        f'/api/athletes/{athlete_id}/stats/bulk',
+        json={'stats': [{'name': 'Blocks', 'value': '5'}]},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200
+
+    with app_instance.app_context():
+        rows = {s.name: s for s in AthleteStat.query.filter_by(athlete_id=athlete_id)}
+        assert len(rows) == 3 and AthleteStat.query.count() == 3
+        assert rows['Points'].numeric_value == 25.0
+        assert rows['Blocks'].value == '5'
+
+    resp = client.post(
+        f'/api/athletes/{athlete_id}/stats/bulk',
+        json={'stats': [{'value': '1'}]},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 400
@@ -88,3 +88,206 @@ def test_filter_and_search_combined(client, app_instance):
     assert data['count'] == 1
     assert data['results'][0]['athlete_id'] == a_nba.athlete_id
 
+
+
+def _named_athlete(first, last, team=None, position=None):
+    athlete = create_athlete('NBA')
+    athlete.user.first_name = first
+    athlete.user.last_name = last
+    athlete.current_team = team
+    if position:
+        athlete.primary_position_id = position.position_id
+    db.session.commit()
+    return athlete
+
+
+def test_text_search_matches_name_prefix(client, app_instance):
+    with app_instance.app_context():
+        lebron_id = _named_athlete('LeBron', 'James', team='Lakers').athlete_id
+        _named_athlete('Stephen', 'Curry', team='Warriors')
+
+    resp = client.get('/api/athletes/search?q=lebr')
+    data = json.loads(resp.data)
+    assert resp.status_code == 200
+    assert [r['athlete_id'] for r in data['results']] == [lebron_id]
+
+    resp = client.get('/api/athletes/search?q=warriors')
+    data = json.loads(resp.data)
+    assert data['count'] == 1
+
+
+def test_text_search_tracks_related_changes(client, app_instance):
+    from app.models import Position
+    from app.services.search_service import apply_text_search
+
+    with app_instance.app_context():
+        sport = Sport(name='Hockey', code='NHL')
+        db.session.add(sport)
+        db.session.commit()
+        position = Position(sport_id=sport.sport_id, name='Center', code='C')
+        db.session.add(position)
+        db.session.commit()
+        athlete = _named_athlete('Connor', 'McDavid', position=position)
+
+        def matches(q):
+            query, _ = apply_text_search(AthleteProfile.query, q)
+            return [a.athlete_id for a in query.all()]
+
+        assert matches('center') == [athlete.athlete_id]
+
+        position.name = 'Centre'
+        db.session.commit()
+        assert matches('center') == []
+        assert matches('centre mcdavid') == [athlete.athlete_id]
+
+        athlete.user.last_name = 'Crosby'
+        db.session.commit()
+        assert matches('mcdavid') == []
+
+        athlete.is_deleted = True
+        db.session.commit()
+        assert matches('crosby') == []
+
+
+def test_search_cache_invalidated_by_writes(client, app_instance):
+    with app_instance.app_context():
+        athlete_id = _named_athlete('Kevin', 'Durant').athlete_id
+
+    data = json.loads(client.get('/api/athletes/search?q=durant').data)
+    assert data['count'] == 1
+
+    with app_instance.app_context():
+        AthleteProfile.query.get(athlete_id).is_deleted = True
+        db.session.commit()
+
+    data = json.loads(client.get('/api/athletes/search?q=durant').data)
+    assert data['count'] == 0
+
+
+def test_result_cache_tags(app_instance):
+    from app import cache
+
+    with app_instance.app_context():
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get_or_set('k', compute, tags=['a', 'b']) == 1
+        assert cache.get_or_set('k', compute, tags=['a', 'b']) == 1
+        cache.invalidate('b')
+        assert cache.get('k', tags=['a', 'b']) is None
+        assert cache.get_or_set('k', compute, tags=['a', 'b']) == 2
+
+
+def test_search_cursor_mode(client, app_instance):
+    with app_instance.app_context():
+        for i in range(5):
+            create_athlete('NBA', rating=90 - i)
+
+    resp = client.get('/api/athletes/search?filter=nba&limit=3')
+    page1 = json.loads(resp.data)
+    assert page1['count'] == 3
+    assert page1['next_cursor']
+
+    resp = client.get(f"/api/athletes/search?filter=nba&limit=3&cursor={page1['next_cursor']}")
+    page2 = json.loads(resp.data)
+    assert page2['count'] == 2
+    assert page2['next_cursor'] is None
+    ids = {r['athlete_id'] for r in page1['results'] + page2['results']}
+    assert len(ids) == 5
+
+
+def test_search_facets(client, app_instance):
+    with app_instance.app_context():
+        create_athlete('NBA', contract=True)
+        create_athlete('NBA', contract=False)
+        create_athlete('NFL', contract=True)
+
+    data = json.loads(client.get('/api/athletes/search?facets=1').data)
+    assert data['count'] == 3
+    assert data['facets']['sport'] == {'NBA': 2, 'NFL': 1}
+    assert data['facets']['contract'] == {'active': 2, 'available': 1}
+    assert sum(data['facets']['age'].values()) == 3
+
+    data = json.loads(client.get('/api/athletes/search?filter=nba&facets=1').data)
+    assert data['facets']['sport'] == {'NBA': 2}
+
+    data = json.loads(client.get('/api/athletes/search?filter=nba').data)
+    assert 'facets' not in data
+
+
+def test_age_cutoff_on_leap_day():
+    from app.api.athletes import _years_ago
+
+    assert _years_ago(date(2024, 2, 29), 1) == date(2023, 2, 28)
+    assert _years_ago(date(2024, 2, 29), 4) == date(2020, 2, 29)
+
+
+def test_autocomplete_prefix_index(client, app_instance):
+    from app.models import NBATeam
+
+    with app_instance.app_context():
+        luka_id = _named_athlete('Luka', 'Dončić', team='Mavericks').athlete_id
+        _named_athlete('Stephen', 'Curry', team='Warriors')
+        db.session.add(NBATeam(team_id=1, full_name='Golden State Warriors', name='Warriors'))
+        db.session.commit()
+
+    data = json.loads(client.get('/api/athletes/autocomplete?prefix=donc').data)
+    assert [r['id'] for r in data['results']] == [luka_id]
+
+    data = json.loads(client.get('/api/athletes/autocomplete?prefix=warr').data)
+    assert {r['type'] for r in data['results']} == {'athlete', 'team'}
+
+    # Writes after the index is built are applied on commit.
+    with app_instance.app_context():
+        athlete = AthleteProfile.query.get(luka_id)
+        athlete.user.first_name = 'Lukas'
+        athlete.current_team = 'Lakers'
+        db.session.commit()
+
+    data = json.loads(client.get('/api/athletes/autocomplete?prefix=lak').data)
+    assert data['results'][0]['label'] == 'Lukas Dončić'
+
+    with app_instance.app_context():
+        AthleteProfile.query.get(luka_id).is_deleted = True
+        db.session.commit()
+
+    data = json.loads(client.get('/api/athletes/autocomplete?prefix=donc').data)
+    assert data['results'] == []
+
+
+def test_filter_by_numeric_stat(client, app_instance):
+    from app.models import AthleteStat
+
+    with app_instance.app_context():
+        ids = [create_athlete('NBA').athlete_id for _ in range(3)]
+        db.session.add_all([
+            AthleteStat(athlete_id=ids[0], name='PointsPerGame', value='27.5', season='2024'),
+            AthleteStat(athlete_id=ids[1], name='PointsPerGame', value='18', season='2024'),
+            AthleteStat(athlete_id=ids[2], name='PointsPerGame', value='N/A', season='2024'),
+            AthleteStat(athlete_id=ids[2], name='PointsPerGame', value='30', season='2023'),
+        ])
+        db.session.commit()
+        assert AthleteStat.query.filter_by(value='N/A').one().numeric_value is None
+
+    def search(qs):
+        resp = client.get(f'/api/athletes/search?{qs}')
+        assert resp.status_code == 200
+        return {r['athlete_id'] for r in json.loads(resp.data)['results']}
+
+    assert search('stat=PointsPerGame&min_stat=25') == {ids[0], ids[2]}
+    assert search('stat=PointsPerGame&min_stat=25&stat_season=2024') == {ids[0]}
+    assert search('stat=PointsPerGame&max_stat=20') == {ids[1]}
+    # Aliases are resolved through the stat catalog like stored names.
+    assert search('stat=PPG&min_stat=25&sport=nba') == {ids[0], ids[2]}
+    assert client.get('/api/athletes/search?stat=PointsPerGame&min_stat=x').status_code == 400
+
+    # Stat writes invalidate cached results.
+    with app_instance.app_context():
+        stat = AthleteStat.query.filter_by(athlete_id=ids[1]).one()
+        stat.value = '26'
+        db.session.commit()
+        assert stat.numeric_value == 26.0
+    assert search('stat=PointsPerGame&min_stat=25&stat_season=2024') == {ids[0], ids[1]}
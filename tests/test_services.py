@@ -80,3 +80,71 @@ def test_media_service_file_ops(tmp_path, monkeypatch):
     MediaService.delete_file(path)
     assert not os.path.exists(path)
     MediaService.delete_file(path)  # should not raise
+
+
+def test_season_stats_rolled_up_from_game_stats(app_ctx):
+    from app.models import AthleteRanking, Game, GameStat, RankingDirty, SeasonStat, Sport
+    from app.services.rollup_service import rebuild_season_stats
+
+    sport = Sport(name='Basketball', code='NBA')
+    db.session.add(sport)
+    db.session.commit()
+    athlete = athlete_service.create_athlete({
+        'user_id': create_user().user_id,
+        'primary_sport_id': sport.sport_id,
+        'date_of_birth': date(2000, 1, 1),
+    })
+    for game_id, season in ((1, '2024'), (2, '2024'), (3, '2025')):
+        db.session.add(Game(game_id=game_id, sport_id=sport.sport_id, season=season))
+    db.session.add_all([
+        GameStat(athlete_id=athlete.athlete_id, game_id=1, name='PPG', value='20'),
+        GameStat(athlete_id=athlete.athlete_id, game_id=2, name='PPG', value='31'),
+        GameStat(athlete_id=athlete.athlete_id, game_id=1, name='Steals', value='2'),
+        GameStat(athlete_id=athlete.athlete_id, game_id=2, name='Steals', value='DNP'),
+        GameStat(athlete_id=athlete.athlete_id, game_id=3, name='Steals', value='1'),
+        # Ratios are not the mean of their per-game values.
+        GameStat(athlete_id=athlete.athlete_id, game_id=1, name='FieldingPercentage', value='.5'),
+    ])
+    db.session.commit()
+
+    def season_rows():
+        return {
+            (s.season, s.name): (s.value, s.total, s.game_count)
+            for s in SeasonStat.query.filter_by(athlete_id=athlete.athlete_id)
+        }
+
+    assert season_rows() == {
+        ('2024', 'PointsPerGame'): ('25.5', 51.0, 2),
+        ('2024', 'Steals'): ('2', 2.0, 1),
+        ('2025', 'Steals'): ('1', 1.0, 1),
+    }
+    # The rollup only queues the sport for the scheduled rescore.
+    assert AthleteRanking.query.count() == 0
+    assert {d.sport_id for d in RankingDirty.query} == {sport.sport_id}
+
+    stat = GameStat.query.filter_by(game_id=2, name='PointsPerGame').one()
+    stat.value = '25'
+    db.session.delete(GameStat.query.filter_by(game_id=3).one())
+    db.session.commit()
+    expected = {
+        ('2024', 'PointsPerGame'): ('22.5', 45.0, 2),
+        ('2024', 'Steals'): ('2', 2.0, 1),
+    }
+    assert season_rows() == expected
+
+    db.session.query(SeasonStat).delete()
+    db.session.commit()
+    assert rebuild_season_stats() == 2
+    assert season_rows() == expected
+
+    # A provider's own season figure is not rolled into.
+    db.session.add(SeasonStat(
+        athlete_id=athlete.athlete_id, sport_id=sport.sport_id, season='2025',
+        name='Steals', value='80',
+    ))
+    db.session.add(GameStat(athlete_id=athlete.athlete_id, game_id=3, name='Steals', value='1'))
+    db.session.commit()
+    expected[('2025', 'Steals')] = ('80', None, None)
+    assert season_rows() == expected
+    assert rebuild_season_stats() == 2
+    assert season_rows() == expected
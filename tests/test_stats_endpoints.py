@@ -93,3 +93,292 @@ def test_game_log(client, app_instance):
     data = json.loads(resp.data)
     assert len(data) == 3
     assert data[0]['game_id'] == 3
+
+
+def test_current_team_resolved_through_aliases(client, app_instance):
+    from app.models import TeamAlias
+    from app.services.team_service import rebuild_team_index
+
+    with app_instance.app_context():
+        athlete_id = create_athlete().athlete_id
+        assert db.session.get(AthleteProfile, athlete_id).current_team_id is None
+
+        # Writing teams indexes their aliases and resolves waiting athletes.
+        db.session.add_all([
+            NBATeam(team_id=1, abbreviation='LAL', city='Los Angeles', full_name='Los Angeles Lakers', name='Lakers'),
+            NBATeam(team_id=3, abbreviation='LAC', city='Los Angeles', full_name='LA Clippers', name='Clippers'),
+        ])
+        db.session.add(NBAGame(game_id=1, date=date.fromisoformat('2024-01-03'), season=2024, home_team_id=1, visitor_team_id=3, home_team_score=100, visitor_team_score=90))
+        db.session.commit()
+        athlete = db.session.get(AthleteProfile, athlete_id)
+        assert athlete.current_team_id == 1
+
+        athlete.current_team = 'LA  clippers'
+        db.session.commit()
+        assert db.session.get(AthleteProfile, athlete_id).current_team_id == 3
+
+        # A city shared by two teams is ambiguous.
+        athlete.current_team = 'Los Angeles'
+        db.session.commit()
+        assert db.session.get(AthleteProfile, athlete_id).current_team_id is None
+
+        # Old names keep resolving after a rename.
+        db.session.get(NBATeam, 3).name = 'Clips'
+        athlete.current_team = 'Clippers'
+        db.session.commit()
+        assert db.session.get(AthleteProfile, athlete_id).current_team_id == 3
+        assert TeamAlias.query.filter_by(sport='NBA', alias='los angeles clips').count() == 1
+
+        TeamAlias.query.delete()
+        db.session.commit()
+        rebuild_team_index()
+        assert TeamAlias.query.filter_by(sport='NBA', alias='lal', team_id=1).count() == 1
+
+    resp = client.get(f'/api/athletes/{athlete_id}/game-log')
+    assert resp.status_code == 200
+    assert [g['game_id'] for g in json.loads(resp.data)] == [1]
+
+
+def test_game_log_reads_team_schedule(client, app_instance, count_statements):
+
+    with app_instance.app_context():
+        athlete_id = create_athlete().athlete_id
+        db.session.add_all([
+            NBATeam(team_id=1, abbreviation='LAL', full_name='Los Angeles Lakers', name='Lakers'),
+            NBATeam(team_id=2, abbreviation='MIA', full_name='Miami Heat', name='Heat'),
+        ])
+        db.session.add_all([
+            NBAGame(game_id=i, date=date(2024, 1, i), season=2024, home_team_id=1 if i % 2 else 2,
+                    visitor_team_id=2 if i % 2 else 1, home_team_score=100 + i, visitor_team_score=90)
+            for i in range(1, 8)
+        ])
+        db.session.add(NBAGame(game_id=20, date=date(2023, 3, 1), season=2023, home_team_id=1,
+                               visitor_team_id=2, home_team_score=80, visitor_team_score=85))
+        db.session.commit()
+        db.session.get(NBATeam, 2).full_name = 'Miami Heat Basketball'
+        db.session.commit()
+
+    with app_instance.app_context(), count_statements() as statements:
+        resp = client.get(f'/api/athletes/{athlete_id}/game-log')
+    games = json.loads(resp.data)
+    assert [g['game_id'] for g in games] == [7, 6, 5, 4, 3]
+    assert games[0]['is_home'] is True
+    assert games[0]['home_team_name'] == 'Los Angeles Lakers'
+    assert games[0]['opponent_name'] == 'Miami Heat Basketball'
+    assert games[1]['is_home'] is False
+    assert games[1]['home_team_id'] == 2 and games[1]['home_team_score'] == 106
+    assert games[1]['season'] == 2024
+    assert len(statements) <= 5
+
+    resp = client.get(f'/api/athletes/{athlete_id}/game-log?page=2&per_page=5')
+    data = json.loads(resp.data)
+    assert data['total'] == 8
+    assert [g['game_id'] for g in data['items']] == [2, 1, 20]
+
+    resp = client.get(f'/api/athletes/{athlete_id}/game-log?season=2023')
+    assert [g['game_id'] for g in json.loads(resp.data)] == [20]
+
+    with app_instance.app_context():
+        db.session.delete(db.session.get(NBAGame, 20))
+        db.session.commit()
+    resp = client.get(f'/api/athletes/{athlete_id}/game-log?season=2023')
+    assert json.loads(resp.data) == []
+
+
+def test_compare_stats(client, app_instance):
+    with app_instance.app_context():
+        first = create_athlete()
+        sport_id, position_id = first.primary_sport_id, first.primary_position_id
+        athletes = [first]
+        for _ in range(2):
+            user = User(
+                username=str(uuid.uuid4()), email=f'{uuid.uuid4()}@example.com',
+                first_name='F', last_name='L',
+            )
+            user.save()
+            athletes.append(AthleteProfile(
+                user_id=user.user_id,
+                primary_sport_id=sport_id,
+                primary_position_id=position_id,
+                date_of_birth=date.fromisoformat('2000-01-01'),
+            ).save())
+        ids = [a.athlete_id for a in athletes]
+        for athlete_id, points in zip(ids, ('20', '30', '25')):
+            db.session.add(AthleteStat(
+                athlete_id=athlete_id, name='PPG', value=points, season='2024'
+            ))
+        db.session.add(AthleteStat(athlete_id=ids[0], name='PPG', value='10', season='2023'))
+        db.session.commit()
+
+    resp = client.get(f'/api/stats/compare?ids={",".join(ids)}&names=ppg')
+    assert resp.status_code == 200
+    data = json.loads(resp.data)
+    assert data['athletes'] == ids
+    assert data['stats'] == ['PointsPerGame']
+    assert [row[0]['value'] for row in data['matrix']] == ['20', '30', '25']
+    assert [row[0]['percentile'] for row in data['matrix']] == [0.0, 100.0, 50.0]
+    assert data['columns'][0]['min'] == 20.0 and data['columns'][0]['max'] == 30.0
+
+    with app_instance.app_context():
+        stat = AthleteStat.query.filter_by(athlete_id=ids[0], season='2024').one()
+        stat.value = '35'
+        db.session.commit()
+
+    data = json.loads(client.get(f'/api/stats/compare?ids={ids[0]},{ids[1]}').data)
+    assert [row[0]['percentile'] for row in data['matrix']] == [100.0, 0.0]
+
+    data = json.loads(client.get(f'/api/stats/compare?ids={ids[0]}&season=2023').data)
+    assert data['matrix'] == [[{
+        'value': '10', 'numeric_value': 10.0, 'season': '2023', 'percentile': 0.0,
+    }]]
+    assert client.get('/api/stats/compare').status_code == 400
+
+
+def test_athlete_trends(client, app_instance):
+    from app.models import Game, GameStat
+
+    with app_instance.app_context():
+        athlete = create_athlete()
+        athlete_id, sport_id = athlete.athlete_id, athlete.primary_sport_id
+        points = [10, 20, 30, 40, 50, 60]
+        for day, value in enumerate(points, start=1):
+            season = '2023' if day <= 2 else '2024'
+            db.session.add(Game(
+                game_id=day, sport_id=sport_id, season=season, date=date(2024, 1, day)
+            ))
+            db.session.add(GameStat(
+                athlete_id=athlete_id, game_id=day, name='PPG', value=str(value)
+            ))
+        db.session.commit()
+
+    resp = client.get(f'/api/athletes/{athlete_id}/trends?stat=ppg&window=2,5&limit=3')
+    assert resp.status_code == 200
+    data = json.loads(resp.data)
+    assert data['stat'] == 'PointsPerGame'
+    assert [g['game_id'] for g in data['games']] == [4, 5, 6]
+    assert data['games'][-1]['rolling'] == {'2': 55.0, '5': 40.0}
+    assert data['games'][-1]['season_total'] == 180.0
+    assert data['games'][-1]['season_games'] == 4
+    assert data['seasons'] == {
+        '2023': {'games': 2, 'total': 30.0, 'average': 15.0},
+        '2024': {'games': 4, 'total': 180.0, 'average': 45.0},
+    }
+    assert data['streak']['direction'] == 'above'
+    assert data['streak']['length'] == 3
+
+    with app_instance.app_context():
+        # A new game is appended to the cached series; an edit rebuilds it.
+        db.session.add(Game(game_id=7, sport_id=sport_id, season='2024', date=date(2024, 1, 7)))
+        db.session.add(GameStat(athlete_id=athlete_id, game_id=7, name='PPG', value='0'))
+        db.session.commit()
+    data = json.loads(client.get(f'/api/athletes/{athlete_id}/trends?stat=PPG').data)
+    assert len(data['games']) == 7
+    assert data['games'][-1]['rolling']['5'] == 36.0
+    assert data['streak'] == {
+        'baseline': 30.0, 'direction': 'below', 'length': 1,
+        'longest_above': 3, 'longest_below': 2,
+    }
+
+    with app_instance.app_context():
+        GameStat.query.filter_by(game_id=1).one().value = '15'
+        db.session.commit()
+    data = json.loads(client.get(f'/api/athletes/{athlete_id}/trends?stat=PPG').data)
+    assert data['games'][0]['value'] == 15.0
+
+    with app_instance.app_context():
+        # Moving a game to another season regroups the cached series.
+        Game.query.get(2).season = '2024'
+        db.session.commit()
+    data = json.loads(client.get(f'/api/athletes/{athlete_id}/trends?stat=PPG').data)
+    assert data['seasons']['2023'] == {'games': 1, 'total': 15.0, 'average': 15.0}
+
+    assert client.get(f'/api/athletes/{athlete_id}/trends').status_code == 400
+    assert client.get(f'/api/athletes/{athlete_id}/trends?stat=PPG&window=0').status_code == 400
+
+
+def test_stat_percentiles(client, app_instance):
+    from app.services.distribution_service import rebuild_stat_distributions
+
+    with app_instance.app_context():
+        first = create_athlete()
+        sport_id = first.primary_sport_id
+        center = Position(sport_id=sport_id, name='Center', code='C')
+        db.session.add(center)
+        db.session.commit()
+        athletes = [first]
+        for _ in range(3):
+            user = User(
+                username=str(uuid.uuid4()), email=f'{uuid.uuid4()}@example.com',
+                first_name='F', last_name='L',
+            )
+            user.save()
+            athletes.append(AthleteProfile(
+                user_id=user.user_id,
+                primary_sport_id=sport_id,
+                primary_position_id=center.position_id,
+                date_of_birth=date.fromisoformat('2000-01-01'),
+            ).save())
+        for athlete, points in zip(athletes, ('30', '10', '20', '25')):
+            db.session.add(AthleteStat(
+                athlete_id=athlete.athlete_id, name='PPG', value=points, season='2024'
+            ))
+        db.session.commit()
+        assert rebuild_stat_distributions() == 3
+        athlete_id = athletes[3].athlete_id
+
+    resp = client.get('/api/stats/percentile?sport=nba&stat=ppg&value=22&season=2024')
+    assert resp.status_code == 200
+    data = json.loads(resp.data)
+    assert data['percentile'] == 50.0
+    assert (data['sample_size'], data['min'], data['max']) == (4, 10.0, 30.0)
+
+    data = json.loads(client.get(
+        '/api/stats/percentile?sport=NBA&stat=PPG&value=25&season=2024&position=C'
+    ).data)
+    assert data['percentile'] == 83.3
+
+    data = json.loads(client.get(f'/api/athletes/{athlete_id}/percentiles').data)
+    assert data['position'] == 'C'
+    assert data['stats'] == [{
+        'stat': 'PointsPerGame', 'season': '2024', 'value': 25.0,
+        'sport': {'percentile': 62.5, 'sample_size': 4},
+        'position': {'percentile': 83.3, 'sample_size': 3},
+    }]
+
+    assert client.get('/api/stats/percentile?sport=NBA&stat=PPG&value=1').status_code == 404
+    assert client.get('/api/stats/percentile?sport=NBA&stat=PPG').status_code == 400
+    for value in ('nan', 'inf'):
+        resp = client.get(f'/api/stats/percentile?sport=NBA&stat=PPG&value={value}')
+        assert resp.status_code == 400
+
+
+def test_stat_percentiles_lower_is_better(client, app_instance):
+    from app.services.distribution_service import rebuild_stat_distributions
+
+    with app_instance.app_context():
+        sport = Sport(name='Baseball', code='MLB')
+        db.session.add(sport)
+        db.session.commit()
+        for era in ('2.5', '3.5', '4.5', '5.5'):
+            user = User(
+                username=str(uuid.uuid4()), email=f'{uuid.uuid4()}@example.com',
+                first_name='F', last_name='L',
+            )
+            user.save()
+            athlete = AthleteProfile(
+                user_id=user.user_id,
+                primary_sport_id=sport.sport_id,
+                date_of_birth=date.fromisoformat('2000-01-01'),
+            ).save()
+            db.session.add(AthleteStat(
+                athlete_id=athlete.athlete_id, name='ERA', value=era, season='2024'
+            ))
+        db.session.commit()
+        assert rebuild_stat_distributions() == 1
+
+    # A low ERA ranks high.
+    data = json.loads(
+        client.get('/api/stats/percentile?sport=MLB&stat=ERA&value=3&season=2024').data
+    )
+    assert data['stat'] == 'EarnedRunAverage'
+    assert data['percentile'] == 75.0